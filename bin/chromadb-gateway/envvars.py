@@ -5,6 +5,11 @@ class EnvVars:
     staging_host = "STAGING_HOST"
     db_path = "DB_PATH"
     collection_name = "COLLECTION_NAME"
+    upsert_batch_size = "UPSERT_BATCH_SIZE"
+    io_threads = "IO_THREADS"
+    embedding_threads = "EMBEDDING_THREADS"
+    vectorise_batch_size = "VECTORISE_BATCH_SIZE"
+    vectorise_batch_wait_ms = "VECTORISE_BATCH_WAIT_MS"
 
 
 class Defaults:
@@ -14,3 +19,8 @@ class Defaults:
     staging_host = "localhost"
     db_path = "./.chromadb"
     collection_name = "embeddings"
+    upsert_batch_size = "256"
+    io_threads = "4"
+    embedding_threads = "1"
+    vectorise_batch_size = "32"
+    vectorise_batch_wait_ms = "2"
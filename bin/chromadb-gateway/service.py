@@ -1,13 +1,17 @@
 from asyncio import run, sleep
 from dotenv import load_dotenv
 from os import getenv
+from typing import Any
 from envvars import EnvVars, Defaults
+from sbilifeco.models.base import Response
 from sbilifeco.gateways.file_system_chromadb import FileSystemChromDB
 from sbilifeco.cp.vectoriser.http_server import VectoriserHttpServer
 from sbilifeco.cp.vector_repo.http_server import VectorRepoHttpServer
 
 
 class ChromaDBGatewayMicroservice:
+    EXECUTOR_STATS_PATH = "/api/v1/executor-stats"  # GET
+
     async def run(self) -> None:
         db_path = getenv(EnvVars.db_path, Defaults.db_path)
         collection_name = getenv(EnvVars.collection_name, Defaults.collection_name)
@@ -17,9 +21,30 @@ class ChromaDBGatewayMicroservice:
         http_port_vector_repo = int(
             getenv(EnvVars.http_port_vector_repo, Defaults.http_port_vector_repo)
         )
+        upsert_batch_size = int(
+            getenv(EnvVars.upsert_batch_size, Defaults.upsert_batch_size)
+        )
+        io_threads = int(getenv(EnvVars.io_threads, Defaults.io_threads))
+        embedding_threads = int(
+            getenv(EnvVars.embedding_threads, Defaults.embedding_threads)
+        )
+        vectorise_batch_size = int(
+            getenv(EnvVars.vectorise_batch_size, Defaults.vectorise_batch_size)
+        )
+        vectorise_batch_wait_ms = float(
+            getenv(EnvVars.vectorise_batch_wait_ms, Defaults.vectorise_batch_wait_ms)
+        )
 
         self.gateway = FileSystemChromDB()
-        (self.gateway.set_db_path(db_path).set_collection_name(collection_name))
+        (
+            self.gateway.set_db_path(db_path)
+            .set_collection_name(collection_name)
+            .set_upsert_batch_size(upsert_batch_size)
+            .set_io_threads(io_threads)
+            .set_embedding_threads(embedding_threads)
+            .set_vectorise_batch_size(vectorise_batch_size)
+            .set_vectorise_batch_wait_ms(vectorise_batch_wait_ms)
+        )
         await self.gateway.async_init()
 
         self.http_server_vectoriser = VectoriserHttpServer()
@@ -28,6 +53,15 @@ class ChromaDBGatewayMicroservice:
                 http_port_vectoriser
             )
         )
+
+        # Queue depths of the I/O and embedding pools, for spotting saturation
+        @self.http_server_vectoriser.get(self.EXECUTOR_STATS_PATH)
+        async def get_executor_stats() -> Response[list[dict[str, Any]]]:
+            try:
+                return Response.ok(self.gateway.executor_stats())
+            except Exception as e:
+                return Response.error(e)
+
         await self.http_server_vectoriser.listen()
 
         self.http_server_vector_repo = VectorRepoHttpServer()
@@ -5,6 +5,10 @@ class EnvVars:
     doclingserve_proto = "DOCLINGSERVE_PROTO"
     doclingserve_host = "DOCLINGSERVE_HOST"
     doclingserve_port = "DOCLINGSERVE_PORT"
+    spool_threshold = "SPOOL_THRESHOLD"
+    incremental_parsing = "INCREMENTAL_PARSING"
+    chunks_ttl = "CHUNKS_TTL"
+    max_materials = "MAX_MATERIALS"
 
 
 class Defaults:
@@ -14,3 +18,7 @@ class Defaults:
     doclingserve_proto = "http"
     doclingserve_host = "localhost"
     doclingserve_port = "80"
+    spool_threshold = "8388608"
+    incremental_parsing = "true"
+    chunks_ttl = "600"
+    max_materials = "64"
@@ -19,6 +19,15 @@ class DoclingReaderMicroservice:
         doclingserve_port = int(
             getenv(EnvVars.doclingserve_port, Defaults.doclingserve_port)
         )
+        spool_threshold = int(getenv(EnvVars.spool_threshold, Defaults.spool_threshold))
+        incremental_parsing = (
+            getenv(EnvVars.incremental_parsing, Defaults.incremental_parsing)
+            .strip()
+            .lower()
+            == "true"
+        )
+        chunks_ttl = float(getenv(EnvVars.chunks_ttl, Defaults.chunks_ttl))
+        max_materials = int(getenv(EnvVars.max_materials, Defaults.max_materials))
 
         # Gateways
         self.reader = (
@@ -26,11 +35,18 @@ class DoclingReaderMicroservice:
             .set_doclingserve_proto(doclingserve_proto)
             .set_doclingserve_host(doclingserve_host)
             .set_doclingserve_port(doclingserve_port)
+            .set_incremental_parsing(incremental_parsing)
+            .set_chunks_ttl(chunks_ttl)
+            .set_max_materials(max_materials)
         )
 
         # Controllers and presenters
         self.http_server = MaterialReaderHttpServer()
-        self.http_server.set_material_reader(self.reader).set_http_port(http_port)
+        (
+            self.http_server.set_material_reader(self.reader)
+            .set_spool_threshold(spool_threshold)
+            .set_http_port(http_port)
+        )
         await self.http_server.listen()
 
     async def run_forever(self) -> None:
@@ -5,15 +5,26 @@ class EnvVars:
     material_reader_proto = "MATERIAL_READER_PROTO"
     material_reader_host = "MATERIAL_READER_HOST"
     material_reader_port = "MATERIAL_READER_PORT"
+    material_reader_read_size = "MATERIAL_READER_READ_SIZE"
+    material_reader_max_connections = "MATERIAL_READER_MAX_CONNECTIONS"
     vectoriser_proto = "VECTORISER_PROTO"
     vectoriser_host = "VECTORISER_HOST"
     vectoriser_port = "VECTORISER_PORT"
     vector_repo_proto = "VECTOR_REPO_PROTO"
     vector_repo_host = "VECTOR_REPO_HOST"
     vector_repo_port = "VECTOR_REPO_PORT"
+    packed_vectors = "PACKED_VECTORS"
     id_name_repo_proto = "ID_NAME_REPO_PROTO"
     id_name_repo_host = "ID_NAME_REPO_HOST"
     id_name_repo_port = "ID_NAME_REPO_PORT"
+    batch_size = "BATCH_SIZE"
+    pipelined = "PIPELINED"
+    vectorise_concurrency = "VECTORISE_CONCURRENCY"
+    store_concurrency = "STORE_CONCURRENCY"
+    max_in_flight_chunks = "MAX_IN_FLIGHT_CHUNKS"
+    spool_threshold = "SPOOL_THRESHOLD"
+    deduplication = "DEDUPLICATION"
+    replace_previous_versions = "REPLACE_PREVIOUS_VERSIONS"
 
 
 class Defaults:
@@ -23,12 +34,23 @@ class Defaults:
     material_reader_proto = "http"
     material_reader_host = "localhost"
     material_reader_port = "80"
+    material_reader_read_size = "65536"
+    material_reader_max_connections = "8"
     vectoriser_proto = "http"
     vectoriser_host = "localhost"
     vectoriser_port = "80"
     vector_repo_proto = "http"
     vector_repo_host = "localhost"
     vector_repo_port = "80"
+    packed_vectors = "true"
     id_name_repo_proto = "http"
     id_name_repo_host = "localhost"
     id_name_repo_port = "80"
+    batch_size = "32"
+    pipelined = "true"
+    vectorise_concurrency = "2"
+    store_concurrency = "2"
+    max_in_flight_chunks = "256"
+    spool_threshold = "8388608"
+    deduplication = "true"
+    replace_previous_versions = "true"
@@ -24,6 +24,17 @@ class IngestFlowMicroservice:
         material_reader_port = int(
             getenv(EnvVars.material_reader_port, Defaults.material_reader_port)
         )
+        material_reader_read_size = int(
+            getenv(
+                EnvVars.material_reader_read_size, Defaults.material_reader_read_size
+            )
+        )
+        material_reader_max_connections = int(
+            getenv(
+                EnvVars.material_reader_max_connections,
+                Defaults.material_reader_max_connections,
+            )
+        )
         vectoriser_proto = getenv(EnvVars.vectoriser_proto, Defaults.vectoriser_proto)
         vectoriser_host = getenv(EnvVars.vectoriser_host, Defaults.vectoriser_host)
         vectoriser_port = int(getenv(EnvVars.vectoriser_port, Defaults.vectoriser_port))
@@ -34,6 +45,10 @@ class IngestFlowMicroservice:
         vector_repo_port = int(
             getenv(EnvVars.vector_repo_port, Defaults.vector_repo_port)
         )
+        packed_vectors = (
+            getenv(EnvVars.packed_vectors, Defaults.packed_vectors).strip().lower()
+            == "true"
+        )
         id_name_repo_proto = getenv(
             EnvVars.id_name_repo_proto, Defaults.id_name_repo_proto
         )
@@ -43,6 +58,32 @@ class IngestFlowMicroservice:
         id_name_repo_port = int(
             getenv(EnvVars.id_name_repo_port, Defaults.id_name_repo_port)
         )
+        batch_size = int(getenv(EnvVars.batch_size, Defaults.batch_size))
+        pipelined = (
+            getenv(EnvVars.pipelined, Defaults.pipelined).strip().lower() == "true"
+        )
+        vectorise_concurrency = int(
+            getenv(EnvVars.vectorise_concurrency, Defaults.vectorise_concurrency)
+        )
+        store_concurrency = int(
+            getenv(EnvVars.store_concurrency, Defaults.store_concurrency)
+        )
+        max_in_flight_chunks = int(
+            getenv(EnvVars.max_in_flight_chunks, Defaults.max_in_flight_chunks)
+        )
+        spool_threshold = int(getenv(EnvVars.spool_threshold, Defaults.spool_threshold))
+        deduplication = (
+            getenv(EnvVars.deduplication, Defaults.deduplication).strip().lower()
+            == "true"
+        )
+        replace_previous_versions = (
+            getenv(
+                EnvVars.replace_previous_versions, Defaults.replace_previous_versions
+            )
+            .strip()
+            .lower()
+            == "true"
+        )
 
         # Gateways and flows
         self.material_reader = MaterialReaderHttpClient()
@@ -50,6 +91,8 @@ class IngestFlowMicroservice:
             self.material_reader.set_proto(material_reader_proto)
             .set_host(material_reader_host)
             .set_port(material_reader_port)
+            .set_read_size(material_reader_read_size)
+            .set_max_connections(material_reader_max_connections)
         )
 
         self.vectoriser = VectoriserHttpClient()
@@ -57,6 +100,7 @@ class IngestFlowMicroservice:
             self.vectoriser.set_proto(vectoriser_proto)
             .set_host(vectoriser_host)
             .set_port(vectoriser_port)
+            .set_packed_vectors(packed_vectors)
         )
 
         self.vector_repo = VectorRepoHttpClient()
@@ -64,6 +108,7 @@ class IngestFlowMicroservice:
             self.vector_repo.set_proto(vector_repo_proto)
             .set_host(vector_repo_host)
             .set_port(vector_repo_port)
+            .set_packed_vectors(packed_vectors)
         )
 
         self.id_name_repo = IDNameRepoHttpClient()
@@ -79,12 +124,23 @@ class IngestFlowMicroservice:
             .set_vectoriser(self.vectoriser)
             .set_vector_repo(self.vector_repo)
             .set_id_name_repo(self.id_name_repo)
+            .set_batch_size(batch_size)
+            .set_pipelined(pipelined)
+            .set_vectorise_concurrency(vectorise_concurrency)
+            .set_store_concurrency(store_concurrency)
+            .set_max_in_flight_chunks(max_in_flight_chunks)
+            .set_deduplication(deduplication)
+            .set_replace_previous_versions(replace_previous_versions)
         )
         await self.ingest_flow.async_init()
 
         # Controllers and presenters
         self.http_server = IngestFlowHttpServer()
-        (self.http_server.set_ingest_flow(self.ingest_flow).set_http_port(http_port))
+        (
+            self.http_server.set_ingest_flow(self.ingest_flow)
+            .set_spool_threshold(spool_threshold)
+            .set_http_port(http_port)
+        )
         await self.http_server.listen()
 
     async def run_forever(self) -> None:
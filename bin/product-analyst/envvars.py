@@ -0,0 +1,116 @@
+class EnvVars:
+    test_type = "TEST_TYPE"
+    staging_host = "STAGING_HOST"
+    ingest_flow_http_port = "INGEST_FLOW_HTTP_PORT"
+    query_flow_http_port = "QUERY_FLOW_HTTP_PORT"
+    vector_store = "VECTOR_STORE"
+    qdrant_url = "QDRANT_URL"
+    chromadb_path = "CHROMADB_PATH"
+    collection_name = "COLLECTION_NAME"
+    upsert_batch_size = "UPSERT_BATCH_SIZE"
+    wait_for_bulk_upserts = "WAIT_FOR_BULK_UPSERTS"
+    indexed_fields = "INDEXED_FIELDS"
+    io_threads = "IO_THREADS"
+    embedding_threads = "EMBEDDING_THREADS"
+    embedding_processes = "EMBEDDING_PROCESSES"
+    threads_per_embedder = "THREADS_PER_EMBEDDER"
+    vectorise_batch_size = "VECTORISE_BATCH_SIZE"
+    vectorise_batch_wait_ms = "VECTORISE_BATCH_WAIT_MS"
+    hnsw_m = "HNSW_M"
+    hnsw_ef_construct = "HNSW_EF_CONSTRUCT"
+    on_disk_vectors = "ON_DISK_VECTORS"
+    quantization = "QUANTIZATION"
+    quantization_always_ram = "QUANTIZATION_ALWAYS_RAM"
+    search_hnsw_ef = "SEARCH_HNSW_EF"
+    search_exact = "SEARCH_EXACT"
+    search_rescore = "SEARCH_RESCORE"
+    search_oversampling = "SEARCH_OVERSAMPLING"
+    sparse_model = "SPARSE_MODEL"
+    hybrid_prefetch_factor = "HYBRID_PREFETCH_FACTOR"
+    db_path = "DB_PATH"
+    doclingserve_proto = "DOCLINGSERVE_PROTO"
+    doclingserve_host = "DOCLINGSERVE_HOST"
+    doclingserve_port = "DOCLINGSERVE_PORT"
+    incremental_parsing = "INCREMENTAL_PARSING"
+    chunks_ttl = "CHUNKS_TTL"
+    max_materials = "MAX_MATERIALS"
+    llm_proto = "LLM_PROTO"
+    llm_host = "LLM_HOST"
+    llm_port = "LLM_PORT"
+    spool_threshold = "SPOOL_THRESHOLD"
+    batch_size = "BATCH_SIZE"
+    pipelined = "PIPELINED"
+    vectorise_concurrency = "VECTORISE_CONCURRENCY"
+    store_concurrency = "STORE_CONCURRENCY"
+    max_in_flight_chunks = "MAX_IN_FLIGHT_CHUNKS"
+    deduplication = "DEDUPLICATION"
+    replace_previous_versions = "REPLACE_PREVIOUS_VERSIONS"
+    embedding_model_id = "EMBEDDING_MODEL_ID"
+    embedding_cache_size = "EMBEDDING_CACHE_SIZE"
+    embedding_cache_ttl = "EMBEDDING_CACHE_TTL"
+    embedding_cache_path = "EMBEDDING_CACHE_PATH"
+    answer_cache_size = "ANSWER_CACHE_SIZE"
+    answer_cache_ttl = "ANSWER_CACHE_TTL"
+    answer_cache_similarity = "ANSWER_CACHE_SIMILARITY"
+    max_concurrent_llm_calls = "MAX_CONCURRENT_LLM_CALLS"
+
+
+class Defaults:
+    test_type = "unit"  # or "integration" or "staging"
+    staging_host = "localhost"
+    ingest_flow_http_port = "80"
+    query_flow_http_port = "81"
+    vector_store = "qdrant"  # or "chromadb"
+    qdrant_url = "http://localhost:6333"
+    chromadb_path = "./.chromadb"
+    collection_name = "default"
+    upsert_batch_size = "256"
+    wait_for_bulk_upserts = "true"  # qdrant only
+    indexed_fields = (
+        ""  # qdrant only. Extra metadata fields as name[:type], comma separated
+    )
+    io_threads = "4"  # chromadb only
+    embedding_threads = "1"
+    embedding_processes = "0"  # qdrant only. 0 embeds in the service process
+    threads_per_embedder = "0"  # qdrant only. 0 leaves it to ONNX Runtime
+    vectorise_batch_size = "32"
+    vectorise_batch_wait_ms = "2"
+    hnsw_m = "0"  # qdrant only. 0 leaves Qdrant's default
+    hnsw_ef_construct = "0"  # qdrant only. 0 leaves Qdrant's default
+    on_disk_vectors = ""  # qdrant only. true, false or empty to leave as is
+    quantization = ""  # qdrant only. scalar, product, binary or empty for none
+    quantization_always_ram = ""  # qdrant only. true, false or empty to leave as is
+    search_hnsw_ef = "0"  # qdrant only. 0 leaves Qdrant's default
+    search_exact = "false"  # qdrant only
+    search_rescore = ""  # qdrant only. true, false or empty to leave as is
+    search_oversampling = "0"  # qdrant only. 0 leaves Qdrant's default
+    sparse_model = (
+        ""  # qdrant only. e.g. Qdrant/bm25 for hybrid search, empty for dense only
+    )
+    hybrid_prefetch_factor = "4"  # qdrant only
+    db_path = "./.entities.db"
+    doclingserve_proto = "http"
+    doclingserve_host = "localhost"
+    doclingserve_port = "80"
+    incremental_parsing = "true"
+    chunks_ttl = "600"
+    max_materials = "64"
+    llm_proto = "http"
+    llm_host = "localhost"
+    llm_port = "80"
+    spool_threshold = "8388608"
+    batch_size = "32"
+    pipelined = "true"
+    vectorise_concurrency = "2"
+    store_concurrency = "2"
+    max_in_flight_chunks = "256"
+    deduplication = "true"
+    replace_previous_versions = "true"
+    embedding_model_id = "default"
+    embedding_cache_size = "1024"  # 0 disables the cache
+    embedding_cache_ttl = "86400"
+    embedding_cache_path = ""  # empty keeps the cache in memory only
+    answer_cache_size = "256"  # 0 disables the cache
+    answer_cache_ttl = "3600"
+    answer_cache_similarity = "0.95"
+    max_concurrent_llm_calls = "4"  # per batch of queries
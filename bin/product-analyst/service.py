@@ -0,0 +1,343 @@
+from __future__ import annotations
+from asyncio import run, sleep
+from dotenv import load_dotenv
+from os import getenv
+from envvars import EnvVars, Defaults
+
+from sbilifeco.gateways.qdrant import QdrantGateway
+from sbilifeco.gateways.file_system_chromadb import FileSystemChromDB
+from sbilifeco.gateways.readers.pdf.docling_reader import DoclingReader
+from sbilifeco.gateways.sqlite_entity_repo import SQLiteEntityRepo
+from sbilifeco.flows.product_analyst.ingest_flow import IngestFlow
+from sbilifeco.flows.product_analyst.query_flow import IStreamingLLM, QueryFlow
+from sbilifeco.flows.product_analyst.embedding_cache import EmbeddingCache
+from sbilifeco.flows.product_analyst.answer_cache import AnswerCache
+from sbilifeco.cp.product_analyst.ingest_flow.http_server import IngestFlowHttpServer
+from sbilifeco.cp.product_analyst.query_flow.http_server import QueryFlowHttpServer
+from sbilifeco.cp.llm.http_client import LLMHttpClient
+
+
+class ProductAnalystMicroservice:
+    """
+    Runs the ingest and query flows in one process, calling the material reader,
+    vector store and entity repo directly instead of through their HTTP services.
+    Only the LLM is still reached over HTTP.
+    """
+
+    @staticmethod
+    def optional_flag(value: str) -> bool | None:
+        value = value.strip().lower()
+        return value == "true" if value else None
+
+    async def run(self) -> None:
+        # Env vars
+        ingest_flow_http_port = int(
+            getenv(EnvVars.ingest_flow_http_port, Defaults.ingest_flow_http_port)
+        )
+        query_flow_http_port = int(
+            getenv(EnvVars.query_flow_http_port, Defaults.query_flow_http_port)
+        )
+        vector_store = (
+            getenv(EnvVars.vector_store, Defaults.vector_store).strip().lower()
+        )
+        qdrant_url = getenv(EnvVars.qdrant_url, Defaults.qdrant_url)
+        chromadb_path = getenv(EnvVars.chromadb_path, Defaults.chromadb_path)
+        collection_name = getenv(EnvVars.collection_name, Defaults.collection_name)
+        upsert_batch_size = int(
+            getenv(EnvVars.upsert_batch_size, Defaults.upsert_batch_size)
+        )
+        db_path = getenv(EnvVars.db_path, Defaults.db_path)
+        doclingserve_proto = getenv(
+            EnvVars.doclingserve_proto, Defaults.doclingserve_proto
+        )
+        doclingserve_host = getenv(
+            EnvVars.doclingserve_host, Defaults.doclingserve_host
+        )
+        doclingserve_port = int(
+            getenv(EnvVars.doclingserve_port, Defaults.doclingserve_port)
+        )
+        incremental_parsing = (
+            getenv(EnvVars.incremental_parsing, Defaults.incremental_parsing)
+            .strip()
+            .lower()
+            == "true"
+        )
+        chunks_ttl = float(getenv(EnvVars.chunks_ttl, Defaults.chunks_ttl))
+        max_materials = int(getenv(EnvVars.max_materials, Defaults.max_materials))
+        llm_proto = getenv(EnvVars.llm_proto, Defaults.llm_proto)
+        llm_host = getenv(EnvVars.llm_host, Defaults.llm_host)
+        llm_port = int(getenv(EnvVars.llm_port, Defaults.llm_port))
+        spool_threshold = int(getenv(EnvVars.spool_threshold, Defaults.spool_threshold))
+        batch_size = int(getenv(EnvVars.batch_size, Defaults.batch_size))
+        pipelined = (
+            getenv(EnvVars.pipelined, Defaults.pipelined).strip().lower() == "true"
+        )
+        vectorise_concurrency = int(
+            getenv(EnvVars.vectorise_concurrency, Defaults.vectorise_concurrency)
+        )
+        store_concurrency = int(
+            getenv(EnvVars.store_concurrency, Defaults.store_concurrency)
+        )
+        max_in_flight_chunks = int(
+            getenv(EnvVars.max_in_flight_chunks, Defaults.max_in_flight_chunks)
+        )
+        deduplication = (
+            getenv(EnvVars.deduplication, Defaults.deduplication).strip().lower()
+            == "true"
+        )
+        replace_previous_versions = (
+            getenv(
+                EnvVars.replace_previous_versions, Defaults.replace_previous_versions
+            )
+            .strip()
+            .lower()
+            == "true"
+        )
+        embedding_model_id = getenv(
+            EnvVars.embedding_model_id, Defaults.embedding_model_id
+        )
+        embedding_cache_size = int(
+            getenv(EnvVars.embedding_cache_size, Defaults.embedding_cache_size)
+        )
+        embedding_cache_ttl = float(
+            getenv(EnvVars.embedding_cache_ttl, Defaults.embedding_cache_ttl)
+        )
+        embedding_cache_path = getenv(
+            EnvVars.embedding_cache_path, Defaults.embedding_cache_path
+        )
+        answer_cache_size = int(
+            getenv(EnvVars.answer_cache_size, Defaults.answer_cache_size)
+        )
+        answer_cache_ttl = float(
+            getenv(EnvVars.answer_cache_ttl, Defaults.answer_cache_ttl)
+        )
+        answer_cache_similarity = float(
+            getenv(EnvVars.answer_cache_similarity, Defaults.answer_cache_similarity)
+        )
+        max_concurrent_llm_calls = int(
+            getenv(EnvVars.max_concurrent_llm_calls, Defaults.max_concurrent_llm_calls)
+        )
+
+        # Gateways
+        self.vector_gateway = await self._create_vector_gateway(
+            vector_store, qdrant_url, chromadb_path, collection_name, upsert_batch_size
+        )
+
+        self.id_name_repo = SQLiteEntityRepo().set_path(db_path)
+        await self.id_name_repo.async_init()
+
+        self.material_reader = DoclingReader()
+        (
+            self.material_reader.set_doclingserve_proto(doclingserve_proto)
+            .set_doclingserve_host(doclingserve_host)
+            .set_doclingserve_port(doclingserve_port)
+            .set_incremental_parsing(incremental_parsing)
+            .set_chunks_ttl(chunks_ttl)
+            .set_max_materials(max_materials)
+        )
+        await self.material_reader.async_init()
+
+        llm_client = LLMHttpClient()
+        (llm_client.set_proto(llm_proto).set_host(llm_host).set_port(llm_port))
+        if not isinstance(llm_client, IStreamingLLM):
+            # The LLM service has no streaming API yet. Streamed answers still send their
+            # sources first, but the reply only follows, as one token, once it is generated.
+            print(
+                "LLM client cannot stream replies, so streamed answers arrive whole",
+                flush=True,
+            )
+
+        # Caches
+        self.embedding_cache: EmbeddingCache | None = None
+        if embedding_cache_size > 0:
+            self.embedding_cache = EmbeddingCache()
+            (
+                self.embedding_cache.set_max_entries(embedding_cache_size)
+                .set_ttl(embedding_cache_ttl)
+                .set_path(embedding_cache_path)
+            )
+            await self.embedding_cache.async_init()
+
+        self.answer_cache: AnswerCache | None = None
+        if answer_cache_size > 0:
+            self.answer_cache = AnswerCache()
+            (
+                self.answer_cache.set_max_entries(answer_cache_size)
+                .set_ttl(answer_cache_ttl)
+                .set_similarity_threshold(answer_cache_similarity)
+            )
+
+        # Flows
+        self.ingest_flow = IngestFlow()
+        (
+            self.ingest_flow.set_material_reader(self.material_reader)
+            .set_vectoriser(self.vector_gateway)
+            .set_vector_repo(self.vector_gateway)
+            .set_id_name_repo(self.id_name_repo)
+            .set_batch_size(batch_size)
+            .set_pipelined(pipelined)
+            .set_vectorise_concurrency(vectorise_concurrency)
+            .set_store_concurrency(store_concurrency)
+            .set_max_in_flight_chunks(max_in_flight_chunks)
+            .set_deduplication(deduplication)
+            .set_replace_previous_versions(replace_previous_versions)
+        )
+        if self.answer_cache is not None:
+            # Answers citing a material are dropped as soon as it is re-ingested
+            self.ingest_flow.add_listener(self.answer_cache)
+        await self.ingest_flow.async_init()
+
+        self.query_flow = QueryFlow()
+        (
+            self.query_flow.set_llm(llm_client)
+            .set_vectoriser(self.vector_gateway)
+            .set_vector_repo(self.vector_gateway)
+            .set_embedding_cache(self.embedding_cache)
+            .set_embedding_model_id(embedding_model_id)
+            .set_answer_cache(self.answer_cache)
+            .set_max_concurrent_llm_calls(max_concurrent_llm_calls)
+        )
+        await self.query_flow.async_init()
+
+        # Controllers and presenters
+        self.ingest_flow_http_server = IngestFlowHttpServer()
+        (
+            self.ingest_flow_http_server.set_ingest_flow(self.ingest_flow)
+            .set_spool_threshold(spool_threshold)
+            .set_http_port(ingest_flow_http_port)
+        )
+        await self.ingest_flow_http_server.listen()
+
+        self.query_flow_http_server = QueryFlowHttpServer()
+        (
+            self.query_flow_http_server.set_query_flow(self.query_flow).set_http_port(
+                query_flow_http_port
+            )
+        )
+        await self.query_flow_http_server.listen()
+
+    async def _create_vector_gateway(
+        self,
+        vector_store: str,
+        qdrant_url: str,
+        chromadb_path: str,
+        collection_name: str,
+        upsert_batch_size: int,
+    ) -> QdrantGateway | FileSystemChromDB:
+        # Tuned through the same env vars as the qdrant-gateway and chromadb-gateway services
+        embedding_threads = int(
+            getenv(EnvVars.embedding_threads, Defaults.embedding_threads)
+        )
+        vectorise_batch_size = int(
+            getenv(EnvVars.vectorise_batch_size, Defaults.vectorise_batch_size)
+        )
+        vectorise_batch_wait_ms = float(
+            getenv(EnvVars.vectorise_batch_wait_ms, Defaults.vectorise_batch_wait_ms)
+        )
+
+        if vector_store == "qdrant":
+            qdrant_gateway = QdrantGateway()
+            (
+                qdrant_gateway.set_url(qdrant_url)
+                .set_collection_name(collection_name)
+                .set_upsert_batch_size(upsert_batch_size)
+                .set_embedding_threads(embedding_threads)
+                .set_vectorise_batch_size(vectorise_batch_size)
+                .set_vectorise_batch_wait_ms(vectorise_batch_wait_ms)
+            )
+            self._configure_qdrant_gateway(qdrant_gateway)
+            await qdrant_gateway.async_init()
+            return qdrant_gateway
+        elif vector_store == "chromadb":
+            io_threads = int(getenv(EnvVars.io_threads, Defaults.io_threads))
+
+            chromadb_gateway = FileSystemChromDB()
+            (
+                chromadb_gateway.set_db_path(chromadb_path)
+                .set_collection_name(collection_name)
+                .set_upsert_batch_size(upsert_batch_size)
+                .set_io_threads(io_threads)
+                .set_embedding_threads(embedding_threads)
+                .set_vectorise_batch_size(vectorise_batch_size)
+                .set_vectorise_batch_wait_ms(vectorise_batch_wait_ms)
+            )
+            await chromadb_gateway.async_init()
+            return chromadb_gateway
+
+        raise ValueError(f"Unknown vector store {vector_store}")
+
+    def _configure_qdrant_gateway(self, qdrant_gateway: QdrantGateway) -> None:
+        wait_for_bulk_upserts = (
+            getenv(EnvVars.wait_for_bulk_upserts, Defaults.wait_for_bulk_upserts)
+            .strip()
+            .lower()
+            == "true"
+        )
+        indexed_fields = [
+            indexed_field.strip()
+            for indexed_field in getenv(
+                EnvVars.indexed_fields, Defaults.indexed_fields
+            ).split(",")
+            if indexed_field.strip()
+        ]
+        embedding_processes = int(
+            getenv(EnvVars.embedding_processes, Defaults.embedding_processes)
+        )
+        threads_per_embedder = int(
+            getenv(EnvVars.threads_per_embedder, Defaults.threads_per_embedder)
+        )
+        hnsw_m = int(getenv(EnvVars.hnsw_m, Defaults.hnsw_m))
+        hnsw_ef_construct = int(
+            getenv(EnvVars.hnsw_ef_construct, Defaults.hnsw_ef_construct)
+        )
+        on_disk_vectors = self.optional_flag(
+            getenv(EnvVars.on_disk_vectors, Defaults.on_disk_vectors)
+        )
+        quantization = getenv(EnvVars.quantization, Defaults.quantization)
+        quantization_always_ram = self.optional_flag(
+            getenv(EnvVars.quantization_always_ram, Defaults.quantization_always_ram)
+        )
+        search_hnsw_ef = int(getenv(EnvVars.search_hnsw_ef, Defaults.search_hnsw_ef))
+        search_exact = (
+            getenv(EnvVars.search_exact, Defaults.search_exact).strip().lower()
+            == "true"
+        )
+        search_rescore = self.optional_flag(
+            getenv(EnvVars.search_rescore, Defaults.search_rescore)
+        )
+        search_oversampling = float(
+            getenv(EnvVars.search_oversampling, Defaults.search_oversampling)
+        )
+        sparse_model = getenv(EnvVars.sparse_model, Defaults.sparse_model)
+        hybrid_prefetch_factor = int(
+            getenv(EnvVars.hybrid_prefetch_factor, Defaults.hybrid_prefetch_factor)
+        )
+
+        (
+            qdrant_gateway.set_wait_for_bulk_upserts(wait_for_bulk_upserts)
+            .set_embedding_processes(embedding_processes)
+            .set_threads_per_embedder(threads_per_embedder)
+            .set_hnsw(hnsw_m, hnsw_ef_construct)
+            .set_on_disk_vectors(on_disk_vectors)
+            .set_quantization(quantization, quantization_always_ram)
+            .set_search_hnsw_ef(search_hnsw_ef)
+            .set_search_exact(search_exact)
+            .set_search_rescoring(search_rescore, search_oversampling)
+            .set_sparse_model(sparse_model)
+            .set_hybrid_prefetch_factor(hybrid_prefetch_factor)
+        )
+        for indexed_field in indexed_fields:
+            field_name, _, field_schema = indexed_field.partition(":")
+            qdrant_gateway.add_indexed_field(
+                field_name.strip(), field_schema.strip() or "keyword"
+            )
+
+    async def run_forever(self) -> None:
+        await self.run()
+        while True:
+            await sleep(5000)
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    run(ProductAnalystMicroservice().run_forever())
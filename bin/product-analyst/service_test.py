@@ -0,0 +1,105 @@
+import sys
+
+sys.path.append("./src")
+
+from os import getenv
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+from dotenv import load_dotenv
+from envvars import EnvVars, Defaults
+from faker import Faker
+from pprint import pprint
+
+# Import the necessary service(s) here
+from service import ProductAnalystMicroservice
+from sbilifeco.cp.product_analyst.ingest_flow.http_client import IngestFlowHttpClient
+from sbilifeco.cp.product_analyst.query_flow.http_client import QueryFlowHttpClient
+
+
+class Test(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        load_dotenv()
+
+        self.test_type = getenv(EnvVars.test_type, Defaults.test_type)
+        ingest_flow_http_port = int(
+            getenv(EnvVars.ingest_flow_http_port, Defaults.ingest_flow_http_port)
+        )
+        query_flow_http_port = int(
+            getenv(EnvVars.query_flow_http_port, Defaults.query_flow_http_port)
+        )
+        staging_host = getenv(EnvVars.staging_host, Defaults.staging_host)
+        host = staging_host if self.test_type == "staging" else "localhost"
+
+        # Initialise the service(s) here
+        self.faker = Faker()
+
+        if self.test_type == "unit":
+            self.service = ProductAnalystMicroservice()
+            await self.service.run()
+
+        # Initialise the client(s) here
+        self.ingest_flow_client = IngestFlowHttpClient()
+        (
+            self.ingest_flow_client.set_proto("http")
+            .set_host(host)
+            .set_port(ingest_flow_http_port)
+        )
+
+        self.query_flow_client = QueryFlowHttpClient()
+        (
+            self.query_flow_client.set_proto("http")
+            .set_host(host)
+            .set_port(query_flow_http_port)
+        )
+
+    async def asyncTearDown(self) -> None:
+        # Shutdown the service(s) here
+        # if self.test_type == "unit":
+        #     await self.service.async_shutdown()
+        patch.stopall()
+
+    async def test_ingest_and_search(self) -> None:
+        # Arrange
+        title = self.faker.sentence()
+        material = b""
+        with open(".local/brochure.pdf", "rb") as pdf_file:
+            material = pdf_file.read()
+
+        # Act
+        response = await self.ingest_flow_client.request_ingestion()
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        assert response.payload is not None
+        ingestion_request_id = response.payload
+
+        # Act
+        response = await self.ingest_flow_client.ingest(
+            ingestion_request_id, title, material
+        )
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+
+        # Act
+        response = await self.query_flow_client.request_search()
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        assert response.payload is not None
+        search_request_id = response.payload
+
+        # Act
+        response = await self.query_flow_client.search(
+            search_request_id, "Give me the details of the policy in tabulated form"
+        )
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        rated_answer = response.payload
+
+        assert rated_answer is not None
+        self.assertTrue(rated_answer.answer)
+        self.assertIn(title, [source.source for source in rated_answer.sources])
+
+        pprint(rated_answer.model_dump())
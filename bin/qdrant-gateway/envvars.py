@@ -5,6 +5,25 @@ class EnvVars:
     collection_name = "COLLECTION_NAME"
     vectoriser_http_port = "VECTORSER_HTTP_PORT"
     vector_repo_http_port = "VECTOR_REPO_HTTP_PORT"
+    upsert_batch_size = "UPSERT_BATCH_SIZE"
+    wait_for_bulk_upserts = "WAIT_FOR_BULK_UPSERTS"
+    indexed_fields = "INDEXED_FIELDS"
+    embedding_threads = "EMBEDDING_THREADS"
+    embedding_processes = "EMBEDDING_PROCESSES"
+    threads_per_embedder = "THREADS_PER_EMBEDDER"
+    vectorise_batch_size = "VECTORISE_BATCH_SIZE"
+    vectorise_batch_wait_ms = "VECTORISE_BATCH_WAIT_MS"
+    hnsw_m = "HNSW_M"
+    hnsw_ef_construct = "HNSW_EF_CONSTRUCT"
+    on_disk_vectors = "ON_DISK_VECTORS"
+    quantization = "QUANTIZATION"
+    quantization_always_ram = "QUANTIZATION_ALWAYS_RAM"
+    search_hnsw_ef = "SEARCH_HNSW_EF"
+    search_exact = "SEARCH_EXACT"
+    search_rescore = "SEARCH_RESCORE"
+    search_oversampling = "SEARCH_OVERSAMPLING"
+    sparse_model = "SPARSE_MODEL"
+    hybrid_prefetch_factor = "HYBRID_PREFETCH_FACTOR"
 
 
 class Defaults:
@@ -14,3 +33,22 @@ class Defaults:
     collection_name = "default"
     vectoriser_http_port = "80"
     vector_repo_http_port = "81"
+    upsert_batch_size = "256"
+    wait_for_bulk_upserts = "true"
+    indexed_fields = ""  # extra metadata fields as name[:type], comma separated
+    embedding_threads = "1"
+    embedding_processes = "0"  # 0 embeds in the service process
+    threads_per_embedder = "0"  # 0 leaves it to ONNX Runtime
+    vectorise_batch_size = "32"
+    vectorise_batch_wait_ms = "2"
+    hnsw_m = "0"  # 0 leaves Qdrant's default
+    hnsw_ef_construct = "0"  # 0 leaves Qdrant's default
+    on_disk_vectors = ""  # true, false or empty to leave as is
+    quantization = ""  # scalar, product, binary or empty for none
+    quantization_always_ram = ""  # true, false or empty to leave as is
+    search_hnsw_ef = "0"  # 0 leaves Qdrant's default
+    search_exact = "false"
+    search_rescore = ""  # true, false or empty to leave as is
+    search_oversampling = "0"  # 0 leaves Qdrant's default
+    sparse_model = ""  # e.g. Qdrant/bm25 for hybrid search, empty for dense only
+    hybrid_prefetch_factor = "4"
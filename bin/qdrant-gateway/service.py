@@ -1,16 +1,24 @@
 from asyncio import run, sleep
-from typing import NoReturn
+from typing import Any, NoReturn
 from dotenv import load_dotenv
 from os import getenv
 from envvars import EnvVars, Defaults
 
 # import required modules here
+from sbilifeco.models.base import Response
 from sbilifeco.gateways.qdrant import QdrantGateway
 from sbilifeco.cp.vector_repo.http_server import VectorRepoHttpServer
 from sbilifeco.cp.vectoriser.http_server import VectoriserHttpServer
 
 
 class QdrantGatewayMicroservice:
+    EXECUTOR_STATS_PATH = "/api/v1/executor-stats"  # GET
+
+    @staticmethod
+    def optional_flag(value: str) -> bool | None:
+        value = value.strip().lower()
+        return value == "true" if value else None
+
     async def run(self) -> None:
         # env
         qdrant_url = getenv(EnvVars.qdrant_url, Defaults.qdrant_url)
@@ -21,10 +29,90 @@ class QdrantGatewayMicroservice:
         vector_repo_http_server = int(
             getenv(EnvVars.vector_repo_http_port, Defaults.vector_repo_http_port)
         )
+        upsert_batch_size = int(
+            getenv(EnvVars.upsert_batch_size, Defaults.upsert_batch_size)
+        )
+        wait_for_bulk_upserts = (
+            getenv(EnvVars.wait_for_bulk_upserts, Defaults.wait_for_bulk_upserts)
+            .strip()
+            .lower()
+            == "true"
+        )
+        indexed_fields = [
+            indexed_field.strip()
+            for indexed_field in getenv(
+                EnvVars.indexed_fields, Defaults.indexed_fields
+            ).split(",")
+            if indexed_field.strip()
+        ]
+        embedding_threads = int(
+            getenv(EnvVars.embedding_threads, Defaults.embedding_threads)
+        )
+        embedding_processes = int(
+            getenv(EnvVars.embedding_processes, Defaults.embedding_processes)
+        )
+        threads_per_embedder = int(
+            getenv(EnvVars.threads_per_embedder, Defaults.threads_per_embedder)
+        )
+        vectorise_batch_size = int(
+            getenv(EnvVars.vectorise_batch_size, Defaults.vectorise_batch_size)
+        )
+        vectorise_batch_wait_ms = float(
+            getenv(EnvVars.vectorise_batch_wait_ms, Defaults.vectorise_batch_wait_ms)
+        )
+        hnsw_m = int(getenv(EnvVars.hnsw_m, Defaults.hnsw_m))
+        hnsw_ef_construct = int(
+            getenv(EnvVars.hnsw_ef_construct, Defaults.hnsw_ef_construct)
+        )
+        on_disk_vectors = self.optional_flag(
+            getenv(EnvVars.on_disk_vectors, Defaults.on_disk_vectors)
+        )
+        quantization = getenv(EnvVars.quantization, Defaults.quantization)
+        quantization_always_ram = self.optional_flag(
+            getenv(EnvVars.quantization_always_ram, Defaults.quantization_always_ram)
+        )
+        search_hnsw_ef = int(getenv(EnvVars.search_hnsw_ef, Defaults.search_hnsw_ef))
+        search_exact = (
+            getenv(EnvVars.search_exact, Defaults.search_exact).strip().lower()
+            == "true"
+        )
+        search_rescore = self.optional_flag(
+            getenv(EnvVars.search_rescore, Defaults.search_rescore)
+        )
+        search_oversampling = float(
+            getenv(EnvVars.search_oversampling, Defaults.search_oversampling)
+        )
+        sparse_model = getenv(EnvVars.sparse_model, Defaults.sparse_model)
+        hybrid_prefetch_factor = int(
+            getenv(EnvVars.hybrid_prefetch_factor, Defaults.hybrid_prefetch_factor)
+        )
 
         # gateways
         qdrant_gateway = QdrantGateway()
-        qdrant_gateway.set_url(qdrant_url).set_collection_name(collection_name)
+        (
+            qdrant_gateway.set_url(qdrant_url)
+            .set_collection_name(collection_name)
+            .set_upsert_batch_size(upsert_batch_size)
+            .set_wait_for_bulk_upserts(wait_for_bulk_upserts)
+            .set_embedding_threads(embedding_threads)
+            .set_embedding_processes(embedding_processes)
+            .set_threads_per_embedder(threads_per_embedder)
+            .set_vectorise_batch_size(vectorise_batch_size)
+            .set_vectorise_batch_wait_ms(vectorise_batch_wait_ms)
+            .set_hnsw(hnsw_m, hnsw_ef_construct)
+            .set_on_disk_vectors(on_disk_vectors)
+            .set_quantization(quantization, quantization_always_ram)
+            .set_search_hnsw_ef(search_hnsw_ef)
+            .set_search_exact(search_exact)
+            .set_search_rescoring(search_rescore, search_oversampling)
+            .set_sparse_model(sparse_model)
+            .set_hybrid_prefetch_factor(hybrid_prefetch_factor)
+        )
+        for indexed_field in indexed_fields:
+            field_name, _, field_schema = indexed_field.partition(":")
+            qdrant_gateway.add_indexed_field(
+                field_name.strip(), field_schema.strip() or "keyword"
+            )
 
         # http service
         vectoriser_http_server = (
@@ -33,6 +121,14 @@ class QdrantGatewayMicroservice:
             .set_http_port(vectoriser_http_server)
         )
 
+        # Queue depths of the embedding pools, for spotting saturation
+        @vectoriser_http_server.get(self.EXECUTOR_STATS_PATH)
+        async def get_executor_stats() -> Response[list[dict[str, Any]]]:
+            try:
+                return Response.ok(qdrant_gateway.executor_stats())
+            except Exception as e:
+                return Response.error(e)
+
         vector_repo_http_server = (
             VectorRepoHttpServer()
             .set_vector_repo(qdrant_gateway)
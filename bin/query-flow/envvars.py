@@ -11,6 +11,15 @@ class EnvVars:
     vector_repo_proto = "VECTOR_REPO_PROTO"
     vector_repo_host = "VECTOR_REPO_HOST"
     vector_repo_port = "VECTOR_REPO_PORT"
+    packed_vectors = "PACKED_VECTORS"
+    embedding_model_id = "EMBEDDING_MODEL_ID"
+    embedding_cache_size = "EMBEDDING_CACHE_SIZE"
+    embedding_cache_ttl = "EMBEDDING_CACHE_TTL"
+    embedding_cache_path = "EMBEDDING_CACHE_PATH"
+    answer_cache_size = "ANSWER_CACHE_SIZE"
+    answer_cache_ttl = "ANSWER_CACHE_TTL"
+    answer_cache_similarity = "ANSWER_CACHE_SIMILARITY"
+    max_concurrent_llm_calls = "MAX_CONCURRENT_LLM_CALLS"
 
 
 class Defaults:
@@ -26,3 +35,12 @@ class Defaults:
     vector_repo_proto = "http"
     vector_repo_host = "localhost"
     vector_repo_port = "80"
+    packed_vectors = "true"
+    embedding_model_id = "default"
+    embedding_cache_size = "1024"  # 0 disables the cache
+    embedding_cache_ttl = "86400"
+    embedding_cache_path = ""  # empty keeps the cache in memory only
+    answer_cache_size = "256"  # 0 disables the cache
+    answer_cache_ttl = "3600"
+    answer_cache_similarity = "0.95"
+    max_concurrent_llm_calls = "4"  # per batch of queries
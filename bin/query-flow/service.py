@@ -3,7 +3,9 @@ from dotenv import load_dotenv
 from os import getenv
 
 from envvars import EnvVars, Defaults
-from sbilifeco.flows.product_analyst.query_flow import QueryFlow
+from sbilifeco.flows.product_analyst.query_flow import IStreamingLLM, QueryFlow
+from sbilifeco.flows.product_analyst.embedding_cache import EmbeddingCache
+from sbilifeco.flows.product_analyst.answer_cache import AnswerCache
 from sbilifeco.cp.product_analyst.query_flow.http_server import QueryFlowHttpServer
 from sbilifeco.cp.llm.http_client import LLMHttpClient
 from sbilifeco.cp.vectoriser.http_client import VectoriserHttpClient
@@ -27,16 +29,52 @@ class QueryFlowMicroservice:
         vector_repo_port = int(
             getenv(EnvVars.vector_repo_port, Defaults.vector_repo_port)
         )
+        packed_vectors = (
+            getenv(EnvVars.packed_vectors, Defaults.packed_vectors).strip().lower()
+            == "true"
+        )
+        embedding_model_id = getenv(
+            EnvVars.embedding_model_id, Defaults.embedding_model_id
+        )
+        embedding_cache_size = int(
+            getenv(EnvVars.embedding_cache_size, Defaults.embedding_cache_size)
+        )
+        embedding_cache_ttl = float(
+            getenv(EnvVars.embedding_cache_ttl, Defaults.embedding_cache_ttl)
+        )
+        embedding_cache_path = getenv(
+            EnvVars.embedding_cache_path, Defaults.embedding_cache_path
+        )
+        answer_cache_size = int(
+            getenv(EnvVars.answer_cache_size, Defaults.answer_cache_size)
+        )
+        answer_cache_ttl = float(
+            getenv(EnvVars.answer_cache_ttl, Defaults.answer_cache_ttl)
+        )
+        answer_cache_similarity = float(
+            getenv(EnvVars.answer_cache_similarity, Defaults.answer_cache_similarity)
+        )
+        max_concurrent_llm_calls = int(
+            getenv(EnvVars.max_concurrent_llm_calls, Defaults.max_concurrent_llm_calls)
+        )
 
         # Services
         llm_client = LLMHttpClient()
         (llm_client.set_proto(llm_proto).set_host(llm_host).set_port(llm_port))
+        if not isinstance(llm_client, IStreamingLLM):
+            # The LLM service has no streaming API yet. Streamed answers still send their
+            # sources first, but the reply only follows, as one token, once it is generated.
+            print(
+                "LLM client cannot stream replies, so streamed answers arrive whole",
+                flush=True,
+            )
 
         vectoriser_client = VectoriserHttpClient()
         (
             vectoriser_client.set_proto(vectoriser_proto)
             .set_host(vectoriser_host)
             .set_port(vectoriser_port)
+            .set_packed_vectors(packed_vectors)
         )
 
         vector_repo_client = VectorRepoHttpClient()
@@ -44,13 +82,37 @@ class QueryFlowMicroservice:
             vector_repo_client.set_proto(vector_repo_proto)
             .set_host(vector_repo_host)
             .set_port(vector_repo_port)
+            .set_packed_vectors(packed_vectors)
         )
 
+        self.embedding_cache: EmbeddingCache | None = None
+        if embedding_cache_size > 0:
+            self.embedding_cache = EmbeddingCache()
+            (
+                self.embedding_cache.set_max_entries(embedding_cache_size)
+                .set_ttl(embedding_cache_ttl)
+                .set_path(embedding_cache_path)
+            )
+            await self.embedding_cache.async_init()
+
+        self.answer_cache: AnswerCache | None = None
+        if answer_cache_size > 0:
+            self.answer_cache = AnswerCache()
+            (
+                self.answer_cache.set_max_entries(answer_cache_size)
+                .set_ttl(answer_cache_ttl)
+                .set_similarity_threshold(answer_cache_similarity)
+            )
+
         self.query_flow = QueryFlow()
         (
             self.query_flow.set_llm(llm_client)
             .set_vectoriser(vectoriser_client)
             .set_vector_repo(vector_repo_client)
+            .set_embedding_cache(self.embedding_cache)
+            .set_embedding_model_id(embedding_model_id)
+            .set_answer_cache(self.answer_cache)
+            .set_max_concurrent_llm_calls(max_concurrent_llm_calls)
         )
         await self.query_flow.async_init()
 
@@ -1,7 +1,10 @@
 from __future__ import annotations
 from io import BufferedIOBase, IOBase, RawIOBase, TextIOBase
 from sbilifeco.boundaries.id_name_repo import IDNameEntity, SortDirection, SortField
-from sbilifeco.boundaries.product_analyst.ingest_flow import BaseIngestFlow
+from sbilifeco.boundaries.product_analyst.ingest_flow import (
+    BaseIngestFlow,
+    IngestionStatus,
+)
 from sbilifeco.cp.common.http.client import HttpClient, Request
 from sbilifeco.models.base import Response
 from sbilifeco.cp.product_analyst.ingest_flow.paths import (
@@ -16,6 +19,39 @@ class IngestFlowHttpClient(HttpClient, BaseIngestFlow):
     def __init__(self) -> None:
         HttpClient.__init__(self)
 
+    def _material_request(
+        self,
+        url: str,
+        title: str,
+        source: str | bytes | bytearray | TextIOBase | BufferedIOBase | RawIOBase,
+    ) -> Request:
+        content_type = ""
+        triaged_source: str | bytes | IOBase = ""
+
+        if isinstance(source, (str, TextIOBase)):
+            content_type = "text/plain; charset-utf-8"
+        elif isinstance(source, (bytes, bytearray, IOBase)):
+            content_type = "application/octet-stream"
+
+        if isinstance(source, (str, bytes)):
+            triaged_source = source
+        elif isinstance(source, bytearray):
+            triaged_source = bytes(source)
+        elif isinstance(source, TextIOBase):
+            triaged_source = source.read()
+        elif isinstance(source, IOBase):
+            # Binary files are handed to the multipart encoder as they are
+            triaged_source = source
+
+        return Request(
+            url=url,
+            method="POST",
+            data={"title": title},
+            files={
+                "material": ("material", triaged_source, content_type),
+            },
+        )
+
     async def request_ingestion(self) -> Response[str]:
         try:
             # Form request
@@ -42,30 +78,29 @@ class IngestFlowHttpClient(HttpClient, BaseIngestFlow):
         try:
             # Form request
             url = f"{self.url_base}{IngestFlowPaths.BY_ID.format(ingest_request_id=ingestion_request)}"
+            req = self._material_request(url, title, source)
 
-            content_type = ""
-            triaged_source: str | bytes = ""
+            # Send request
+            response = await self.request_as_model(req)
 
-            if isinstance(source, (str, TextIOBase)):
-                content_type = "text/plain; charset-utf-8"
-            elif isinstance(source, (bytes, bytearray, BufferedIOBase, RawIOBase)):
-                content_type = "application/octet-stream"
+            # Triage response
+            ...
 
-            if isinstance(source, (str, bytes)):
-                triaged_source = source
-            elif isinstance(source, bytearray):
-                triaged_source = bytes(source)
-            elif isinstance(source, IOBase):
-                triaged_source = source.read()
+            # Return response
+            return response
+        except Exception as e:
+            return Response.error(e)
 
-            req = Request(
-                url=url,
-                method="POST",
-                data={"title": title},
-                files={
-                    "material": ("material", triaged_source, content_type),
-                },
-            )
+    async def start_ingestion(
+        self,
+        ingestion_request: str,
+        title: str,
+        source: str | bytes | bytearray | TextIOBase | BufferedIOBase | RawIOBase,
+    ) -> Response[None]:
+        try:
+            # Form request
+            url = f"{self.url_base}{IngestFlowPaths.BACKGROUND.format(ingest_request_id=ingestion_request)}"
+            req = self._material_request(url, title, source)
 
             # Send request
             response = await self.request_as_model(req)
@@ -78,6 +113,26 @@ class IngestFlowHttpClient(HttpClient, BaseIngestFlow):
         except Exception as e:
             return Response.error(e)
 
+    async def get_ingestion_status(
+        self, ingestion_request: str
+    ) -> Response[IngestionStatus]:
+        try:
+            # Form request
+            url = f"{self.url_base}{IngestFlowPaths.STATUS.format(ingest_request_id=ingestion_request)}"
+            req = Request(method="GET", url=url)
+
+            # Send request
+            res = await self.request_as_model(req)
+
+            # Triage response
+            if res.payload is not None:
+                res.payload = IngestionStatus.model_validate(res.payload)
+
+            # Return response
+            return res
+        except Exception as e:
+            return Response.error(e)
+
     async def get_materials(
         self,
         page_size: int = -1,
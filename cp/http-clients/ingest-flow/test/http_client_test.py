@@ -2,6 +2,7 @@ import sys
 
 sys.path.append("./src")
 
+from io import BytesIO
 from os import getenv
 from unittest import IsolatedAsyncioTestCase
 from unittest.mock import AsyncMock, patch
@@ -16,6 +17,8 @@ from sbilifeco.models.base import Response
 from sbilifeco.boundaries.product_analyst.ingest_flow import (
     BaseIngestFlow,
     IDNameEntity,
+    IngestionState,
+    IngestionStatus,
     SortField,
     SortDirection,
 )
@@ -76,6 +79,64 @@ class Test(IsolatedAsyncioTestCase):
 
         ingest.assert_called_once_with(request_id, title, material)
 
+    async def test_start_ingestion(self) -> None:
+        # Arrange
+        request_id = uuid4().hex
+        title = " ".join(self.faker.words(4))
+        material = self.faker.paragraph()
+        start_ingestion = patch.object(
+            self.ingest_flow, "start_ingestion", return_value=Response.ok(None)
+        ).start()
+
+        # Act
+        response = await self.client.start_ingestion(request_id, title, material)
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+
+        start_ingestion.assert_called_once_with(request_id, title, material)
+
+    async def test_failed_start_ingestion_closes_material(self) -> None:
+        # Arrange
+        start_ingestion = patch.object(
+            self.ingest_flow,
+            "start_ingestion",
+            return_value=Response.fail("Ingestion already started", 409),
+        ).start()
+
+        # Act
+        response = await self.client.start_ingestion(
+            uuid4().hex, self.faker.sentence(), BytesIO(self.faker.binary(1024))
+        )
+
+        # Assert
+        self.assertEqual(response.code, 409)
+        self.assertTrue(start_ingestion.call_args.args[2].closed)
+
+    async def test_get_ingestion_status(self) -> None:
+        # Arrange
+        request_id = uuid4().hex
+        status = IngestionStatus(
+            state=IngestionState.RUNNING,
+            title=" ".join(self.faker.words(4)),
+            chunks_read=randint(10, 20),
+            chunks_vectorised=randint(5, 10),
+            chunks_stored=randint(0, 5),
+            requested_at=self.faker.date_time_this_year(),
+        )
+        get_ingestion_status = patch.object(
+            self.ingest_flow, "get_ingestion_status", return_value=Response.ok(status)
+        ).start()
+
+        # Act
+        response = await self.client.get_ingestion_status(request_id)
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+
+        get_ingestion_status.assert_called_once_with(request_id)
+        self.assertEqual(response.payload, status)
+
     async def test_get_materials(self) -> None:
         # Arrange
         request_id = uuid4().hex
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-from io import BufferedIOBase, RawIOBase, TextIOBase
+from io import BufferedIOBase, IOBase, RawIOBase, TextIOBase
 from typing import AsyncIterator
 from traceback import format_exc
-from requests import Session
-from functools import partial
-from asyncio import get_running_loop
+from asyncio import AbstractEventLoop, get_running_loop, to_thread
+from httpx import AsyncClient, Limits, Timeout
 
 from sbilifeco.boundaries.material_reader import BaseMaterialReader
 from sbilifeco.cp.common.http.client import HttpClient, Request
@@ -14,6 +13,62 @@ from sbilifeco.cp.material_reader.paths import MaterialReaderPaths
 
 
 class MaterialReaderHttpClient(HttpClient, BaseMaterialReader):
+    DEFAULT_READ_SIZE = 64 * 1024
+    DEFAULT_MAX_CONNECTIONS = 8
+    DEFAULT_CONNECT_TIMEOUT = 10.0
+
+    def __init__(self) -> None:
+        HttpClient.__init__(self)
+        BaseMaterialReader.__init__(self)
+        self.read_size = self.DEFAULT_READ_SIZE
+        self.max_connections = self.DEFAULT_MAX_CONNECTIONS
+        self.stream_timeout: float | None = None
+        self.stream_pool: AsyncClient | None = None
+        self.stream_pool_loop: AbstractEventLoop | None = None
+
+    def set_read_size(self, read_size: int) -> MaterialReaderHttpClient:
+        """Number of bytes to read off the wire per streamed chunk."""
+        self.read_size = read_size
+        return self
+
+    def set_max_connections(self, max_connections: int) -> MaterialReaderHttpClient:
+        """Size of the keep-alive connection pool to the material reader."""
+        self.max_connections = max_connections
+        return self
+
+    def set_stream_timeout(self, seconds: float | None) -> MaterialReaderHttpClient:
+        """Timeout for reading the chunk stream. None waits as long as the reader takes. Connecting, writing and waiting for a pooled connection stay bounded regardless."""
+        self.stream_timeout = seconds
+        return self
+
+    async def async_shutdown(self) -> None:
+        if self.stream_pool is not None:
+            await self.stream_pool.aclose()
+            self.stream_pool = None
+            self.stream_pool_loop = None
+
+    def _get_stream_pool(self) -> AsyncClient:
+        # The pool is bound to the event loop it was created in
+        loop = get_running_loop()
+        if self.stream_pool is None or self.stream_pool_loop is not loop:
+            self.stream_pool = AsyncClient(
+                limits=Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                # Only reads wait on the reader, so a dead host still fails fast
+                timeout=Timeout(self.DEFAULT_CONNECT_TIMEOUT, read=self.stream_timeout),
+            )
+            self.stream_pool_loop = loop
+        return self.stream_pool
+
+    async def _iter_file(
+        self, material: RawIOBase | BufferedIOBase | TextIOBase
+    ) -> AsyncIterator[bytes]:
+        # Spooled uploads may have rolled over to disk, so reads stay off the event loop
+        while piece := await to_thread(material.read, self.read_size):
+            yield piece.encode() if isinstance(piece, str) else piece
+
     async def read_material(
         self,
         material: str | bytes | bytearray | RawIOBase | BufferedIOBase | TextIOBase,
@@ -23,19 +78,20 @@ class MaterialReaderHttpClient(HttpClient, BaseMaterialReader):
             url = f"{self.url_base}{MaterialReaderPaths.BASE}"
 
             content_type = ""
-            to_be_posted: str | bytes | bytearray = ""
+            to_be_posted: str | bytes | bytearray | IOBase = ""
             if isinstance(material, (bytes, bytearray)):
                 to_be_posted = material
                 content_type = "application/octet-stream"
             elif isinstance(material, str):
                 to_be_posted = material
                 content_type = "text/plain; charset=utf-8"
-            elif isinstance(material, (RawIOBase, BufferedIOBase)):
-                content_type = "application/octet-stream"
-                to_be_posted = material.read()
             elif isinstance(material, TextIOBase):
                 content_type = "text/plain; charset-utf-8"
                 to_be_posted = material.read()
+            elif isinstance(material, IOBase):
+                # Binary file-likes are streamed as the request body
+                content_type = "application/octet-stream"
+                to_be_posted = material
 
             req = Request(
                 url=url,
@@ -72,6 +128,27 @@ class MaterialReaderHttpClient(HttpClient, BaseMaterialReader):
         except Exception as e:
             return Response.error(e)
 
+    async def read_next_chunks(
+        self, material_id: str, max_chunks: int
+    ) -> Response[list[str | bytes | bytearray]]:
+        try:
+            # Form
+            url = f"{self.url_base}{MaterialReaderPaths.NEXT_CHUNKS.format(material_id=material_id)}"
+
+            req = Request(
+                url=url,
+                method="GET",
+                params={"max_chunks": max_chunks},
+            )
+
+            # Request
+            res = await self.request_as_model(req)
+
+            # Return
+            return res
+        except Exception as e:
+            return Response.error(e)
+
     async def read_and_chunk(
         self,
         material: str | bytes | bytearray | RawIOBase | BufferedIOBase | TextIOBase,
@@ -81,54 +158,50 @@ class MaterialReaderHttpClient(HttpClient, BaseMaterialReader):
             url = f"{self.url_base}{MaterialReaderPaths.STREAMS}"
 
             content_type = ""
-            to_be_posted: str | bytes | bytearray | None = None
+            to_be_posted: str | bytes | AsyncIterator[bytes] | None = None
             if isinstance(material, (bytes, bytearray)):
-                to_be_posted = material
+                to_be_posted = bytes(material)
                 content_type = "application/octet-stream"
             elif isinstance(material, str):
                 to_be_posted = material
                 content_type = "text/plain; charset=utf-8"
-            elif isinstance(material, (RawIOBase, BufferedIOBase)):
-                content_type = "application/octet-stream"
-                to_be_posted = material.read()
             elif isinstance(material, TextIOBase):
                 content_type = "text/plain; charset=utf-8"
-                to_be_posted = material.read()
+                to_be_posted = self._iter_file(material)
+            elif isinstance(material, IOBase):
+                # Spooled uploads are file-likes without deriving from BufferedIOBase
+                content_type = "application/octet-stream"
+                to_be_posted = self._iter_file(material)
 
             if not to_be_posted:
                 return Response.fail("Cannot determine the type of material provided")
 
-            req = Request(
-                url=url,
-                method="POST",
-                headers={"Content-Type": content_type},
-                data=to_be_posted,
-            )
-
-            # Send request
-            session = Session()
-            loop = get_running_loop()
-            http_response = await loop.run_in_executor(
-                None, partial(session.send, req.prepare(), stream=True)
+            # Send request. File-likes go out as a chunked body, never whole in memory
+            pool = self._get_stream_pool()
+            http_response = await pool.send(
+                pool.build_request(
+                    "POST",
+                    url,
+                    headers={"Content-Type": content_type},
+                    content=to_be_posted,
+                ),
+                stream=True,
             )
 
             # Triage response
-            if not http_response.ok:
+            if not http_response.is_success:
+                await http_response.aread()
+                await http_response.aclose()
                 return Response.fail(
                     f"Failed to read and chunk material: {http_response.status_code}: {http_response.text}"
                 )
 
             async def __stream():
-                iterator = http_response.iter_content(chunk_size=4096)
                 try:
-                    while True:
-                        chunk = await loop.run_in_executor(None, next, iterator, None)
-                        if chunk is None:
-                            break
+                    async for chunk in http_response.aiter_bytes(self.read_size):
                         yield chunk
                 finally:
-                    http_response.close()
-                    session.close()
+                    await http_response.aclose()
 
             # Return response
             return Response.ok(__stream())
@@ -3,6 +3,7 @@ import uuid
 
 sys.path.append("./src")
 
+from io import BytesIO
 from os import getenv
 from unittest import IsolatedAsyncioTestCase
 from unittest.mock import AsyncMock, patch
@@ -40,6 +41,7 @@ class Test(IsolatedAsyncioTestCase):
 
     async def asyncTearDown(self) -> None:
         # Shutdown the service(s) here
+        await self.client.async_shutdown()
         await self.service.stop()
         patch.stopall()
 
@@ -59,6 +61,19 @@ class Test(IsolatedAsyncioTestCase):
 
         read_material.assert_called_once_with(material)
 
+    async def test_read_material_closes_spooled_upload(self) -> None:
+        # Arrange
+        read_material = patch.object(
+            self.material_reader, "read_material", return_value=Response.ok(uuid4().hex)
+        ).start()
+
+        # Act
+        response = await self.client.read_material(BytesIO(self.faker.binary(1024)))
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        self.assertTrue(read_material.call_args.args[0].closed)
+
     async def test_read_next_chunk(self) -> None:
         # Arrange
         material_id = uuid4().hex
@@ -75,6 +90,25 @@ class Test(IsolatedAsyncioTestCase):
         self.assertTrue(response.is_success, response.message)
         assert response.payload is not None
 
+    async def test_read_next_chunks(self) -> None:
+        # Arrange
+        material_id = uuid4().hex
+        max_chunks = randint(2, 10)
+        chunks = [self.faker.text() for _ in range(max_chunks)]
+        read_next_chunks = patch.object(
+            self.material_reader,
+            "read_next_chunks",
+            return_value=Response.ok(chunks),
+        ).start()
+
+        # Act
+        response = await self.client.read_next_chunks(material_id, max_chunks)
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        self.assertEqual(response.payload, chunks)
+        read_next_chunks.assert_called_once_with(material_id, max_chunks)
+
     async def test_read_and_chunk(self) -> None:
         async def __stream_chunks():
             for _ in range(randint(1, 5)):
@@ -97,3 +131,62 @@ class Test(IsolatedAsyncioTestCase):
 
         async for chunk in response.payload:
             self.assertTrue(chunk)
+
+    async def test_read_and_chunk_read_size(self) -> None:
+        # Arrange
+        read_size = 64
+        chunks = [self.faker.text().encode("utf-8") for _ in range(randint(2, 5))]
+
+        async def __stream_chunks():
+            for chunk in chunks:
+                yield chunk
+
+        patch.object(
+            self.material_reader,
+            "read_and_chunk",
+            return_value=Response.ok(__stream_chunks()),
+        ).start()
+        self.client.set_read_size(read_size)
+
+        # Act
+        response = await self.client.read_and_chunk(self.faker.text())
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        assert response.payload is not None
+
+        streamed = [chunk async for chunk in response.payload]
+        self.assertTrue(all(len(chunk) <= read_size for chunk in streamed))
+        self.assertEqual(b"".join(streamed), b"".join(chunks))
+
+    async def test_failed_read_and_chunk_closes_spooled_upload(self) -> None:
+        # Arrange
+        material = self.faker.binary(1024)
+        read_and_chunk = patch.object(
+            self.material_reader,
+            "read_and_chunk",
+            return_value=Response.fail("Unreadable material", 422),
+        ).start()
+
+        # Act
+        response = await self.client.read_and_chunk(BytesIO(material))
+
+        # Assert
+        self.assertFalse(response.is_success)
+        spool = read_and_chunk.call_args.args[0]
+        self.assertTrue(spool.closed)
+
+    async def test_unbounded_stream_timeout_keeps_connect_bounded(self) -> None:
+        # Arrange
+        self.client.set_stream_timeout(None)
+
+        # Act
+        timeout = self.client._get_stream_pool().timeout
+
+        # Assert
+        self.assertIsNone(timeout.read)
+        self.assertEqual(
+            timeout.connect, MaterialReaderHttpClient.DEFAULT_CONNECT_TIMEOUT
+        )
+        self.assertIsNotNone(timeout.write)
+        self.assertIsNotNone(timeout.pool)
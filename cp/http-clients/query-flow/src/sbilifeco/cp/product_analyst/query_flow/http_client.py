@@ -1,21 +1,68 @@
-from typing import cast
+from __future__ import annotations
+from json import dumps
+from typing import Any, AsyncIterator, Sequence, cast
+from asyncio import AbstractEventLoop, get_running_loop
+from httpx import AsyncClient, Timeout
 from sbilifeco.cp.common.http.client import HttpClient, Request
 from sbilifeco.cp.product_analyst.query_flow.paths import QueryFlowPaths
 from sbilifeco.boundaries.product_analyst.query_flow import (
     BaseQueryFlow,
     RatedAnswer,
+    RatedAnswerChunk,
     RatedSource,
 )
 from sbilifeco.models.base import Response
 
 
 class QueryFlowHttpClient(HttpClient, BaseQueryFlow):
+    DEFAULT_CONNECT_TIMEOUT = 10.0
+
     def __init__(self):
         BaseQueryFlow.__init__(self)
         HttpClient.__init__(self)
         self.proto = "http"
         self.host = "localhost"
         self.port = 80
+        self.stream_timeout: float | None = None
+        self.stream_pool: AsyncClient | None = None
+        self.stream_pool_loop: AbstractEventLoop | None = None
+
+    def set_stream_timeout(self, seconds: float | None) -> QueryFlowHttpClient:
+        """Timeout for reading the answer stream. None waits as long as the LLM takes."""
+        self.stream_timeout = seconds
+        return self
+
+    async def async_shutdown(self) -> None:
+        if self.stream_pool is not None:
+            await self.stream_pool.aclose()
+            self.stream_pool = None
+            self.stream_pool_loop = None
+
+    def _get_stream_pool(self) -> AsyncClient:
+        # The pool is bound to the event loop it was created in
+        loop = get_running_loop()
+        if self.stream_pool is None or self.stream_pool_loop is not loop:
+            self.stream_pool = AsyncClient(
+                # Only reading the stream may take unbounded time
+                timeout=Timeout(self.DEFAULT_CONNECT_TIMEOUT, read=self.stream_timeout)
+            )
+            self.stream_pool_loop = loop
+        return self.stream_pool
+
+    @staticmethod
+    def _search_params(
+        num_results: int, criteria: dict[str, Any] | None
+    ) -> dict[str, Any]:
+        params: dict[str, Any] = {"num_results": num_results}
+        if criteria:
+            # Sets are not JSON, but match the same as lists
+            params["criteria"] = dumps(
+                {
+                    key: list(value) if isinstance(value, (set, tuple)) else value
+                    for key, value in criteria.items()
+                }
+            )
+        return params
 
     async def request_search(self) -> Response[str]:
         try:
@@ -38,7 +85,11 @@ class QueryFlowHttpClient(HttpClient, BaseQueryFlow):
             return Response.error(e)
 
     async def search(
-        self, search_request_id: str, query: str, num_results: int = 5
+        self,
+        search_request_id: str,
+        query: str,
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
     ) -> Response[RatedAnswer]:
         try:
             # Form request
@@ -48,6 +99,7 @@ class QueryFlowHttpClient(HttpClient, BaseQueryFlow):
                 method="POST",
                 headers={"Content-Type": "text/plain"},
                 data=query,
+                params=self._search_params(num_results, criteria),
             )
 
             # Call
@@ -64,3 +116,87 @@ class QueryFlowHttpClient(HttpClient, BaseQueryFlow):
             return res
         except Exception as e:
             return Response.error(e)
+
+    async def search_many(
+        self,
+        search_request_id: str,
+        queries: Sequence[str],
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
+    ) -> Response[list[RatedAnswer]]:
+        try:
+            # Form request
+            url = f"{self.url_base}{QueryFlowPaths.MULTI_QUERY.format(id=search_request_id)}"
+            req = Request(
+                url=url,
+                method="POST",
+                json=list(queries),
+                params=self._search_params(num_results, criteria),
+            )
+
+            # Call
+            res = cast(Response[list[RatedAnswer]], await self.request_as_model(req))
+
+            # Triage response
+            if res.payload:
+                res.payload = [RatedAnswer.model_validate(map) for map in res.payload]
+
+            # return response
+            return res
+        except Exception as e:
+            return Response.error(e)
+
+    async def search_stream(
+        self,
+        search_request_id: str,
+        query: str,
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
+    ) -> Response[AsyncIterator[RatedAnswerChunk]]:
+        try:
+            # Form request
+            url = f"{self.url_base}{QueryFlowPaths.SINGLE_QUERY_STREAM.format(id=search_request_id)}"
+            pool = self._get_stream_pool()
+            req = pool.build_request(
+                "POST",
+                url,
+                headers={"Content-Type": "text/plain", "Accept": "text/event-stream"},
+                content=query.encode(),
+                params=self._search_params(num_results, criteria),
+            )
+
+            # Call
+            http_response = await pool.send(req, stream=True)
+
+            # Triage response
+            if not http_response.is_success:
+                await http_response.aread()
+                await http_response.aclose()
+                return Response.fail(http_response.text, http_response.status_code)
+
+            async def __stream():
+                event, data = "", ""
+                try:
+                    async for line in http_response.aiter_lines():
+                        if line.startswith("event:"):
+                            event = line[len("event:") :].strip()
+                        elif line.startswith("data:"):
+                            data += line[len("data:") :].strip()
+                        elif line == "" and event:
+                            # A blank line dispatches the event gathered so far
+                            if event in ("sources", "token"):
+                                yield RatedAnswerChunk.model_validate_json(data)
+                            elif event == "error":
+                                raise Exception(
+                                    Response.model_validate_json(data).message
+                                )
+                            elif event == "done":
+                                break
+                            event, data = "", ""
+                finally:
+                    await http_response.aclose()
+
+            # Return response
+            return Response.ok(__stream())
+        except Exception as e:
+            return Response.error(e)
@@ -10,12 +10,19 @@ from envvars import EnvVars, Defaults
 from uuid import uuid4
 from random import randint
 from faker import Faker
+from httpx import AsyncClient
 from sbilifeco.models.base import Response
 
 # Import the necessary service(s) here
-from sbilifeco.boundaries.product_analyst.query_flow import BaseQueryFlow
+from sbilifeco.boundaries.product_analyst.query_flow import (
+    BaseQueryFlow,
+    RatedAnswer,
+    RatedAnswerChunk,
+    RatedSource,
+)
 from sbilifeco.cp.product_analyst.query_flow.http_server import QueryFlowHttpServer
 from sbilifeco.cp.product_analyst.query_flow.http_client import QueryFlowHttpClient
+from sbilifeco.cp.product_analyst.query_flow.paths import QueryFlowPaths
 
 
 class Test(IsolatedAsyncioTestCase):
@@ -80,4 +87,102 @@ class Test(IsolatedAsyncioTestCase):
 
         # Assert
         self.assertTrue(response.is_success, response.message)
-        fn_search.assert_called_once_with(request_id, query)
+        fn_search.assert_called_once_with(request_id, query, 5, None)
+
+    async def test_search_stream(self) -> None:
+        # Arrange
+        request_id = uuid4().hex
+        query = self.faker.sentence()
+        chunks = [
+            RatedAnswerChunk(
+                sources=[
+                    RatedSource(source=self.faker.sentence(), rating=randint(80, 100))
+                    for _ in range(3)
+                ]
+            ),
+            *[RatedAnswerChunk(token=f"{word}\n") for word in self.faker.words(10)],
+        ]
+
+        async def __chunks():
+            for chunk in chunks:
+                yield chunk
+
+        fn_search_stream = patch.object(
+            self.service,
+            "search_stream",
+            AsyncMock(return_value=Response.ok(__chunks())),
+        ).start()
+
+        # Act
+        response = await self.client.search_stream(request_id, query)
+        assert response.payload is not None
+        streamed_chunks = [chunk async for chunk in response.payload]
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        fn_search_stream.assert_called_once_with(request_id, query, 5, None)
+        self.assertEqual(streamed_chunks, chunks)
+
+    async def test_search_stream_without_sources(self) -> None:
+        # Arrange
+        chunks = [
+            RatedAnswerChunk(sources=[]),
+            *[RatedAnswerChunk(token=f"{word} ") for word in self.faker.words(3)],
+        ]
+
+        async def __chunks():
+            for chunk in chunks:
+                yield chunk
+
+        patch.object(
+            self.service,
+            "search_stream",
+            AsyncMock(return_value=Response.ok(__chunks())),
+        ).start()
+        url = f"{self.client.url_base}{QueryFlowPaths.SINGLE_QUERY_STREAM.format(id=uuid4().hex)}"
+
+        # Act
+        async with AsyncClient() as http_client:
+            http_response = await http_client.post(
+                url,
+                headers={"Content-Type": "text/plain"},
+                content=self.faker.sentence().encode(),
+            )
+
+        # Assert
+        events = [
+            line[len("event:") :].strip()
+            for line in http_response.text.splitlines()
+            if line.startswith("event:")
+        ]
+        self.assertEqual(events, ["sources", "token", "token", "token", "done"])
+
+    async def test_search_many(self) -> None:
+        # Arrange
+        request_id = uuid4().hex
+        queries = [self.faker.sentence() for _ in range(3)]
+        answers = [
+            RatedAnswer(
+                answer=self.faker.paragraph(),
+                sources=[
+                    RatedSource(source=self.faker.sentence(), rating=randint(80, 100))
+                ],
+            )
+            for _ in queries
+        ]
+
+        fn_search_many = patch.object(
+            self.service, "search_many", AsyncMock(return_value=Response.ok(answers))
+        ).start()
+
+        # Act
+        response = await self.client.search_many(
+            request_id, queries, 3, {"source": ["a", "b"]}
+        )
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        fn_search_many.assert_called_once_with(
+            request_id, queries, 3, {"source": ["a", "b"]}
+        )
+        self.assertEqual(response.payload, answers)
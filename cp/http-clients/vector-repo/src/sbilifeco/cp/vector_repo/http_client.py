@@ -1,25 +1,80 @@
 from __future__ import annotations
 
-from typing import Any
+from json import dumps
+from typing import Any, Sequence
 
 from sbilifeco.boundaries.vector_repo import BaseVectorRepo
 from sbilifeco.cp.common.http.client import HttpClient, Request
 from sbilifeco.cp.vector_repo.paths import VectorRepoPaths
 from sbilifeco.models.base import Response
-from sbilifeco.models.vectorisation import VectorisedRecord, RecordMetadata
+from sbilifeco.models.vectorisation import (
+    VectorisedRecord,
+    VectorisedRecordPage,
+    RecordMetadata,
+    PACKED_RECORDS_MEDIA_TYPE,
+    PACKED_VECTORS_MEDIA_TYPE,
+    can_pack_vectors,
+    pack_records,
+    pack_vectors,
+)
 
 
 class VectorRepoHttpClient(HttpClient, BaseVectorRepo):
+    DEFAULT_BATCH_SIZE = 64
+
+    def __init__(self) -> None:
+        HttpClient.__init__(self)
+        BaseVectorRepo.__init__(self)
+        self.batch_size = self.DEFAULT_BATCH_SIZE
+        self.packed_vectors = True
+
+    def set_batch_size(self, batch_size: int) -> VectorRepoHttpClient:
+        self.batch_size = max(1, batch_size)
+        return self
+
+    def set_packed_vectors(self, packed_vectors: bool) -> VectorRepoHttpClient:
+        """When set, vectors are sent as packed float32 instead of JSON. Unset it for vector repos that predate packing."""
+        self.packed_vectors = packed_vectors
+        return self
+
+    def _records_request(
+        self, url: str, records: Sequence[VectorisedRecord], as_list: bool
+    ) -> Request:
+        # Records mixing empty and filled vectors cannot be packed, so they go as JSON
+        if self.packed_vectors and can_pack_vectors(
+            [record.vector for record in records]
+        ):
+            return Request(
+                url=url,
+                method="POST",
+                headers={"Content-Type": PACKED_RECORDS_MEDIA_TYPE},
+                data=pack_records(records),
+            )
+
+        maps = [record.model_dump(mode="json") for record in records]
+        return Request(url=url, method="POST", json=maps if as_list else maps[0])
+
+    @staticmethod
+    def _search_params(
+        num_results: int, criteria: dict[str, Any] | None
+    ) -> dict[str, Any]:
+        params: dict[str, Any] = {"num_results": num_results}
+        if criteria:
+            # Sets are not JSON, but match the same as lists
+            params["criteria"] = dumps(
+                {
+                    key: list(value) if isinstance(value, (set, tuple)) else value
+                    for key, value in criteria.items()
+                }
+            )
+        return params
+
     async def crupdate(self, record: VectorisedRecord) -> Response[None]:
         try:
             # Form
             url = f"{self.url_base}{VectorRepoPaths.BASE}"
 
-            req = Request(
-                url=url,
-                method="POST",
-                json=record.model_dump(),
-            )
+            req = self._records_request(url, [record], as_list=False)
 
             # Request
             response = await self.request_as_model(req)
@@ -29,6 +84,29 @@ class VectorRepoHttpClient(HttpClient, BaseVectorRepo):
         except Exception as e:
             return Response.error(e)
 
+    async def crupdate_many(
+        self, records: Sequence[VectorisedRecord]
+    ) -> Response[None]:
+        try:
+            # Form
+            url = f"{self.url_base}{VectorRepoPaths.BULK}"
+
+            for start in range(0, len(records), self.batch_size):
+                batch = records[start : start + self.batch_size]
+                req = self._records_request(url, batch, as_list=True)
+
+                # Request
+                response = await self.request_as_model(req)
+
+                # Triage
+                if not response.is_success:
+                    return response
+
+            # Return
+            return Response.ok(None)
+        except Exception as e:
+            return Response.error(e)
+
     async def delete_by_id(self, record_id: str) -> Response[None]:
         try:
             # Form
@@ -89,13 +167,18 @@ class VectorRepoHttpClient(HttpClient, BaseVectorRepo):
             return Response.error(e)
 
     async def read_by_criteria(
-        self, criteria: dict[str, Any]
+        self, criteria: dict[str, Any], include_vectors: bool = False
     ) -> Response[list[VectorisedRecord]]:
         try:
             # Form
             url = f"{self.url_base}{VectorRepoPaths.SEARCH_BY_CRITERIA}"
 
-            req = Request(url=url, method="POST", json=criteria)
+            req = Request(
+                url=url,
+                method="POST",
+                json=criteria,
+                params={"include_vectors": include_vectors},
+            )
 
             # Request
             response = await self.request_as_model(req)
@@ -114,14 +197,65 @@ class VectorRepoHttpClient(HttpClient, BaseVectorRepo):
         except Exception as e:
             return Response.error(e)
 
+    async def read_page_by_criteria(
+        self,
+        criteria: dict[str, Any],
+        page_size: int = BaseVectorRepo.DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        include_vectors: bool = False,
+        include_documents: bool = True,
+    ) -> Response[VectorisedRecordPage]:
+        try:
+            # Form
+            url = f"{self.url_base}{VectorRepoPaths.SEARCH_BY_CRITERIA_PAGED}"
+
+            params: dict[str, Any] = {
+                "page_size": page_size,
+                "include_vectors": include_vectors,
+                "include_documents": include_documents,
+            }
+            if cursor:
+                params["cursor"] = cursor
+
+            req = Request(url=url, method="POST", json=criteria, params=params)
+
+            # Request
+            response = await self.request_as_model(req)
+
+            # Triage
+            if response.payload:
+                response.payload = VectorisedRecordPage.model_validate(response.payload)
+
+            # Return
+            return response
+        except Exception as e:
+            return Response.error(e)
+
     async def search_by_vector(
-        self, vector: list[float], num_results: int = 5
+        self,
+        vector: Sequence[float | int],
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
+        text: str | None = None,
     ) -> Response[list[VectorisedRecord]]:
         try:
             # Form
             url = f"{self.url_base}{VectorRepoPaths.BY_VECTOR}"
-
-            req = Request(url=url, method="POST", json=vector)
+            params = self._search_params(num_results, criteria)
+            if text:
+                params["text"] = text
+
+            req = (
+                Request(
+                    url=url,
+                    method="POST",
+                    headers={"Content-Type": PACKED_VECTORS_MEDIA_TYPE},
+                    data=pack_vectors([vector]),
+                    params=params,
+                )
+                if self.packed_vectors
+                else Request(url=url, method="POST", json=list(vector), params=params)
+            )
 
             # Request
             response = await self.request_as_model(req)
@@ -139,3 +273,50 @@ class VectorRepoHttpClient(HttpClient, BaseVectorRepo):
             return response
         except Exception as e:
             return Response.error(e)
+
+    async def search_by_vectors(
+        self,
+        vectors: Sequence[Sequence[float | int]],
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
+        texts: Sequence[str] | None = None,
+    ) -> Response[list[list[VectorisedRecord]]]:
+        try:
+            # Form
+            url = f"{self.url_base}{VectorRepoPaths.BY_VECTORS}"
+            params = self._search_params(num_results, criteria)
+            if texts:
+                # Repeated in the query string, since the body holds the vectors
+                params["texts"] = list(texts)
+
+            req = (
+                Request(
+                    url=url,
+                    method="POST",
+                    headers={"Content-Type": PACKED_VECTORS_MEDIA_TYPE},
+                    data=pack_vectors(vectors),
+                    params=params,
+                )
+                if self.packed_vectors
+                else Request(
+                    url=url,
+                    method="POST",
+                    json=[list(vector) for vector in vectors],
+                    params=params,
+                )
+            )
+
+            # Request
+            response = await self.request_as_model(req)
+
+            # Triage
+            if response.payload:
+                response.payload = [
+                    [VectorisedRecord.model_validate(map) for map in records]
+                    for records in response.payload
+                ]
+
+            # Return
+            return response
+        except Exception as e:
+            return Response.error(e)
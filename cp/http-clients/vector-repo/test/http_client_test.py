@@ -16,7 +16,11 @@ from sbilifeco.boundaries.vector_repo import BaseVectorRepo
 # Import the necessary service(s) here
 from sbilifeco.cp.vector_repo.http_server import VectorRepoHttpServer
 from sbilifeco.models.base import Response
-from sbilifeco.models.vectorisation import RecordMetadata, VectorisedRecord
+from sbilifeco.models.vectorisation import (
+    RecordMetadata,
+    VectorisedRecord,
+    VectorisedRecordPage,
+)
 
 from sbilifeco.cp.vector_repo.http_client import VectorRepoHttpClient
 
@@ -67,6 +71,82 @@ class Test(IsolatedAsyncioTestCase):
 
         crupdate.assert_called_once_with(record)
 
+    async def test_crupdate_many(self) -> None:
+        # Arrange
+        num_records = 5
+        records = [
+            VectorisedRecord(
+                id=uuid4().hex,
+                document=self.faker.paragraph(),
+                vector=[randint(0, 100) for _ in range(256)],
+                metadata=RecordMetadata(
+                    source_id=uuid4().hex, source=" ".join(self.faker.words(4))
+                ),
+            )
+            for _ in range(num_records)
+        ]
+        crupdate_many = patch.object(
+            self.vector_repo, "crupdate_many", return_value=Response.ok(None)
+        ).start()
+        self.client.set_batch_size(2)
+
+        # Act
+        response = await self.client.crupdate_many(records)
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+
+        self.assertEqual(crupdate_many.call_count, 3)
+        sent_records = [
+            record for call in crupdate_many.call_args_list for record in call.args[0]
+        ]
+        self.assertEqual(sent_records, records)
+
+    async def test_crupdate_many_unpacked(self) -> None:
+        # Arrange
+        records = [
+            VectorisedRecord(
+                id=uuid4().hex,
+                document=self.faker.paragraph(),
+                vector=[randint(0, 100) for _ in range(256)],
+                metadata=RecordMetadata(source_id=uuid4().hex),
+            )
+            for _ in range(3)
+        ]
+        crupdate_many = patch.object(
+            self.vector_repo, "crupdate_many", return_value=Response.ok(None)
+        ).start()
+        self.client.set_packed_vectors(False)
+
+        # Act
+        response = await self.client.crupdate_many(records)
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        crupdate_many.assert_called_once_with(records)
+
+    async def test_crupdate_many_with_empty_vectors(self) -> None:
+        # Arrange
+        records = [
+            VectorisedRecord(
+                id=uuid4().hex,
+                document=self.faker.paragraph(),
+                vector=[randint(0, 100) for _ in range(256)] if filled else [],
+                metadata=RecordMetadata(source_id=uuid4().hex),
+            )
+            for filled in (True, False, True)
+        ]
+        crupdate_many = patch.object(
+            self.vector_repo, "crupdate_many", return_value=Response.ok(None)
+        ).start()
+
+        # Act
+        response = await self.client.crupdate_many(records)
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        crupdate_many.assert_called_once_with(records)
+
     async def test_delete_by_id(self) -> None:
         # Arrange
         id = uuid4().hex
@@ -125,19 +205,147 @@ class Test(IsolatedAsyncioTestCase):
         # Assert
         self.assertTrue(response.is_success, response.message)
 
-        read_by_criteria.assert_called_once_with(criteria)
+        read_by_criteria.assert_called_once_with(criteria, False)
+
+    async def test_read_by_criteria_with_vectors(self) -> None:
+        # Arrange
+        criteria = {"source": " ".join(self.faker.words(3))}
+        records = [
+            VectorisedRecord(
+                id=uuid4().hex,
+                document=self.faker.paragraph(),
+                vector=[float(randint(0, 255)) for _ in range(8)],
+                metadata=RecordMetadata(
+                    source_id=uuid4().hex,
+                    source=criteria["source"],
+                    chunk_num=i,
+                    content_hash=uuid4().hex,
+                ),
+            )
+            for i in range(3)
+        ]
+        read_by_criteria = patch.object(
+            self.vector_repo, "read_by_criteria", return_value=Response.ok(records)
+        ).start()
+
+        # Act
+        response = await self.client.read_by_criteria(criteria, include_vectors=True)
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        self.assertEqual(response.payload, records)
+
+        read_by_criteria.assert_called_once_with(criteria, True)
+
+    async def test_stream_by_criteria(self) -> None:
+        # Arrange
+        criteria = {"source": " ".join(self.faker.words(3))}
+        records = [
+            VectorisedRecord(
+                id=uuid4().hex,
+                metadata=RecordMetadata(
+                    source_id=uuid4().hex, source=criteria["source"], chunk_num=i
+                ),
+            )
+            for i in range(5)
+        ]
+        cursor = uuid4().hex
+        read_page_by_criteria = patch.object(
+            self.vector_repo,
+            "read_page_by_criteria",
+            side_effect=[
+                Response.ok(
+                    VectorisedRecordPage(records=records[:3], next_cursor=cursor)
+                ),
+                Response.ok(VectorisedRecordPage(records=records[3:])),
+            ],
+        ).start()
+
+        # Act
+        response = await self.client.stream_by_criteria(
+            criteria, page_size=3, include_documents=False
+        )
+        assert response.payload is not None
+        streamed = [record async for record in response.payload]
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        self.assertEqual(streamed, records)
+
+        read_page_by_criteria.assert_any_call(criteria, 3, None, False, False)
+        read_page_by_criteria.assert_called_with(criteria, 3, cursor, False, False)
 
     async def test_search_by_vector(self) -> None:
         # Arrange
         vector = [float(randint(0, 255)) for _ in range(256)]
+        num_results = randint(1, 20)
         search_by_vector = patch.object(
             self.vector_repo, "search_by_vector", return_value=Response.ok(None)
         ).start()
 
         # Act
-        response = await self.client.search_by_vector(vector)
+        response = await self.client.search_by_vector(vector, num_results)
 
         # Assert
         self.assertTrue(response.is_success, response.message)
 
-        search_by_vector.assert_called_once_with(vector)
+        search_by_vector.assert_called_once_with(vector, num_results, None, None)
+
+    async def test_search_by_vector_with_criteria(self) -> None:
+        # Arrange
+        vector = [float(randint(0, 255)) for _ in range(256)]
+        source_ids = {uuid4().hex for _ in range(3)}
+        search_by_vector = patch.object(
+            self.vector_repo, "search_by_vector", return_value=Response.ok([])
+        ).start()
+
+        for packed_vectors in (True, False):
+            self.client.set_packed_vectors(packed_vectors)
+            search_by_vector.reset_mock()
+
+            # Act
+            response = await self.client.search_by_vector(
+                vector, 3, {"source_id": source_ids, "chunk_num": 0}
+            )
+
+            # Assert
+            self.assertTrue(response.is_success, response.message)
+
+            search_by_vector.assert_called_once()
+            _, num_results, criteria, _ = search_by_vector.call_args.args
+            self.assertEqual(num_results, 3)
+            self.assertEqual(criteria["chunk_num"], 0)
+            self.assertEqual(set(criteria["source_id"]), source_ids)
+
+    async def test_search_by_vectors(self) -> None:
+        # Arrange
+        vectors = [[float(randint(0, 255)) for _ in range(64)] for _ in range(3)]
+        texts = [self.faker.sentence() for _ in vectors]
+        records = [
+            [
+                VectorisedRecord(
+                    id=uuid4().hex,
+                    document=self.faker.paragraph(),
+                    metadata=RecordMetadata(source_id=uuid4().hex, chunk_num=i),
+                    score=randint(0, 100) / 100,
+                )
+                for i in range(randint(1, 4))
+            ]
+            for _ in vectors
+        ]
+        search_by_vectors = patch.object(
+            self.vector_repo, "search_by_vectors", return_value=Response.ok(records)
+        ).start()
+
+        for packed_vectors in (True, False):
+            self.client.set_packed_vectors(packed_vectors)
+            search_by_vectors.reset_mock()
+
+            # Act
+            response = await self.client.search_by_vectors(vectors, 4, texts=texts)
+
+            # Assert
+            self.assertTrue(response.is_success, response.message)
+            self.assertEqual(response.payload, records)
+
+            search_by_vectors.assert_called_once_with(vectors, 4, None, texts)
@@ -1,14 +1,85 @@
 from __future__ import annotations
+from typing import Sequence
+from asyncio import AbstractEventLoop, get_running_loop
+from httpx import AsyncClient, Limits, Timeout, Response as HttpxResponse
 from sbilifeco.cp.common.http.client import HttpClient, Request
 from sbilifeco.boundaries.vectoriser import BaseVectoriser
 from sbilifeco.cp.vectoriser.paths import VectoriserPaths
 from sbilifeco.models.base import Response
+from sbilifeco.models.vectorisation import PACKED_VECTORS_MEDIA_TYPE, unpack_vectors
 
 
 class VectoriserHttpClient(HttpClient, BaseVectoriser):
+    DEFAULT_MAX_CONNECTIONS = 8
+    DEFAULT_CONNECT_TIMEOUT = 10.0
+
+    def __init__(self) -> None:
+        HttpClient.__init__(self)
+        BaseVectoriser.__init__(self)
+        self.packed_vectors = True
+        self.max_connections = self.DEFAULT_MAX_CONNECTIONS
+        self.read_timeout: float | None = None
+        self.pool: AsyncClient | None = None
+        self.pool_loop: AbstractEventLoop | None = None
+
+    def set_packed_vectors(self, packed_vectors: bool) -> VectoriserHttpClient:
+        """When set, vectors are asked for as packed float32 instead of JSON. Unset it for vectorisers that predate packing."""
+        self.packed_vectors = packed_vectors
+        return self
+
+    def set_max_connections(self, max_connections: int) -> VectoriserHttpClient:
+        """Size of the keep-alive connection pool to the vectoriser."""
+        self.max_connections = max_connections
+        return self
+
+    def set_read_timeout(self, seconds: float | None) -> VectoriserHttpClient:
+        """Timeout for the vectoriser to answer. None waits as long as embedding takes."""
+        self.read_timeout = seconds
+        return self
+
+    async def async_shutdown(self) -> None:
+        if self.pool is not None:
+            await self.pool.aclose()
+            self.pool = None
+            self.pool_loop = None
+
+    def _get_pool(self) -> AsyncClient:
+        # The pool is bound to the event loop it was created in
+        loop = get_running_loop()
+        if self.pool is None or self.pool_loop is not loop:
+            self.pool = AsyncClient(
+                limits=Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                # Only reads wait on the vectoriser, so a dead host still fails fast
+                timeout=Timeout(self.DEFAULT_CONNECT_TIMEOUT, read=self.read_timeout),
+            )
+            self.pool_loop = loop
+        return self.pool
+
+    async def _post_accepting_packed_vectors(
+        self, url: str, headers: dict[str, str], **kwargs
+    ) -> HttpxResponse:
+        return await self._get_pool().post(
+            url,
+            headers={
+                **headers,
+                "Accept": f"{PACKED_VECTORS_MEDIA_TYPE}, application/json",
+            },
+            **kwargs,
+        )
+
+    @staticmethod
+    def _is_packed(http_response: HttpxResponse) -> bool:
+        # Failures, and everything from vectorisers that predate packing, come as JSON
+        return http_response.headers.get("Content-Type", "").startswith(
+            PACKED_VECTORS_MEDIA_TYPE
+        )
+
     async def vectorise(
         self, request_id: str, material: str | bytes | bytearray
-    ) -> Response[list[float | int]]:
+    ) -> Response[Sequence[float | int]]:
         try:
             # Form
             url = f"{self.url_base}{VectoriserPaths.BY_REQUEST_ID.format(request_id=request_id)}"
@@ -19,6 +90,20 @@ class VectoriserHttpClient(HttpClient, BaseVectoriser):
             elif isinstance(material, str):
                 content_type = "text/plain; charset=utf-8"
 
+            if self.packed_vectors:
+                http_response = await self._post_accepting_packed_vectors(
+                    url,
+                    {"Content-Type": content_type},
+                    content=(
+                        bytes(material)
+                        if isinstance(material, (bytes, bytearray))
+                        else material.encode("utf-8")
+                    ),
+                )
+                if self._is_packed(http_response):
+                    return Response.ok(unpack_vectors(http_response.content)[0])
+                return Response.model_validate(http_response.json())
+
             req = Request(
                 url=url,
                 method="POST",
@@ -33,3 +118,37 @@ class VectoriserHttpClient(HttpClient, BaseVectoriser):
             return response
         except Exception as e:
             return Response.error(e)
+
+    async def vectorise_many(
+        self, request_id: str, materials: Sequence[str | bytes | bytearray]
+    ) -> Response[list[Sequence[float | int]]]:
+        try:
+            # Form
+            url = f"{self.url_base}{VectoriserPaths.BULK_BY_REQUEST_ID.format(request_id=request_id)}"
+
+            materials_as_str = [
+                (
+                    bytes(material).decode("utf-8")
+                    if isinstance(material, (bytes, bytearray))
+                    else material
+                )
+                for material in materials
+            ]
+
+            if self.packed_vectors:
+                http_response = await self._post_accepting_packed_vectors(
+                    url, {"Content-Type": "application/json"}, json=materials_as_str
+                )
+                if self._is_packed(http_response):
+                    return Response.ok(unpack_vectors(http_response.content))
+                return Response.model_validate(http_response.json())
+
+            req = Request(url=url, method="POST", json=materials_as_str)
+
+            # Request
+            response = await self.request_as_model(req)
+
+            # Return
+            return response
+        except Exception as e:
+            return Response.error(e)
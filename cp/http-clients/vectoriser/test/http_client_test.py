@@ -15,6 +15,7 @@ from dotenv import load_dotenv
 from envvars import Defaults, EnvVars
 from faker import Faker
 from sbilifeco.models.base import Response
+from sbilifeco.models.vectorisation import Float32Vector
 from sbilifeco.boundaries.vectoriser import BaseVectoriser
 from sbilifeco.cp.vectoriser.http_server import VectoriserHttpServer
 
@@ -41,6 +42,7 @@ class Test(IsolatedAsyncioTestCase):
 
     async def asyncTearDown(self) -> None:
         # Shutdown the service(s) here
+        await self.client.async_shutdown()
         await self.service.stop()
         patch.stopall()
 
@@ -60,3 +62,86 @@ class Test(IsolatedAsyncioTestCase):
         assert response.payload is not None
 
         vectorise.assert_called_once_with(request_id, material)
+
+    async def test_vectorise_many(self) -> None:
+        # Arrange
+        request_id = uuid4().hex
+        materials = [self.faker.text() for _ in range(randint(2, 5))]
+        vectorise_many = patch.object(
+            self.vectoriser,
+            "vectorise_many",
+            return_value=Response.ok([[] for _ in materials]),
+        ).start()
+
+        # Act
+        response = await self.client.vectorise_many(request_id, materials)
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        assert response.payload is not None
+        self.assertEqual(len(response.payload), len(materials))
+
+        vectorise_many.assert_called_once_with(request_id, materials)
+
+    async def test_vectorise_many_packed(self) -> None:
+        # Arrange
+        request_id = uuid4().hex
+        materials = [self.faker.text() for _ in range(randint(2, 5))]
+        vectors = [[float(randint(-255, 255)) for _ in range(384)] for _ in materials]
+        patch.object(
+            self.vectoriser, "vectorise_many", return_value=Response.ok(vectors)
+        ).start()
+
+        for packed_vectors in (True, False):
+            self.client.set_packed_vectors(packed_vectors)
+
+            # Act
+            response = await self.client.vectorise_many(request_id, materials)
+
+            # Assert
+            self.assertTrue(response.is_success, response.message)
+            self.assertEqual(response.payload, vectors)
+
+    async def test_vectorise_failure_packed(self) -> None:
+        # Arrange
+        patch.object(
+            self.vectoriser, "vectorise", return_value=Response.fail("Nope", 422)
+        ).start()
+
+        # Act
+        response = await self.client.vectorise(uuid4().hex, self.faker.text())
+
+        # Assert
+        self.assertFalse(response.is_success)
+        self.assertEqual(response.code, 422)
+
+    async def test_vectorise_float32_vector(self) -> None:
+        # Arrange
+        request_id = uuid4().hex
+        vector = Float32Vector([float(randint(-255, 255)) for _ in range(384)])
+        patch.object(
+            self.vectoriser, "vectorise", return_value=Response.ok(vector)
+        ).start()
+
+        for packed_vectors in (True, False):
+            self.client.set_packed_vectors(packed_vectors)
+
+            # Act
+            response = await self.client.vectorise(request_id, self.faker.text())
+
+            # Assert
+            self.assertTrue(response.is_success, response.message)
+            self.assertEqual(response.payload, vector)
+
+    async def test_unbounded_read_timeout_keeps_connect_bounded(self) -> None:
+        # Arrange
+        self.client.set_read_timeout(None)
+
+        # Act
+        timeout = self.client._get_pool().timeout
+
+        # Assert
+        self.assertIsNone(timeout.read)
+        self.assertEqual(timeout.connect, VectoriserHttpClient.DEFAULT_CONNECT_TIMEOUT)
+        self.assertIsNotNone(timeout.write)
+        self.assertIsNotNone(timeout.pool)
@@ -1,5 +1,9 @@
 from __future__ import annotations
-from typing import Annotated
+from asyncio import to_thread
+from shutil import copyfileobj
+from tempfile import SpooledTemporaryFile
+from io import BufferedIOBase
+from typing import Annotated, cast
 from fastapi import Path, UploadFile, Form
 from sbilifeco.cp.common.http.server import HttpServer
 from sbilifeco.boundaries.product_analyst.ingest_flow import (
@@ -7,20 +11,49 @@ from sbilifeco.boundaries.product_analyst.ingest_flow import (
     SortDirection,
     SortField,
     IDNameEntity,
+    IngestionStatus,
 )
 from sbilifeco.cp.product_analyst.ingest_flow.paths import IngestFlowPaths, Pagination
 from sbilifeco.models.base import Response
 
 
 class IngestFlowHttpServer(HttpServer):
+    DEFAULT_SPOOL_THRESHOLD = 8 * 1024 * 1024
+    COPY_SIZE = 1024 * 1024
+
     def __init__(self) -> None:
         super().__init__()
         self.flow: BaseIngestFlow
+        self.spool_threshold = self.DEFAULT_SPOOL_THRESHOLD
 
     def set_ingest_flow(self, ingest_flow: BaseIngestFlow) -> IngestFlowHttpServer:
         self.flow = ingest_flow
         return self
 
+    def set_spool_threshold(self, spool_threshold: int) -> IngestFlowHttpServer:
+        """Size in bytes past which uploads kept for background ingestion are spooled to disk."""
+        self.spool_threshold = spool_threshold
+        return self
+
+    async def _read_material(
+        self, material: UploadFile, outlive_request: bool = False
+    ) -> str | BufferedIOBase:
+        # Text is small enough to hand over as is
+        if (material.content_type or "").startswith("text/"):
+            return (await material.read()).decode()
+
+        # The upload is already spooled, so binaries are handed over as a file rather than read into memory.
+        # Spooled files are file-likes even though they do not derive from BufferedIOBase
+        await material.seek(0)
+        if not outlive_request:
+            return cast(BufferedIOBase, material.file)
+
+        # The upload is closed along with the request, so a background ingestion needs its own copy
+        spool = SpooledTemporaryFile(max_size=self.spool_threshold)
+        await to_thread(copyfileobj, material.file, spool, self.COPY_SIZE)
+        spool.seek(0)
+        return cast(BufferedIOBase, spool)
+
     def build_routes(self) -> None:
         super().build_routes()
 
@@ -59,12 +92,7 @@ class IngestFlowHttpServer(HttpServer):
                 ...
 
                 # Triage request
-                material_untyped: str | bytes = ""
-                material_as_bytes = await material.read()
-                if (material.content_type or "").startswith("text/"):
-                    material_untyped = material_as_bytes.decode()
-                else:
-                    material_untyped = material_as_bytes
+                material_untyped = await self._read_material(material)
 
                 # Gateway call
                 response = await self.flow.ingest(
@@ -76,6 +104,57 @@ class IngestFlowHttpServer(HttpServer):
             except Exception as e:
                 return Response.error(e)
 
+        @self.post(IngestFlowPaths.BACKGROUND)
+        async def start_ingestion(
+            ingest_request_id: Annotated[str, Path()],
+            title: Annotated[str, Form(media_type="multipart/form-data")],
+            material: UploadFile,
+        ) -> Response[None]:
+            material_untyped: str | BufferedIOBase = ""
+            started = False
+            try:
+                # Validate request
+                ...
+
+                # Triage request
+                material_untyped = await self._read_material(
+                    material, outlive_request=True
+                )
+
+                # Gateway call
+                response = await self.flow.start_ingestion(
+                    ingest_request_id, title, material_untyped
+                )
+                started = response.is_success
+
+                # Return response
+                return response
+            except Exception as e:
+                return Response.error(e)
+            finally:
+                # A started ingestion closes its copy of the material when done
+                if not started and not isinstance(material_untyped, str):
+                    material_untyped.close()
+
+        @self.get(IngestFlowPaths.STATUS)
+        async def get_ingestion_status(
+            ingest_request_id: Annotated[str, Path()],
+        ) -> Response[IngestionStatus]:
+            try:
+                # Validate request
+                ...
+
+                # Triage request
+                ...
+
+                # Gateway call
+                response = await self.flow.get_ingestion_status(ingest_request_id)
+
+                # Return response
+                return response
+            except Exception as e:
+                return Response.error(e)
+
         @self.post(IngestFlowPaths.MATERIALS)
         async def get_materials(
             pagination: Pagination,
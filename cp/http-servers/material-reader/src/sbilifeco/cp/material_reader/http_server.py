@@ -1,4 +1,8 @@
 from __future__ import annotations
+from asyncio import to_thread
+from io import BufferedIOBase
+from tempfile import SpooledTemporaryFile
+from typing import cast
 from fastapi import Request
 from sbilifeco.models.base import Response
 from sbilifeco.cp.common.http.server import HttpServer
@@ -8,9 +12,12 @@ from fastapi.responses import StreamingResponse, PlainTextResponse
 
 
 class MaterialReaderHttpServer(HttpServer):
+    DEFAULT_SPOOL_THRESHOLD = 8 * 1024 * 1024
+
     def __init__(self):
         HttpServer.__init__(self)
         self.material_reader: BaseMaterialReader
+        self.spool_threshold = self.DEFAULT_SPOOL_THRESHOLD
 
     def set_material_reader(
         self, reader: BaseMaterialReader
@@ -18,18 +25,36 @@ class MaterialReaderHttpServer(HttpServer):
         self.material_reader = reader
         return self
 
+    def set_spool_threshold(self, spool_threshold: int) -> MaterialReaderHttpServer:
+        """Size in bytes past which binary request bodies are spooled to disk."""
+        self.spool_threshold = spool_threshold
+        return self
+
+    async def _spool_body(self, req: Request) -> BufferedIOBase:
+        # Spooled files are file-likes even though they do not derive from BufferedIOBase
+        spool = SpooledTemporaryFile(max_size=self.spool_threshold)
+        try:
+            # Past the threshold the spool is on disk, so writes stay off the event loop
+            async for piece in req.stream():
+                await to_thread(spool.write, piece)
+            spool.seek(0)
+        except Exception:
+            spool.close()
+            raise
+        return cast(BufferedIOBase, spool)
+
     def build_routes(self) -> None:
         super().build_routes()
 
         @self.post(MaterialReaderPaths.BASE)
         async def read_material(req: Request) -> Response[str]:
+            material: BufferedIOBase | str = ""
             try:
                 # Triage
                 content_type = req.headers.get("Content-Type", "text/plain")
-                material: bytes | str = ""
 
                 if content_type == "application/octet-stream":
-                    material = await req.body()
+                    material = await self._spool_body(req)
                 elif content_type.startswith("text/plain"):
                     material = (await req.body()).decode()
 
@@ -40,6 +65,10 @@ class MaterialReaderHttpServer(HttpServer):
                 return response
             except Exception as e:
                 return Response.error(e)
+            finally:
+                # The reader is done with the material once it has been read
+                if not isinstance(material, str):
+                    material.close()
 
         @self.get(MaterialReaderPaths.NEXT_CHUNK)
         async def read_next_chunk(
@@ -57,14 +86,35 @@ class MaterialReaderHttpServer(HttpServer):
             except Exception as e:
                 return Response.error(e)
 
+        @self.get(MaterialReaderPaths.NEXT_CHUNKS)
+        async def read_next_chunks(
+            material_id: str, max_chunks: int = 1
+        ) -> Response[list[str | bytes]]:
+            try:
+                # Gateway call
+                response = await self.material_reader.read_next_chunks(
+                    material_id, max_chunks
+                )
+
+                if response.payload is not None:
+                    response.payload = [
+                        bytes(chunk) if isinstance(chunk, bytearray) else chunk
+                        for chunk in response.payload
+                    ]
+
+                # Return
+                return response
+            except Exception as e:
+                return Response.error(e)
+
         @self.post(MaterialReaderPaths.STREAMS)
         async def read_and_chunk(req: Request):
             # Triage
             content_type = req.headers.get("Content-Type", "text/plain")
-            material: bytes | str | None = None
+            material: BufferedIOBase | str | None = None
 
             if content_type == "application/octet-stream":
-                material = await req.body()
+                material = await self._spool_body(req)
             elif content_type.startswith("text/plain"):
                 material = (await req.body()).decode()
 
@@ -73,27 +123,38 @@ class MaterialReaderHttpServer(HttpServer):
                     "Unable to determine material type", status_code=400
                 )
 
-            # Gateway call
-            response = await self.material_reader.read_and_chunk(material)
-
-            # Triage response
-            if not response.is_success:
-                return PlainTextResponse(
-                    f"Error reading material: {response.message}",
-                    status_code=response.code,
-                )
+            # The material is closed here unless the chunks stream out, in which case the stream closes it
+            streaming = False
+            try:
+                # Gateway call
+                response = await self.material_reader.read_and_chunk(material)
 
-            if response.payload is None:
-                return PlainTextResponse(
-                    "Material to stream is inexplicable blank", status_code=500
-                )
+                # Triage response
+                if not response.is_success:
+                    return PlainTextResponse(
+                        f"Error reading material: {response.message}",
+                        status_code=response.code,
+                    )
 
-            async def __stream():
                 if response.payload is None:
-                    return
+                    return PlainTextResponse(
+                        "Material to stream is inexplicable blank", status_code=500
+                    )
 
-                async for chunk in response.payload:
-                    yield chunk
+                chunks = response.payload
 
-            # Return
-            return StreamingResponse(response.payload, media_type=content_type)
+                async def __stream():
+                    try:
+                        async for chunk in chunks:
+                            yield chunk
+                    finally:
+                        # The spooled material is only needed until the chunks are out
+                        if not isinstance(material, str):
+                            material.close()
+
+                # Return
+                streaming = True
+                return StreamingResponse(__stream(), media_type=content_type)
+            finally:
+                if not streaming and not isinstance(material, str):
+                    material.close()
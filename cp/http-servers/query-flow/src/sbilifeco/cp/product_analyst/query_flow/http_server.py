@@ -1,9 +1,12 @@
 from __future__ import annotations
+from json import loads
+from typing import Annotated, Any
 from sbilifeco.cp.common.http.server import HttpServer
 from sbilifeco.cp.product_analyst.query_flow.paths import QueryFlowPaths
 from sbilifeco.boundaries.product_analyst.query_flow import BaseQueryFlow, RatedAnswer
 from sbilifeco.models.base import Response
-from fastapi import Request as FastRequest
+from fastapi import Body, Query, Request as FastRequest
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
 
 class QueryFlowHttpServer(HttpServer):
@@ -15,6 +18,16 @@ class QueryFlowHttpServer(HttpServer):
         self.query_flow = query_flow
         return self
 
+    @staticmethod
+    def _parse_criteria(criteria: str) -> dict[str, Any] | None:
+        # Criteria travel as a JSON object in the query string, since the body holds the query
+        if not criteria:
+            return None
+        parsed = loads(criteria)
+        if not isinstance(parsed, dict):
+            raise ValueError("Criteria must be a JSON object")
+        return parsed
+
     def build_routes(self) -> None:
         super().build_routes()
 
@@ -36,16 +49,24 @@ class QueryFlowHttpServer(HttpServer):
                 return Response.error(e)
 
         @self.post(QueryFlowPaths.SINGLE_QUERY)
-        async def search(id: str, req: FastRequest) -> Response[RatedAnswer]:
+        async def search(
+            id: str,
+            req: FastRequest,
+            num_results: Annotated[int, Query()] = 5,
+            criteria: Annotated[str, Query()] = "",
+        ) -> Response[RatedAnswer]:
             try:
                 # Validate request
-                ...
+                try:
+                    criteria_map = self._parse_criteria(criteria)
+                except ValueError as e:
+                    return Response.fail(f"Invalid criteria: {e}", 400)
 
                 # Triage request
                 query = (await req.body()).decode()
 
                 # Request gateway
-                res = await self.query_flow.search(id, query)
+                res = await self.query_flow.search(id, query, num_results, criteria_map)
 
                 # Triage response
                 ...
@@ -54,3 +75,78 @@ class QueryFlowHttpServer(HttpServer):
                 return res
             except Exception as e:
                 return Response.error(e)
+
+        @self.post(QueryFlowPaths.MULTI_QUERY)
+        async def search_many(
+            id: str,
+            queries: Annotated[list[str], Body()],
+            num_results: Annotated[int, Query()] = 5,
+            criteria: Annotated[str, Query()] = "",
+        ) -> Response[list[RatedAnswer]]:
+            try:
+                # Validate request
+                try:
+                    criteria_map = self._parse_criteria(criteria)
+                except ValueError as e:
+                    return Response.fail(f"Invalid criteria: {e}", 400)
+
+                # Request gateway
+                res = await self.query_flow.search_many(
+                    id, queries, num_results, criteria_map
+                )
+
+                # Return response
+                return res
+            except Exception as e:
+                return Response.error(e)
+
+        @self.post(QueryFlowPaths.SINGLE_QUERY_STREAM)
+        async def search_stream(
+            id: str,
+            req: FastRequest,
+            num_results: Annotated[int, Query()] = 5,
+            criteria: Annotated[str, Query()] = "",
+        ):
+            # Validate request
+            try:
+                criteria_map = self._parse_criteria(criteria)
+            except ValueError as e:
+                return PlainTextResponse(f"Invalid criteria: {e}", status_code=400)
+
+            # Triage request
+            query = (await req.body()).decode()
+
+            # Request gateway
+            res = await self.query_flow.search_stream(
+                id, query, num_results, criteria_map
+            )
+
+            # Triage response
+            if not res.is_success:
+                return PlainTextResponse(
+                    f"Error searching: {res.message}", status_code=res.code
+                )
+
+            if res.payload is None:
+                return PlainTextResponse(
+                    "Answer stream is inexplicably empty", status_code=500
+                )
+            chunks = res.payload
+
+            async def __events():
+                try:
+                    # The first chunk carries the sources, even when retrieval found none
+                    event = "sources"
+                    async for chunk in chunks:
+                        yield f"event: {event}\ndata: {chunk.model_dump_json()}\n\n"
+                        event = "token"
+                    yield "event: done\ndata: {}\n\n"
+                except Exception as e:
+                    yield f"event: error\ndata: {Response.error(e).model_dump_json()}\n\n"
+
+            # Return response
+            return StreamingResponse(
+                __events(),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache"},
+            )
@@ -1,11 +1,19 @@
 from __future__ import annotations
-from typing import Annotated
-from fastapi import Body, Path
+from json import loads
+from typing import Annotated, Any, Sequence
+from fastapi import Body, Path, Query, Request
 from sbilifeco.cp.common.http.server import HttpServer
 from sbilifeco.boundaries.vector_repo import BaseVectorRepo
 from sbilifeco.cp.vector_repo.paths import VectorRepoPaths
 from sbilifeco.models.base import Response
-from sbilifeco.models.vectorisation import VectorisedRecord
+from sbilifeco.models.vectorisation import (
+    VectorisedRecord,
+    VectorisedRecordPage,
+    PACKED_RECORDS_MEDIA_TYPE,
+    PACKED_VECTORS_MEDIA_TYPE,
+    unpack_records,
+    unpack_vectors,
+)
 
 
 class VectorRepoHttpServer(HttpServer):
@@ -17,19 +25,43 @@ class VectorRepoHttpServer(HttpServer):
         self.vector_repo = vector_repo
         return self
 
+    @staticmethod
+    def _is_packed(req: Request, media_type: str) -> bool:
+        return req.headers.get("Content-Type", "").startswith(media_type)
+
+    async def _read_records(self, req: Request) -> list[VectorisedRecord]:
+        body = await req.body()
+        if self._is_packed(req, PACKED_RECORDS_MEDIA_TYPE):
+            return unpack_records(body)
+
+        payload = loads(body)
+        if isinstance(payload, dict):
+            payload = [payload]
+        return [VectorisedRecord.model_validate(map) for map in payload]
+
+    @staticmethod
+    def _parse_criteria(criteria: str) -> dict[str, Any] | None:
+        # Criteria travel as a JSON object in the query string, since the body holds the vectors
+        if not criteria:
+            return None
+        parsed = loads(criteria)
+        if not isinstance(parsed, dict):
+            raise ValueError("Criteria must be a JSON object")
+        return parsed
+
     def build_routes(self) -> None:
         super().build_routes()
 
         @self.post(VectorRepoPaths.BASE)
-        async def crupdate(
-            record: Annotated[VectorisedRecord, Body()],
-        ) -> Response[None]:
+        async def crupdate(req: Request) -> Response[None]:
             try:
                 # Validate
-                ...
+                records = await self._read_records(req)
+                if len(records) != 1:
+                    return Response.fail(f"Expected 1 record, got {len(records)}", 400)
 
                 # Triage request
-                ...
+                record = records[0]
 
                 # Gateway call
                 response = await self.vector_repo.crupdate(record)
@@ -42,6 +74,20 @@ class VectorRepoHttpServer(HttpServer):
             except Exception as e:
                 return Response.error(e)
 
+        @self.post(VectorRepoPaths.BULK)
+        async def crupdate_many(req: Request) -> Response[None]:
+            try:
+                # Triage request
+                records = await self._read_records(req)
+
+                # Gateway call
+                response = await self.vector_repo.crupdate_many(records)
+
+                # Return
+                return response
+            except Exception as e:
+                return Response.error(e)
+
         @self.delete(VectorRepoPaths.BY_ID)
         async def delete_by_id(id: Annotated[str, Path()]) -> Response[None]:
             try:
@@ -107,6 +153,7 @@ class VectorRepoHttpServer(HttpServer):
         @self.post(VectorRepoPaths.SEARCH_BY_CRITERIA)
         async def read_by_criteria(
             criteria: Annotated[dict, Body()],
+            include_vectors: Annotated[bool, Query()] = False,
         ) -> Response[list[VectorisedRecord]]:
             try:
                 # Validate
@@ -116,7 +163,9 @@ class VectorRepoHttpServer(HttpServer):
                 ...
 
                 # Gateway call
-                response = await self.vector_repo.read_by_criteria(criteria)
+                response = await self.vector_repo.read_by_criteria(
+                    criteria, include_vectors
+                )
 
                 # Triage
                 ...
@@ -126,19 +175,55 @@ class VectorRepoHttpServer(HttpServer):
             except Exception as e:
                 return Response.error(e)
 
+        @self.post(VectorRepoPaths.SEARCH_BY_CRITERIA_PAGED)
+        async def read_page_by_criteria(
+            criteria: Annotated[dict, Body()],
+            page_size: Annotated[int, Query()] = BaseVectorRepo.DEFAULT_PAGE_SIZE,
+            cursor: Annotated[str | None, Query()] = None,
+            include_vectors: Annotated[bool, Query()] = False,
+            include_documents: Annotated[bool, Query()] = True,
+        ) -> Response[VectorisedRecordPage]:
+            try:
+                # Validate
+                if page_size < 1:
+                    return Response.fail("Page size must be at least 1", 400)
+
+                # Gateway call
+                response = await self.vector_repo.read_page_by_criteria(
+                    criteria, page_size, cursor, include_vectors, include_documents
+                )
+
+                # Return
+                return response
+            except Exception as e:
+                return Response.error(e)
+
         @self.post(VectorRepoPaths.BY_VECTOR)
         async def search_by_vector(
-            vector: Annotated[list[float], Body()],
+            req: Request,
+            num_results: Annotated[int, Query()] = 5,
+            criteria: Annotated[str, Query()] = "",
+            text: Annotated[str, Query()] = "",
         ) -> Response[list[VectorisedRecord]]:
             try:
                 # Validate
-                ...
+                try:
+                    criteria_map = self._parse_criteria(criteria)
+                except ValueError as e:
+                    return Response.fail(f"Invalid criteria: {e}", 400)
 
                 # Triage
-                ...
+                body = await req.body()
+                vector: Sequence[float | int] = (
+                    unpack_vectors(body)[0]
+                    if self._is_packed(req, PACKED_VECTORS_MEDIA_TYPE)
+                    else loads(body)
+                )
 
                 # Gateway call
-                response = await self.vector_repo.search_by_vector(vector)
+                response = await self.vector_repo.search_by_vector(
+                    vector, num_results, criteria_map, text or None
+                )
 
                 # Triage
                 ...
@@ -147,3 +232,40 @@ class VectorRepoHttpServer(HttpServer):
                 return response
             except Exception as e:
                 return Response.error(e)
+
+        @self.post(VectorRepoPaths.BY_VECTORS)
+        async def search_by_vectors(
+            req: Request,
+            num_results: Annotated[int, Query()] = 5,
+            criteria: Annotated[str, Query()] = "",
+            texts: Annotated[list[str] | None, Query()] = None,
+        ) -> Response[list[list[VectorisedRecord]]]:
+            try:
+                # Validate
+                try:
+                    criteria_map = self._parse_criteria(criteria)
+                except ValueError as e:
+                    return Response.fail(f"Invalid criteria: {e}", 400)
+
+                # Triage
+                body = await req.body()
+                vectors: list[Sequence[float | int]] = (
+                    unpack_vectors(body)
+                    if self._is_packed(req, PACKED_VECTORS_MEDIA_TYPE)
+                    else loads(body)
+                )
+
+                if texts is not None and len(texts) != len(vectors):
+                    return Response.fail(
+                        f"Got {len(texts)} texts for {len(vectors)} vectors", 400
+                    )
+
+                # Gateway call
+                response = await self.vector_repo.search_by_vectors(
+                    vectors, num_results, criteria_map, texts
+                )
+
+                # Return
+                return response
+            except Exception as e:
+                return Response.error(e)
@@ -1,6 +1,9 @@
 from __future__ import annotations
-from fastapi import Request
+from typing import Annotated
+from fastapi import Request, Body, Path
+from fastapi.responses import Response as HttpResponse
 from sbilifeco.models.base import Response
+from sbilifeco.models.vectorisation import PACKED_VECTORS_MEDIA_TYPE, pack_vectors
 from sbilifeco.cp.common.http.server import HttpServer
 from sbilifeco.boundaries.vectoriser import BaseVectoriser
 from sbilifeco.cp.vectoriser.paths import VectoriserPaths
@@ -21,6 +24,10 @@ class VectoriserHttpServer(HttpServer):
     async def stop(self) -> None:
         return await super().stop()
 
+    @staticmethod
+    def _accepts_packed_vectors(req: Request) -> bool:
+        return PACKED_VECTORS_MEDIA_TYPE in req.headers.get("Accept", "")
+
     def build_routes(self) -> None:
         super().build_routes()
 
@@ -42,7 +49,48 @@ class VectoriserHttpServer(HttpServer):
                 # Use gateway
                 response = await self.vectoriser.vectorise(request_id, attached_data)
 
-                # Return
+                # Triage response. Failures are always sent as JSON.
+                if (
+                    response.is_success
+                    and response.payload is not None
+                    and self._accepts_packed_vectors(req)
+                ):
+                    return HttpResponse(
+                        pack_vectors([response.payload]),
+                        media_type=PACKED_VECTORS_MEDIA_TYPE,
+                    )
+
+                # Return. Vectors only become lists here, at the JSON edge.
+                if response.payload is not None:
+                    response.payload = list(response.payload)
+                return response
+            except Exception as e:
+                return Response.error(e)
+
+        @self.post(VectoriserPaths.BULK_BY_REQUEST_ID)
+        async def vectorise_many(
+            req: Request,
+            request_id: Annotated[str, Path()],
+            materials: Annotated[list[str], Body()],
+        ) -> Response[list[list[int | float]]]:
+            try:
+                # Use gateway
+                response = await self.vectoriser.vectorise_many(request_id, materials)
+
+                # Triage response. Failures are always sent as JSON.
+                if (
+                    response.is_success
+                    and response.payload is not None
+                    and self._accepts_packed_vectors(req)
+                ):
+                    return HttpResponse(
+                        pack_vectors(response.payload),
+                        media_type=PACKED_VECTORS_MEDIA_TYPE,
+                    )
+
+                # Return. Vectors only become lists here, at the JSON edge.
+                if response.payload is not None:
+                    response.payload = [list(vector) for vector in response.payload]
                 return response
             except Exception as e:
                 return Response.error(e)
@@ -9,5 +9,7 @@ from sbilifeco.cp.id_name_repo.paths import Pagination as Pagination
 class IngestFlowPaths:
     BASE = "/api/v1/ingest-requests"
     BY_ID = BASE + "/{ingest_request_id}"  # POST
+    BACKGROUND = BY_ID + "/background"  # POST
+    STATUS = BY_ID + "/status"  # GET
 
     MATERIALS = "/api/v1/material-list-requests"
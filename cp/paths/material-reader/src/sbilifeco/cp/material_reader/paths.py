@@ -2,4 +2,5 @@ class MaterialReaderPaths:
     BASE = "/api/v1/materials"
     MATERIAL_BY_ID = BASE + "/{material_id}"
     NEXT_CHUNK = MATERIAL_BY_ID + "/next-chunk"
+    NEXT_CHUNKS = MATERIAL_BY_ID + "/next-chunks"
     STREAMS = "/api/v1/material-streams"
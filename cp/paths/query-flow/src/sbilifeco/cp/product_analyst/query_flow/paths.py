@@ -1,3 +1,7 @@
 class QueryFlowPaths:
     BASE = "/api/v1/material-queries"  # POST
     SINGLE_QUERY = BASE + "/{id}"  # POST
+    SINGLE_QUERY_STREAM = (
+        SINGLE_QUERY + "/stream"
+    )  # POST, answers as server-sent events
+    MULTI_QUERY = SINGLE_QUERY + "/bulk"  # POST, queries as a JSON list
@@ -1,6 +1,9 @@
 class VectorRepoPaths:
     BASE = "/api/v1/vectorised-data"  # POST
     BY_ID = BASE + "/{id}"  # GET, DELETE
+    BULK = BASE + "/bulk"  # POST
     SEARCH_BY_CRITERIA = BASE + "/search/by-criteria"  # POST due to payload
+    SEARCH_BY_CRITERIA_PAGED = SEARCH_BY_CRITERIA + "/paged"  # POST due to payload
     DELETE_BY_CRITERIA = BASE + "/delete/by-criteria"  # POST due to payload
     BY_VECTOR = BASE + "/search/by-vector"  # POST due to payload
+    BY_VECTORS = BASE + "/search/by-vectors"  # POST due to payload
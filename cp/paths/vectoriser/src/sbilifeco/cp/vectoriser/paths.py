@@ -1,3 +1,4 @@
 class VectoriserPaths:
     BASE = "/api/v1/vectors"
     BY_REQUEST_ID = BASE + "/{request_id}"  # POST
+    BULK_BY_REQUEST_ID = BASE + "/bulk/{request_id}"  # POST
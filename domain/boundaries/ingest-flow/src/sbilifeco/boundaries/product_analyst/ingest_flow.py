@@ -1,10 +1,38 @@
 from __future__ import annotations
-from typing import Protocol
+from typing import Protocol, Optional
+from enum import IntEnum
+from datetime import datetime
+from pydantic import BaseModel
 from sbilifeco.models.base import Response
 from io import BufferedIOBase, RawIOBase, TextIOBase
 from sbilifeco.boundaries.id_name_repo import IDNameEntity, SortField, SortDirection
 
 
+class IngestionState(IntEnum):
+    REQUESTED = 1
+    RUNNING = 2
+    COMPLETED = 3
+    FAILED = 4
+
+
+class IngestionStatus(BaseModel):
+    state: IngestionState = IngestionState.REQUESTED
+    title: str = ""
+    material_id: str = ""
+    chunks_read: int = 0
+    chunks_vectorised: int = 0
+    chunks_stored: int = 0
+    chunks_reused: int = 0
+    is_unchanged: bool = False
+    bytes_processed: int = 0
+    chunks_per_second: float = 0.0
+    bytes_per_second: float = 0.0
+    requested_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: str = ""
+
+
 class BaseIngestFlow:
     def __init__(self) -> None:
         self.listeners: list[IngestFlowListener] = []
@@ -28,11 +56,33 @@ class BaseIngestFlow:
     ) -> Response[None]:
         """Perform an ingestion operation."""
         """Args:
-            ingestion_request: the request ID obtained from `request_ingestion`
+            ingestion_request: the request ID obtained from `request_ingestion`. Any other ID is tracked from here on, unless an ingestion under it is still running
             source: the data source to be ingested
         Returns: a response indicating success or failure of the ingestion"""
         ...
 
+    async def start_ingestion(
+        self,
+        ingestion_request: str,
+        title: str,
+        source: str | bytes | bytearray | TextIOBase | BufferedIOBase | RawIOBase,
+    ) -> Response[None]:
+        """Start an ingestion operation in the background."""
+        """Args:
+            ingestion_request: the request ID obtained from `request_ingestion`
+            source: the data source to be ingested. Once the ingestion has started, file-like sources are closed when it finishes
+        Returns: a response indicating whether the ingestion could be started. Use `get_ingestion_status` to follow it"""
+        ...
+
+    async def get_ingestion_status(
+        self, ingestion_request: str
+    ) -> Response[IngestionStatus]:
+        """Retrieve the progress of an ingestion operation."""
+        """Args:
+            ingestion_request: the request ID obtained from `request_ingestion`
+        Returns: a response containing the state, counters and throughput of the ingestion"""
+        ...
+
     async def get_materials(
         self,
         page_size: int = -1,
@@ -60,3 +110,10 @@ class IngestFlowListener(Protocol):
             ingestion_request: the request ID obtained from `request_ingestion`
             response: the response indicating success or failure of the ingestion"""
         ...
+
+    async def on_material_changed(self, material_id: str, title: str) -> None:
+        """Handle the event that the stored content of a material has changed, e.g. because it was (re-)ingested."""
+        """Args:
+            material_id: the ID of the material
+            title: the title of the material, which is also the `source` of its records"""
+        ...
@@ -6,6 +6,9 @@ from uuid import uuid4
 
 
 class BaseMaterialReader:
+    LOGICAL_CHUNK_DELIMITER = "#=====#"
+    """Separates logical chunks in the stream returned by `read_and_chunk`."""
+
     def __init__(self) -> None:
         self.listeners: list[IMaterialReaderListener] = []
         self.materials: dict[
@@ -31,11 +34,33 @@ class BaseMaterialReader:
         """Reads the next chunk of material and returns a Response containing the chunk data."""
         ...
 
+    async def read_next_chunks(
+        self, material_id: str, max_chunks: int
+    ) -> Response[list[str | bytes | bytearray]]:
+        """Reads up to `max_chunks` next chunks of material in one go. An empty list means the material is exhausted.
+        Implementations that can batch natively should override this. The default falls back to `read_next_chunk` per chunk.
+        """
+        try:
+            chunks: list[str | bytes | bytearray] = []
+            while len(chunks) < max_chunks:
+                response = await self.read_next_chunk(material_id)
+                if not response.is_success:
+                    return Response.fail(response.message, response.code)
+                elif response.payload is None:
+                    break
+                chunks.append(response.payload)
+
+            return Response.ok(chunks)
+        except Exception as e:
+            return Response.error(e)
+
     async def read_and_chunk(
         self,
         material: str | bytes | bytearray | RawIOBase | BufferedIOBase | TextIOBase,
     ) -> Response[AsyncIterator[str | bytes]]:
-        """Reads material and returns a Response containing an AsyncIterator that yields chunks of the material."""
+        """Reads material and returns a Response containing an AsyncIterator that yields chunks of the material.
+        Network chunks need not line up with logical chunks. Logical chunks are separated by LOGICAL_CHUNK_DELIMITER.
+        """
         ...
 
 
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Protocol
+from typing import Any, AsyncIterator, Protocol, Sequence
 from sbilifeco.models.base import Response
 from pydantic import BaseModel
 
@@ -14,6 +14,13 @@ class RatedAnswer(BaseModel):
     sources: list[RatedSource] = []
 
 
+class RatedAnswerChunk(BaseModel):
+    """A piece of a streamed answer. The first chunk carries the sources, the rest carry answer tokens."""
+
+    sources: list[RatedSource] = []
+    token: str = ""
+
+
 class BaseQueryFlow:
     def __init__(self) -> None:
         self.listeners: list[IQueryFlowListener] = []
@@ -27,18 +34,62 @@ class BaseQueryFlow:
         ...
 
     async def search(
-        self, search_request_id: str, query: str, num_results: int = 5
+        self,
+        search_request_id: str,
+        query: str,
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
     ) -> Response[RatedAnswer]:
         """Perform a search based on the provided query and return a list of rated answers."""
         """
         Args:
             search_request_id: the ID used to identify the search request
             query: the search query string
+            num_results: the most records to answer from
+            criteria: restricts the search to records whose metadata matches, e.g. {"source": [a, b]} to answer from two products only
         Returns:
             A Response object containing a list of RatedAnswer or error information. The list is sorted by rating in descending order.
         """
         ...
 
+    async def search_stream(
+        self,
+        search_request_id: str,
+        query: str,
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
+    ) -> Response[AsyncIterator[RatedAnswerChunk]]:
+        """Perform a search like `search`, but stream the answer as it is generated."""
+        """
+        Args:
+            search_request_id: the ID used to identify the search request
+            query: the search query string
+            num_results: the most records to answer from
+            criteria: restricts the search like in `search`
+        Returns:
+            A Response object containing an async iterator of RatedAnswerChunk or error information. The first chunk carries the rated sources, and every following chunk carries the next piece of the answer.
+        """
+        ...
+
+    async def search_many(
+        self,
+        search_request_id: str,
+        queries: Sequence[str],
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
+    ) -> Response[list[RatedAnswer]]:
+        """Perform a search like `search` for each of many queries in one go."""
+        """
+        Args:
+            search_request_id: the ID used to identify the search request
+            queries: the search query strings
+            num_results: the most records to answer each query from
+            criteria: restricts the search like in `search`, for every query
+        Returns:
+            A Response object containing one RatedAnswer per query, in the same order as the queries, or error information.
+        """
+        ...
+
 
 class IQueryFlowListener(Protocol):
     async def on_request_search(self, response: Response[str]) -> None:
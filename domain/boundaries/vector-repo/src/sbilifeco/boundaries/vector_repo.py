@@ -1,13 +1,15 @@
 from __future__ import annotations
-from typing import Any, Protocol
+from typing import Any, AsyncIterator, Protocol, Sequence
 from sbilifeco.models.base import Response
-from sbilifeco.models.vectorisation import VectorisedRecord
+from sbilifeco.models.vectorisation import VectorisedRecord, VectorisedRecordPage
 
 
 class VectorRepoListener(Protocol): ...
 
 
 class BaseVectorRepo:
+    DEFAULT_PAGE_SIZE = 256
+
     def __init__(self):
         self.repo_listeners: list[VectorRepoListener] = []
 
@@ -17,6 +19,20 @@ class BaseVectorRepo:
     async def crupdate(self, record: VectorisedRecord) -> Response[None]:
         raise NotImplementedError()
 
+    async def crupdate_many(
+        self, records: Sequence[VectorisedRecord]
+    ) -> Response[None]:
+        """Create or update many records. Implementations that can write in bulk should override this; the default falls back to `crupdate` per record."""
+        try:
+            for record in records:
+                response = await self.crupdate(record)
+                if not response.is_success:
+                    return response
+
+            return Response.ok(None)
+        except Exception as e:
+            return Response.error(e)
+
     async def delete_by_id(self, record_id: str) -> Response[None]:
         raise NotImplementedError()
 
@@ -27,11 +43,104 @@ class BaseVectorRepo:
         raise NotImplementedError()
 
     async def read_by_criteria(
-        self, criteria: dict[str, Any]
+        self, criteria: dict[str, Any], include_vectors: bool = False
     ) -> Response[list[VectorisedRecord]]:
+        """Read every record whose metadata matches the criteria. Vectors are only filled in when `include_vectors` is set."""
         raise NotImplementedError()
 
+    async def read_page_by_criteria(
+        self,
+        criteria: dict[str, Any],
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        include_vectors: bool = False,
+        include_documents: bool = True,
+    ) -> Response[VectorisedRecordPage]:
+        """
+        Read one page of the records whose metadata matches the criteria.
+        Args:
+            criteria (dict[str, Any]): Metadata the records must match.
+            page_size (int): The most records in the page.
+            cursor (str | None): The `next_cursor` of the previous page, or None for the first page.
+            include_vectors (bool): Fill in the vectors of the records.
+            include_documents (bool): Fill in the documents of the records. Leave out to save memory when only metadata is needed.
+        """
+        raise NotImplementedError()
+
+    async def stream_by_criteria(
+        self,
+        criteria: dict[str, Any],
+        page_size: int = DEFAULT_PAGE_SIZE,
+        include_vectors: bool = False,
+        include_documents: bool = True,
+    ) -> Response[AsyncIterator[VectorisedRecord]]:
+        """Iterate over every record whose metadata matches the criteria, holding one page in memory at a time. The first page is read before returning, so a failing repo is reported in the response; failures on later pages are raised from the iterator."""
+        try:
+            first_page = await self.read_page_by_criteria(
+                criteria, page_size, None, include_vectors, include_documents
+            )
+            if not first_page.is_success or first_page.payload is None:
+                return Response.fail(first_page.message, first_page.code)
+
+            async def records(
+                page: VectorisedRecordPage,
+            ) -> AsyncIterator[VectorisedRecord]:
+                while True:
+                    for record in page.records:
+                        yield record
+                    if not page.next_cursor:
+                        return
+
+                    response = await self.read_page_by_criteria(
+                        criteria,
+                        page_size,
+                        page.next_cursor,
+                        include_vectors,
+                        include_documents,
+                    )
+                    if not response.is_success or response.payload is None:
+                        raise Exception(response.message)
+                    page = response.payload
+
+            return Response.ok(records(first_page.payload))
+        except Exception as e:
+            return Response.error(e)
+
     async def search_by_vector(
-        self, vector: list[float], num_results: int = 5
+        self,
+        vector: Sequence[float | int],
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
+        text: str | None = None,
     ) -> Response[list[VectorisedRecord]]:
+        """
+        Search for the records nearest to the vector.
+        Args:
+            vector (Sequence[float | int]): The vector to search with.
+            num_results (int): The most records to return.
+            criteria (dict[str, Any] | None): Only records whose metadata matches are searched. A list value matches any of its items, so `{"source_id": [a, b]}` restricts the search to two materials.
+            text (str | None): The text the vector was made from. Repos that also match on terms use it; others ignore it.
+        """
         raise NotImplementedError()
+
+    async def search_by_vectors(
+        self,
+        vectors: Sequence[Sequence[float | int]],
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
+        texts: Sequence[str] | None = None,
+    ) -> Response[list[list[VectorisedRecord]]]:
+        """Search like `search_by_vector` for many vectors in one go. `texts`, if given, holds the text of each vector. The response holds one list of records per vector, in the same order as the vectors. Implementations that can search in batches should override this; the default falls back to `search_by_vector` per vector."""
+        try:
+            results: list[list[VectorisedRecord]] = []
+            for i, vector in enumerate(vectors):
+                response = await self.search_by_vector(
+                    vector, num_results, criteria, texts[i] if texts else None
+                )
+                if not response.is_success:
+                    return Response.fail(response.message, response.code)
+                results.append(response.payload or [])
+
+            return Response.ok(results)
+        except Exception as e:
+            return Response.error(e)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Protocol
+from typing import Protocol, Sequence
 from sbilifeco.models.base import Response
 
 
@@ -13,7 +13,7 @@ class BaseVectoriser:
 
     async def vectorise(
         self, request_id: str, material: str | bytes | bytearray
-    ) -> Response[list[float | int]]:
+    ) -> Response[Sequence[float | int]]:
         """
         Vectorise the given material.
         Args:
@@ -22,17 +22,43 @@ class BaseVectoriser:
         """
         raise NotImplementedError()
 
+    async def vectorise_many(
+        self, request_id: str, materials: Sequence[str | bytes | bytearray]
+    ) -> Response[list[Sequence[float | int]]]:
+        """
+        Vectorise the given materials in one go.
+        Args:
+            request_id (str): A request ID that uniquely identifies this request and is useful when using listeners.
+            materials (Sequence[str | bytes | bytearray]): The materials to vectorise.
+        Returns:
+            A response containing one vector per material, in the same order as the materials.
+        Implementations that can embed a batch natively should override this. The default falls back to `vectorise` per material.
+        """
+        try:
+            vectors: list[Sequence[float | int]] = []
+            for material in materials:
+                response = await self.vectorise(request_id, material)
+                if not response.is_success:
+                    return Response.fail(response.message, response.code)
+                elif response.payload is None:
+                    return Response.fail("Vector is inexplicably empty", 500)
+                vectors.append(response.payload)
+
+            return Response.ok(vectors)
+        except Exception as e:
+            return Response.error(e)
+
 
 class IVectoriserListener(Protocol):
     async def on_vectorised(
         self,
         request_id: str,
-        response: Response[list[float | int]],
+        response: Response[Sequence[float | int]],
     ) -> None:
         """
         Called when a material has been vectorised.
         Args:
             request_id (str): The request ID for which this result is relevant.
-            response (Response[list[float | int]]): The response that contains the vectorised material.
+            response (Response[Sequence[float | int]]): The response that contains the vectorised material.
         """
         ...
@@ -1,15 +1,196 @@
-from pydantic import BaseModel
+from __future__ import annotations
+from json import dumps, loads
+from struct import Struct
+from typing import Any, Iterable, Iterator, Sequence, overload
+from numpy import array_equal, ascontiguousarray, float32, frombuffer, stack
+from numpy.typing import ArrayLike, NDArray
+from pydantic import BaseModel, Field, GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic.json_schema import JsonSchemaValue
+from pydantic_core import core_schema
+
+
+class Float32Vector(Sequence[float]):
+    """
+    A vector held as one contiguous float32 buffer instead of a list of boxed floats.
+    It reads and compares like a list of floats, and turns into one only when serialised to JSON.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: ArrayLike | Iterable[float | int] = ()) -> None:
+        try:
+            self.values: NDArray[float32] = ascontiguousarray(values, dtype=float32)
+        except TypeError as e:
+            raise ValueError(f"Cannot hold {type(values).__name__} as a vector") from e
+        if self.values.ndim != 1:
+            raise ValueError(f"Expected one dimension, got {self.values.ndim}")
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @overload
+    def __getitem__(self, index: int) -> float: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Float32Vector: ...
+
+    def __getitem__(self, index: int | slice) -> float | Float32Vector:
+        if isinstance(index, slice):
+            return Float32Vector(self.values[index])
+        return float(self.values[index])
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self.values.tolist())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Float32Vector):
+            return array_equal(self.values, other.values)
+        if isinstance(other, (str, bytes)) or not isinstance(other, Sequence):
+            return NotImplemented
+        try:
+            return array_equal(self.values, Float32Vector(other).values)
+        except ValueError:
+            return False
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Float32Vector({self.values.tolist()})"
+
+    def __reduce__(self) -> tuple[type[Float32Vector], tuple[NDArray[float32]]]:
+        return Float32Vector, (self.values,)
+
+    def __array__(self, dtype: Any = None, copy: bool | None = None) -> NDArray[Any]:
+        if dtype is None or dtype == self.values.dtype:
+            return self.values.copy() if copy else self.values
+        return self.values.astype(dtype)
+
+    def tolist(self) -> list[float]:
+        return self.values.tolist()
+
+    @classmethod
+    def _validate(cls, value: Any) -> Float32Vector:
+        return value if isinstance(value, Float32Vector) else cls(value)
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                cls.tolist, when_used="json"
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler
+    ) -> JsonSchemaValue:
+        return handler(core_schema.list_schema(core_schema.float_schema()))
 
 
 class RecordMetadata(BaseModel):
     source_id: str
     source: str = ""
     chunk_num: int = 0
+    content_hash: str = ""
 
 
 class VectorisedRecord(BaseModel):
     id: str
     document: str | bytes | None = None
-    vector: list[int | float] = []
+    vector: Float32Vector = Field(default_factory=Float32Vector)
     metadata: RecordMetadata | None = None
     score: float = 0.0
+
+
+class VectorisedRecordPage(BaseModel):
+    records: list[VectorisedRecord] = []
+    next_cursor: str | None = None
+    """Opaque cursor of the page after this one. None when this is the last page."""
+
+
+PACKED_VECTORS_MEDIA_TYPE = "application/x-packed-vectors"
+"""Vectors as a header followed by little-endian float32 values, row after row."""
+
+PACKED_RECORDS_MEDIA_TYPE = "application/x-packed-records"
+"""Packed vectors of records, followed by the records without their vectors as a JSON list."""
+
+_PACKED_VECTORS_MAGIC = b"VF32"
+_PACKED_VECTORS_HEADER = Struct("<4sII")
+
+
+def can_pack_vectors(vectors: Sequence[Sequence[float | int]]) -> bool:
+    """Whether the vectors are all of the same length, which packing needs. Records not vectorised yet have empty vectors."""
+    return len({len(vector) for vector in vectors}) <= 1
+
+
+def pack_vectors(vectors: Sequence[Sequence[float | int]]) -> bytes:
+    """Packs vectors of equal length. Raises ValueError if their lengths differ. Check with `can_pack_vectors` first."""
+    dimension = len(vectors[0]) if vectors else 0
+    for vector in vectors:
+        if len(vector) != dimension:
+            raise ValueError(
+                f"Cannot pack vectors of length {len(vector)} and {dimension} together"
+            )
+
+    values = (
+        stack([Float32Vector(vector).values for vector in vectors])
+        .astype("<f4")
+        .tobytes()
+        if vectors
+        else b""
+    )
+    return (
+        _PACKED_VECTORS_HEADER.pack(_PACKED_VECTORS_MAGIC, len(vectors), dimension)
+        + values
+    )
+
+
+def unpack_vectors(data: bytes | bytearray | memoryview) -> list[Float32Vector]:
+    return _unpack_vectors(data)[0]
+
+
+def _unpack_vectors(
+    data: bytes | bytearray | memoryview,
+) -> tuple[list[Float32Vector], int]:
+    magic, count, dimension = _PACKED_VECTORS_HEADER.unpack_from(data)
+    if magic != _PACKED_VECTORS_MAGIC:
+        raise ValueError("Data does not hold packed vectors")
+
+    start = _PACKED_VECTORS_HEADER.size
+    end = start + count * dimension * 4
+    if len(data) < end:
+        raise ValueError(f"Expected {end} bytes of packed vectors, got {len(data)}")
+
+    # One copy into native float32, after which each vector is a view of its row
+    values = (
+        frombuffer(data, dtype="<f4", count=count * dimension, offset=start)
+        .astype(float32)
+        .reshape(count, dimension)
+    )
+    return [Float32Vector(row) for row in values], end
+
+
+def pack_records(records: Sequence[VectorisedRecord]) -> bytes:
+    packed_vectors = pack_vectors([record.vector for record in records])
+    records_without_vectors = [
+        record.model_dump(mode="json", exclude={"vector"}) for record in records
+    ]
+    return packed_vectors + dumps(records_without_vectors).encode("utf-8")
+
+
+def unpack_records(data: bytes | bytearray | memoryview) -> list[VectorisedRecord]:
+    vectors, end = _unpack_vectors(data)
+    records_without_vectors = loads(bytes(memoryview(data)[end:]))
+    if len(records_without_vectors) != len(vectors):
+        raise ValueError(
+            f"Got {len(vectors)} vectors for {len(records_without_vectors)} records"
+        )
+
+    records = [VectorisedRecord.model_validate(map) for map in records_without_vectors]
+    for record, vector in zip(records, vectors):
+        # Already a Float32Vector, so there is nothing for pydantic to validate
+        record.vector = vector
+    return records
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
-from io import BufferedIOBase, RawIOBase, TextIOBase
-from uuid import uuid4
-from typing import Any
-from datetime import datetime
+from asyncio import Queue, Semaphore, Task, gather, create_task, to_thread
+from codecs import getincrementaldecoder
+from hashlib import sha256
+from io import BufferedIOBase, IOBase, RawIOBase, TextIOBase
+from pathlib import Path
+from uuid import UUID, uuid4, uuid5
+from typing import AsyncIterator, Sequence
+from datetime import datetime, timedelta
 
 from sbilifeco.boundaries.material_reader import BaseMaterialReader
-from sbilifeco.boundaries.product_analyst.ingest_flow import BaseIngestFlow
+from sbilifeco.boundaries.product_analyst.ingest_flow import (
+    BaseIngestFlow,
+    IngestionState,
+    IngestionStatus,
+)
 from sbilifeco.boundaries.vector_repo import BaseVectorRepo
 from sbilifeco.boundaries.vectoriser import BaseVectoriser
 from sbilifeco.boundaries.id_name_repo import (
@@ -19,12 +27,34 @@ from sbilifeco.models.base import Response
 from sbilifeco.models.vectorisation import VectorisedRecord, RecordMetadata
 
 
+class _IngestStageError(Exception):
+    def __init__(self, response: Response) -> None:
+        super().__init__(response.message)
+        self.response = response
+
+
 class IngestFlow(BaseIngestFlow):
-    LOGICAL_CHUNK_DELIMITER = "#=====#"
+    LOGICAL_CHUNK_DELIMITER = BaseMaterialReader.LOGICAL_CHUNK_DELIMITER
+    DEFAULT_BATCH_SIZE = 32
+    DEFAULT_VECTORISE_CONCURRENCY = 2
+    DEFAULT_STORE_CONCURRENCY = 2
+    DEFAULT_MAX_IN_FLIGHT_CHUNKS = 256
+    DEFAULT_STATUS_RETENTION = timedelta(hours=1)
+    HASH_READ_SIZE = 1024 * 1024
+    RECORD_ID_NAMESPACE = UUID("5c1e4d0a-8f1b-4f7e-9a43-2b6f0d7c9e21")
 
     def __init__(self) -> None:
         super().__init__()
-        self.ingestion_requests: dict[str, Any] = {}
+        self.batch_size = self.DEFAULT_BATCH_SIZE
+        self.pipelined = False
+        self.vectorise_concurrency = self.DEFAULT_VECTORISE_CONCURRENCY
+        self.store_concurrency = self.DEFAULT_STORE_CONCURRENCY
+        self.max_in_flight_chunks = self.DEFAULT_MAX_IN_FLIGHT_CHUNKS
+        self.status_retention = self.DEFAULT_STATUS_RETENTION
+        self.deduplication = True
+        self.replace_previous_versions = True
+        self.ingestion_requests: dict[str, IngestionStatus] = {}
+        self.ingestion_tasks: dict[str, Task] = {}
         self.material_reader: BaseMaterialReader
         self.vectoriser: BaseVectoriser
         self.vector_repo: BaseVectorRepo
@@ -46,14 +76,61 @@ class IngestFlow(BaseIngestFlow):
         self.id_name_repo = id_name_repo
         return self
 
+    def set_batch_size(self, batch_size: int) -> IngestFlow:
+        self.batch_size = max(1, batch_size)
+        return self
+
+    def set_pipelined(self, pipelined: bool) -> IngestFlow:
+        """When set, reading, vectorising and storing run as concurrent stages"""
+        self.pipelined = pipelined
+        return self
+
+    def set_vectorise_concurrency(self, vectorise_concurrency: int) -> IngestFlow:
+        self.vectorise_concurrency = max(1, vectorise_concurrency)
+        return self
+
+    def set_store_concurrency(self, store_concurrency: int) -> IngestFlow:
+        self.store_concurrency = max(1, store_concurrency)
+        return self
+
+    def set_max_in_flight_chunks(self, max_in_flight_chunks: int) -> IngestFlow:
+        """Caps the number of chunks that have been read but not yet stored"""
+        self.max_in_flight_chunks = max(1, max_in_flight_chunks)
+        return self
+
+    def set_status_retention(self, seconds: float) -> IngestFlow:
+        """How long the status of a finished or unused ingestion request is kept"""
+        self.status_retention = timedelta(seconds=seconds)
+        return self
+
+    def set_deduplication(self, deduplication: bool) -> IngestFlow:
+        """When set, identical materials are not ingested twice and unchanged chunks reuse their stored vectors"""
+        self.deduplication = deduplication
+        return self
+
+    def set_replace_previous_versions(
+        self, replace_previous_versions: bool
+    ) -> IngestFlow:
+        """When set, records of earlier versions of a material are deleted once the new version is completely stored"""
+        self.replace_previous_versions = replace_previous_versions
+        return self
+
     async def async_init(self) -> None: ...
 
-    async def async_shutdown(self) -> None: ...
+    async def async_shutdown(self) -> None:
+        tasks = list(self.ingestion_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await gather(*tasks, return_exceptions=True)
 
     async def request_ingestion(self) -> Response[str]:
         try:
+            self._purge_expired_statuses()
+
             request_id = str(uuid4())
-            self.ingestion_requests[request_id] = None
+            self.ingestion_requests[request_id] = IngestionStatus(
+                requested_at=datetime.now()
+            )
             return Response.ok(request_id)
         except Exception as e:
             return Response.error(e)
@@ -65,95 +142,615 @@ class IngestFlow(BaseIngestFlow):
         source: str | bytes | bytearray | TextIOBase | BufferedIOBase | RawIOBase,
     ) -> Response[None]:
         try:
-            # Read from source
-            print("Ask material reader to read from source")
-            read_response = await self.material_reader.read_and_chunk(source)
-            if not read_response.is_success:
-                print(f"Error while reading material: {read_response.message}")
-                return Response.fail(read_response.message, read_response.code)
-            elif read_response.payload is None:
-                return Response.fail("Sequence of chunks is inexplicably empty", 500)
-
-            material_id = uuid4().hex
-            entity_request_id = uuid4().hex
-            entity = IDNameEntity(id=material_id, name=title, created_at=datetime.now())
-
-            print(f"Mark an entry to map ID {material_id} to name {title}")
-            entity_response = await self.id_name_repo.crupdate(
-                entity_request_id, entity
+            status_response = self._claim_ingestion_request(
+                ingestion_request, reusable=True
+            )
+            if not status_response.is_success or status_response.payload is None:
+                return Response.fail(status_response.message, status_response.code)
+
+            return await self._run_ingestion(
+                ingestion_request, status_response.payload, title, source
+            )
+        except Exception as e:
+            return Response.error(e)
+
+    async def start_ingestion(
+        self,
+        ingestion_request: str,
+        title: str,
+        source: str | bytes | bytearray | TextIOBase | BufferedIOBase | RawIOBase,
+    ) -> Response[None]:
+        try:
+            status_response = self._claim_ingestion_request(ingestion_request)
+            if not status_response.is_success or status_response.payload is None:
+                return Response.fail(status_response.message, status_response.code)
+
+            print(f"Starting ingestion {ingestion_request} in the background")
+            task = create_task(
+                self._run_ingestion(
+                    ingestion_request,
+                    status_response.payload,
+                    title,
+                    source,
+                    close_source=True,
+                )
+            )
+            self.ingestion_tasks[ingestion_request] = task
+            task.add_done_callback(
+                lambda _: self.ingestion_tasks.pop(ingestion_request, None)
+            )
+
+            return Response.ok(None)
+        except Exception as e:
+            return Response.error(e)
+
+    async def get_ingestion_status(
+        self, ingestion_request: str
+    ) -> Response[IngestionStatus]:
+        try:
+            status = self.ingestion_requests.get(ingestion_request)
+            if status is None:
+                return Response.fail(
+                    f"Ingestion request {ingestion_request} not found", 404
+                )
+
+            if status.started_at is not None:
+                elapsed = (
+                    (status.finished_at or datetime.now()) - status.started_at
+                ).total_seconds()
+                if elapsed > 0:
+                    status.chunks_per_second = status.chunks_stored / elapsed
+                    status.bytes_per_second = status.bytes_processed / elapsed
+
+            return Response.ok(status)
+        except Exception as e:
+            return Response.error(e)
+
+    def _claim_ingestion_request(
+        self, ingestion_request: str, reusable: bool = False
+    ) -> Response[IngestionStatus]:
+        status = self.ingestion_requests.get(ingestion_request)
+        if reusable and (
+            status is None
+            or status.state in (IngestionState.COMPLETED, IngestionState.FAILED)
+        ):
+            # `ingest` predates `request_ingestion`, so callers may still make up IDs or reuse finished ones
+            self._purge_expired_statuses()
+            status = IngestionStatus(requested_at=datetime.now())
+            self.ingestion_requests[ingestion_request] = status
+
+        if status is None:
+            return Response.fail(
+                f"Ingestion request {ingestion_request} not found", 404
+            )
+        elif status.state != IngestionState.REQUESTED:
+            return Response.fail(
+                f"Ingestion request {ingestion_request} has already been used", 409
+            )
+
+        status.state = IngestionState.RUNNING
+        return Response.ok(status)
+
+    def _purge_expired_statuses(self) -> None:
+        expiry = datetime.now() - self.status_retention
+        expired = [
+            request_id
+            for request_id, status in self.ingestion_requests.items()
+            if status.state != IngestionState.RUNNING
+            and (status.finished_at or status.requested_at or expiry) < expiry
+        ]
+        for request_id in expired:
+            del self.ingestion_requests[request_id]
+
+    async def _run_ingestion(
+        self,
+        ingestion_request: str,
+        status: IngestionStatus,
+        title: str,
+        source: str | bytes | bytearray | TextIOBase | BufferedIOBase | RawIOBase,
+        close_source: bool = False,
+    ) -> Response[None]:
+        status.state = IngestionState.RUNNING
+        status.title = title
+        status.started_at = datetime.now()
+
+        try:
+            response = await self._ingest(status, title, source)
+        except Exception as e:
+            response = Response.error(e)
+        finally:
+            # Background ingestions own their source, since the caller has moved on
+            if close_source and isinstance(source, IOBase):
+                source.close()
+
+        status.finished_at = datetime.now()
+        if response.is_success:
+            status.state = IngestionState.COMPLETED
+        else:
+            status.state = IngestionState.FAILED
+            status.error = response.message or "Unknown error"
+
+        for listener in self.listeners:
+            try:
+                await listener.on_ingest(ingestion_request, response)
+            except Exception as e:
+                print(f"Listener failed on ingestion {ingestion_request}: {e}")
+
+        # Even a failed ingestion may have written some of its records
+        if not status.is_unchanged and (
+            response.is_success or status.chunks_stored > 0
+        ):
+            for listener in self.listeners:
+                try:
+                    await listener.on_material_changed(status.material_id, title)
+                except Exception as e:
+                    print(f"Listener failed on material change of {title}: {e}")
+
+        return response
+
+    async def _ingest(
+        self,
+        status: IngestionStatus,
+        title: str,
+        source: str | bytes | bytearray | TextIOBase | BufferedIOBase | RawIOBase,
+    ) -> Response[None]:
+        # Identify the material by its content, so that re-uploads land on the same ID
+        content_hash = await self._hash_source(source) if self.deduplication else None
+        material_id = content_hash or uuid4().hex
+        status.material_id = material_id
+
+        existing_entity: IDNameEntity | None = None
+        if content_hash is not None:
+            existing_response = await self.id_name_repo.read_by_id(
+                uuid4().hex, material_id
+            )
+            if existing_response.is_success:
+                existing_entity = existing_response.payload
+
+        if existing_entity is not None and existing_entity.name == title:
+            print(f"Material {material_id} has already been ingested as {title}")
+            status.is_unchanged = True
+            return Response.ok(None)
+
+        reusable_vectors: dict[str, Sequence[float | int]] = {}
+        previous_material_ids: set[str] = set()
+        if self.deduplication or self.replace_previous_versions:
+            previous_response = await self._read_previous_versions(
+                title, material_id if existing_entity is not None else None
+            )
+            if not previous_response.is_success or previous_response.payload is None:
+                # Without knowing the previous versions, they could not be replaced
+                return Response.fail(previous_response.message, previous_response.code)
+            reusable_vectors, previous_material_ids = previous_response.payload
+            if self.deduplication:
+                print(f"{len(reusable_vectors)} vectors can be reused")
+
+        # Read from source
+        print("Ask material reader to read from source")
+        read_response = await self.material_reader.read_and_chunk(source)
+        if not read_response.is_success:
+            print(f"Error while reading material: {read_response.message}")
+            return Response.fail(read_response.message, read_response.code)
+        elif read_response.payload is None:
+            return Response.fail("Sequence of chunks is inexplicably empty", 500)
+
+        if self.pipelined:
+            ingest_response = await self._ingest_pipelined(
+                status, material_id, title, read_response.payload, reusable_vectors
+            )
+        else:
+            ingest_response = await self._ingest_sequentially(
+                status, material_id, title, read_response.payload, reusable_vectors
+            )
+        if not ingest_response.is_success:
+            return ingest_response
+
+        # The entity goes in last, so that it only ever marks a completely ingested material
+        entity = IDNameEntity(
+            id=material_id,
+            name=title,
+            created_at=(
+                existing_entity.created_at
+                if existing_entity is not None
+                else datetime.now()
+            ),
+            updated_at=datetime.now(),
+        )
+
+        print(f"Mark an entry to map ID {material_id} to name {title}")
+        entity_response = await self.id_name_repo.crupdate(uuid4().hex, entity)
+        if not entity_response.is_success:
+            print(f"Error while creating ID-name mapping: {entity_response.message}")
+            return Response.fail(entity_response.message, entity_response.code)
+
+        if self.replace_previous_versions:
+            await self._delete_previous_versions(
+                material_id, previous_material_ids - {material_id}
+            )
+
+        print("Ingestion completed successfully")
+        return Response.ok(None)
+
+    async def _hash_source(
+        self,
+        source: str | bytes | bytearray | TextIOBase | BufferedIOBase | RawIOBase,
+    ) -> str | None:
+        if isinstance(source, str) and source.startswith("file://"):
+            # The same path can hold a new version of the material, so its contents are what count
+            the_path = Path(source[7:])
+            if not the_path.is_file():
+                return None
+            return await to_thread(self._hash_path, the_path)
+        elif isinstance(source, str):
+            return sha256(source.encode("utf-8")).hexdigest()
+        elif isinstance(source, (bytes, bytearray)):
+            return sha256(source).hexdigest()
+        elif isinstance(source, IOBase) and source.seekable():
+            # File-likes are hashed off the event loop and rewound for the reader
+            return await to_thread(self._hash_file, source)
+
+        # A stream that cannot be rewound can only be read once, by the reader
+        return None
+
+    def _hash_path(self, the_path: Path) -> str:
+        with open(the_path, "rb") as source:
+            return self._hash_file(source)
+
+    def _hash_file(self, source: IOBase) -> str:
+        hasher = sha256()
+        start = source.tell()
+        try:
+            while piece := source.read(self.HASH_READ_SIZE):
+                hasher.update(
+                    piece.encode("utf-8") if isinstance(piece, str) else piece
+                )
+        finally:
+            source.seek(start)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _hash_chunk(logical_chunk: str) -> str:
+        return sha256(logical_chunk.encode("utf-8")).hexdigest()
+
+    async def _read_previous_versions(
+        self, title: str, material_id: str | None
+    ) -> Response[tuple[dict[str, Sequence[float | int]], set[str]]]:
+        """Vectors of previous versions by content hash, and the IDs of those versions"""
+        # Previous versions of a material share its title. A renamed material shares its ID.
+        criteria: list[dict[str, str]] = [{"source": title}]
+        if material_id is not None:
+            criteria.append({"source_id": material_id})
+
+        reusable_vectors: dict[str, Sequence[float | int]] = {}
+        previous_material_ids: set[str] = set()
+        for criterion in criteria:
+            print(
+                f"Ask vector repo for records of previous versions matching {criterion}"
+            )
+            # Records are streamed a page at a time, and only what is needed of them is kept
+            stream_response = await self.vector_repo.stream_by_criteria(
+                criterion, include_vectors=self.deduplication, include_documents=False
+            )
+            if stream_response.code == 404:
+                # No previous version is not an error. It is simply a new material.
+                continue
+            elif not stream_response.is_success or stream_response.payload is None:
+                print(
+                    f"Error while reading records of previous versions: {stream_response.message}"
+                )
+                return Response.fail(stream_response.message, stream_response.code)
+
+            async for record in stream_response.payload:
+                if record.metadata is None:
+                    continue
+                previous_material_ids.add(record.metadata.source_id)
+                if (
+                    self.deduplication
+                    and record.metadata.content_hash
+                    and record.vector
+                ):
+                    reusable_vectors[record.metadata.content_hash] = record.vector
+
+        return Response.ok((reusable_vectors, previous_material_ids))
+
+    async def _delete_previous_versions(
+        self, material_id: str, previous_material_ids: set[str]
+    ) -> None:
+        # The new version is already completely stored, so a failure here only
+        # leaves stale records behind. It does not fail the ingestion.
+        for previous_material_id in previous_material_ids:
+            print(
+                f"Ask vector repo to delete records of {previous_material_id}, replaced by {material_id}"
+            )
+            delete_response = await self.vector_repo.delete_by_criteria(
+                {"source_id": previous_material_id}
+            )
+            if not delete_response.is_success:
+                print(
+                    f"Error while deleting records of {previous_material_id}: {delete_response.message}"
+                )
+                continue
+
+            entity_response = await self.id_name_repo.delete_by_id(
+                uuid4().hex, previous_material_id
             )
             if not entity_response.is_success:
                 print(
-                    f"Error while creating ID-name mapping: {entity_response.message}"
+                    f"Error while deleting entity {previous_material_id}: {entity_response.message}"
                 )
-                return Response.fail(entity_response.message, entity_response.code)
 
-            chunk_num = 0
-            logical_chunk = ""
-            async for network_chunk in read_response.payload:
-                if isinstance(network_chunk, (bytes, bytearray, memoryview)):
-                    network_chunk = bytes(network_chunk).decode("utf-8")
+    def _record_id(self, material_id: str, chunk_num: int) -> str:
+        # Re-ingesting a material overwrites its records instead of duplicating them
+        return uuid5(self.RECORD_ID_NAMESPACE, f"{material_id}:{chunk_num}").hex
 
-                if not network_chunk:
-                    print(f"Chunk {chunk_num} is empty, skipping")
-                    continue
+    async def _logical_chunks(
+        self, status: IngestionStatus, network_chunks: AsyncIterator[str | bytes]
+    ) -> AsyncIterator[str]:
+        decoder = getincrementaldecoder("utf-8")()
+        pending = ""
+        async for network_chunk in network_chunks:
+            if isinstance(network_chunk, (bytes, bytearray, memoryview)):
+                status.bytes_processed += len(network_chunk)
+                network_chunk = decoder.decode(bytes(network_chunk))
+            elif network_chunk:
+                status.bytes_processed += len(network_chunk.encode("utf-8"))
+
+            if not network_chunk:
+                continue
+
+            pending += network_chunk
+            *logical_chunks, pending = pending.split(self.LOGICAL_CHUNK_DELIMITER)
+            for logical_chunk in logical_chunks:
+                if logical_chunk.strip():
+                    status.chunks_read += 1
+                    yield logical_chunk
+
+        pending += decoder.decode(b"", final=True)
+        if pending.strip():
+            status.chunks_read += 1
+            yield pending
+
+    async def _ingest_sequentially(
+        self,
+        status: IngestionStatus,
+        material_id: str,
+        title: str,
+        network_chunks: AsyncIterator[str | bytes],
+        reusable_vectors: dict[str, Sequence[float | int]],
+    ) -> Response[None]:
+        chunk_num = 0
+        batch: list[str] = []
+        async for logical_chunk in self._logical_chunks(status, network_chunks):
+            batch.append(logical_chunk)
+            if len(batch) < self.batch_size:
+                continue
+
+            batch_response = await self._vectorise_and_store(
+                status, material_id, title, chunk_num, batch, reusable_vectors
+            )
+            if not batch_response.is_success:
+                return batch_response
+
+            chunk_num += len(batch)
+            batch = []
+
+        if batch:
+            batch_response = await self._vectorise_and_store(
+                status, material_id, title, chunk_num, batch, reusable_vectors
+            )
+            if not batch_response.is_success:
+                return batch_response
+
+        return Response.ok(None)
 
-                logical_chunk += network_chunk
+    async def _ingest_pipelined(
+        self,
+        status: IngestionStatus,
+        material_id: str,
+        title: str,
+        network_chunks: AsyncIterator[str | bytes],
+        reusable_vectors: dict[str, Sequence[float | int]],
+    ) -> Response[None]:
+        # A batch can never hold more chunks than are allowed in flight
+        batch_size = min(self.batch_size, self.max_in_flight_chunks)
+        in_flight = Semaphore(self.max_in_flight_chunks)
+        to_vectorise: Queue[tuple[int, list[str]] | None] = Queue(
+            maxsize=self.vectorise_concurrency
+        )
+        to_store: Queue[list[VectorisedRecord] | None] = Queue(
+            maxsize=self.store_concurrency
+        )
 
-                if self.LOGICAL_CHUNK_DELIMITER not in logical_chunk:
+        async def __read() -> None:
+            # Chunk numbers are assigned here, in reading order, so they are
+            # unaffected by the order in which later stages complete
+            chunk_num = 0
+            batch: list[str] = []
+            async for logical_chunk in self._logical_chunks(status, network_chunks):
+                await in_flight.acquire()
+                batch.append(logical_chunk)
+                if len(batch) < batch_size:
                     continue
 
-                delimited_content = logical_chunk.split(self.LOGICAL_CHUNK_DELIMITER)
-                logical_chunk = delimited_content[0]
+                await to_vectorise.put((chunk_num, batch))
+                chunk_num += len(batch)
+                batch = []
 
-                vectorise_request_id = uuid4().hex
-                print(f"Ask vectoriser to vectorise chunk {chunk_num}")
-                vector_response = await self.vectoriser.vectorise(
-                    vectorise_request_id, logical_chunk
+            if batch:
+                await to_vectorise.put((chunk_num, batch))
+
+            for _ in range(self.vectorise_concurrency):
+                await to_vectorise.put(None)
+
+        vectorisers_left = self.vectorise_concurrency
+
+        async def __vectorise() -> None:
+            nonlocal vectorisers_left
+            while (item := await to_vectorise.get()) is not None:
+                first_chunk_num, batch = item
+                vectorise_response = await self._vectorise(
+                    status,
+                    material_id,
+                    title,
+                    first_chunk_num,
+                    batch,
+                    reusable_vectors,
                 )
-                if not vector_response.is_success:
-                    print(
-                        f"Error while vectorising chunk {chunk_num}: {vector_response.message}"
+                if not vectorise_response.is_success:
+                    raise _IngestStageError(vectorise_response)
+                elif vectorise_response.payload is None:
+                    raise _IngestStageError(
+                        Response.fail("Records are inexplicably empty", 500)
                     )
-                    return Response.fail(vector_response.message, vector_response.code)
-                elif vector_response.payload is None:
-                    return Response.fail("Vector is inexplicably empty", 500)
-
-                print(f"Chunk {chunk_num} vectorised")
-                vector = vector_response.payload
-
-                record_id = uuid4().hex
-
-                record = VectorisedRecord(
-                    id=record_id,
-                    vector=vector,
-                    document=title + "\n\n" + logical_chunk,
-                    metadata=RecordMetadata(
-                        source_id=material_id, chunk_num=chunk_num, source=title
-                    ),
-                )
+                await to_store.put(vectorise_response.payload)
 
-                print(f"Ask vector repo to store vector for chunk {chunk_num}")
-                crupdate_response = await self.vector_repo.crupdate(record)
-                if not crupdate_response.is_success:
-                    print(
-                        f"Error while storing vector for chunk {chunk_num}: {crupdate_response.message}"
-                    )
-                    return Response.fail(
-                        crupdate_response.message, crupdate_response.code
-                    )
-                print(f"Chunk {chunk_num} vector stored in vector repo")
+            # The last vectoriser to finish tells the storers to stop
+            vectorisers_left -= 1
+            if not vectorisers_left:
+                for _ in range(self.store_concurrency):
+                    await to_store.put(None)
+
+        async def __store() -> None:
+            while (records := await to_store.get()) is not None:
+                store_response = await self._store(status, records)
+                if not store_response.is_success:
+                    raise _IngestStageError(store_response)
+                for _ in records:
+                    in_flight.release()
+
+        # Every worker is a stage of its own, so that a failure anywhere cancels all of them
+        stages = [
+            create_task(__read()),
+            *[create_task(__vectorise()) for _ in range(self.vectorise_concurrency)],
+            *[create_task(__store()) for _ in range(self.store_concurrency)],
+        ]
+        try:
+            await gather(*stages)
+            return Response.ok(None)
+        except _IngestStageError as e:
+            return Response.fail(e.response.message, e.response.code)
+        finally:
+            for stage in stages:
+                stage.cancel()
+            await gather(*stages, return_exceptions=True)
 
-                chunk_num += 1
+    async def _vectorise_and_store(
+        self,
+        status: IngestionStatus,
+        material_id: str,
+        title: str,
+        first_chunk_num: int,
+        batch: list[str],
+        reusable_vectors: dict[str, Sequence[float | int]],
+    ) -> Response[None]:
+        vectorise_response = await self._vectorise(
+            status, material_id, title, first_chunk_num, batch, reusable_vectors
+        )
+        if not vectorise_response.is_success:
+            return Response.fail(vectorise_response.message, vectorise_response.code)
+        elif vectorise_response.payload is None:
+            return Response.fail("Records are inexplicably empty", 500)
 
-                logical_chunk = (
-                    delimited_content[1] if len(delimited_content) > 1 else ""
+        return await self._store(status, vectorise_response.payload)
+
+    async def _vectorise(
+        self,
+        status: IngestionStatus,
+        material_id: str,
+        title: str,
+        first_chunk_num: int,
+        batch: list[str],
+        reusable_vectors: dict[str, Sequence[float | int]],
+    ) -> Response[list[VectorisedRecord]]:
+        last_chunk_num = first_chunk_num + len(batch) - 1
+
+        # Only chunks whose text is new need to go to the vectoriser
+        content_hashes = [self._hash_chunk(logical_chunk) for logical_chunk in batch]
+        vectors: list[Sequence[float | int] | None] = [
+            reusable_vectors.get(content_hash) for content_hash in content_hashes
+        ]
+        to_vectorise = [
+            logical_chunk
+            for logical_chunk, vector in zip(batch, vectors)
+            if vector is None
+        ]
+        num_reused = len(batch) - len(to_vectorise)
+        if num_reused:
+            status.chunks_reused += num_reused
+            print(
+                f"Reusing stored vectors for {num_reused} of chunks {first_chunk_num}-{last_chunk_num}"
+            )
+
+        if to_vectorise:
+            vectorise_request_id = uuid4().hex
+            print(
+                f"Ask vectoriser to vectorise {len(to_vectorise)} of chunks {first_chunk_num}-{last_chunk_num}"
+            )
+            vector_response = await self.vectoriser.vectorise_many(
+                vectorise_request_id, to_vectorise
+            )
+            if not vector_response.is_success:
+                print(
+                    f"Error while vectorising chunks {first_chunk_num}-{last_chunk_num}: {vector_response.message}"
+                )
+                return Response.fail(vector_response.message, vector_response.code)
+            elif vector_response.payload is None:
+                return Response.fail("Vectors are inexplicably empty", 500)
+            elif len(vector_response.payload) != len(to_vectorise):
+                return Response.fail(
+                    f"Expected {len(to_vectorise)} vectors, got {len(vector_response.payload)}",
+                    500,
                 )
 
-            print("Ingestion completed successfully")
+            new_vectors = iter(vector_response.payload)
+            vectors = [
+                vector if vector is not None else next(new_vectors)
+                for vector in vectors
+            ]
+        status.chunks_vectorised += len(batch)
+        print(f"Chunks {first_chunk_num}-{last_chunk_num} vectorised")
+
+        records = [
+            VectorisedRecord(
+                id=self._record_id(material_id, first_chunk_num + offset),
+                vector=vector or [],
+                document=title + "\n\n" + logical_chunk,
+                metadata=RecordMetadata(
+                    source_id=material_id,
+                    chunk_num=first_chunk_num + offset,
+                    source=title,
+                    content_hash=content_hash,
+                ),
+            )
+            for offset, (logical_chunk, vector, content_hash) in enumerate(
+                zip(batch, vectors, content_hashes)
+            )
+        ]
+
+        return Response.ok(records)
+
+    async def _store(
+        self, status: IngestionStatus, records: list[VectorisedRecord]
+    ) -> Response[None]:
+        if not records:
             return Response.ok(None)
-        except Exception as e:
-            return Response.error(e)
+
+        chunk_nums = [
+            record.metadata.chunk_num for record in records if record.metadata
+        ]
+        chunk_range = f"{min(chunk_nums)}-{max(chunk_nums)}" if chunk_nums else "?"
+
+        print(f"Ask vector repo to store vectors for chunks {chunk_range}")
+        crupdate_response = await self.vector_repo.crupdate_many(records)
+        if not crupdate_response.is_success:
+            print(
+                f"Error while storing vectors for chunks {chunk_range}: {crupdate_response.message}"
+            )
+            return Response.fail(crupdate_response.message, crupdate_response.code)
+        status.chunks_stored += len(records)
+        print(f"Chunks {chunk_range} stored in vector repo")
+
+        return Response.ok(None)
 
     async def get_materials(
         self,
@@ -3,10 +3,16 @@ import sys
 
 sys.path.append("./src")
 
+from asyncio import Event, all_tasks, sleep
+from datetime import datetime
+from hashlib import sha256
+from typing import AsyncIterator
+from io import BytesIO
 from unittest import IsolatedAsyncioTestCase
 from unittest.mock import AsyncMock, patch
-from uuid import uuid4
+from uuid import uuid4, uuid5
 from random import randint
+from tempfile import NamedTemporaryFile
 
 from dotenv import load_dotenv
 from faker import Faker
@@ -19,7 +25,9 @@ from sbilifeco.boundaries.id_name_repo import (
     SortField,
     SortDirection,
 )
+from sbilifeco.boundaries.product_analyst.ingest_flow import IngestionState
 from sbilifeco.models.base import Response
+from sbilifeco.models.vectorisation import VectorisedRecord, RecordMetadata
 
 # Import the necessary service(s) here
 from sbilifeco.flows.product_analyst.ingest_flow import IngestFlow
@@ -47,8 +55,28 @@ class IngestFlowTest(IsolatedAsyncioTestCase):
         )
         await self.service.async_init()
 
+        # Nothing has been ingested before, unless a test says otherwise
+        self.read_entity = patch.object(
+            self.id_name_repo, "read_by_id", return_value=Response.fail("", 404)
+        ).start()
+        self.previous_records: list[VectorisedRecord] = []
+        self.stream_by_criteria = patch.object(
+            self.vector_repo,
+            "stream_by_criteria",
+            side_effect=self.stream_previous_records,
+        ).start()
+
         ...
 
+    async def stream_previous_records(
+        self, criteria: dict, **kwargs
+    ) -> Response[AsyncIterator[VectorisedRecord]]:
+        async def __records():
+            for record in self.previous_records:
+                yield record
+
+        return Response.ok(__records())
+
     async def asyncTearDown(self) -> None:
         # Shutdown the service(s) here
         await self.service.async_shutdown()
@@ -70,25 +98,27 @@ class IngestFlowTest(IsolatedAsyncioTestCase):
         read_material_id = uuid4()
 
         num_chunks = 3
-        chunks: list[str | None] = [self.faker.paragraph() for _ in range(num_chunks)]
+        chunks: list[str] = [self.faker.paragraph() for _ in range(num_chunks)]
 
         async def __serve_chunk():
             for chunk in chunks:
-                yield chunk
+                yield chunk + IngestFlow.LOGICAL_CHUNK_DELIMITER
 
         read_and_chunk = patch.object(
             self.material_reader,
             "read_and_chunk",
             return_value=Response.ok(__serve_chunk()),
         ).start()
-        vectorise = patch.object(
+        vectorise_many = patch.object(
             self.vectoriser,
-            "vectorise",
-            return_value=Response.ok([randint(0, 100) for _ in range(256)]),
+            "vectorise_many",
+            return_value=Response.ok(
+                [[randint(0, 100) for _ in range(256)] for _ in range(num_chunks)]
+            ),
         ).start()
-        crupdate_material = patch.object(
+        crupdate_many = patch.object(
             self.vector_repo,
-            "crupdate",
+            "crupdate_many",
             return_value=Response.ok(None),
         ).start()
         crupdate_entity = patch.object(
@@ -121,22 +151,568 @@ class IngestFlowTest(IsolatedAsyncioTestCase):
 
         self.assertEqual(entity.name, title)
 
-        # Chunks should be vectorised
-        vectorise.assert_called()
-        self.assertEqual(vectorise.call_count, num_chunks)
+        # Chunks should be vectorised in a single batch
+        vectorise_many.assert_called_once()
+        self.assertEqual(vectorise_many.call_args.args[1], chunks)
 
-        crupdate_material.assert_called()
-        self.assertEqual(crupdate_material.call_count, num_chunks)
+        # Records should be stored in a single batch
+        crupdate_many.assert_called_once()
+        records = crupdate_many.call_args.args[0]
+        self.assertEqual(len(records), num_chunks)
 
         for i in range(num_chunks):
-            self.assertEqual(vectorise.call_args_list[i].args[1], chunks[i])
+            record = records[i]
+            self.assertEqual(record.document, title + "\n\n" + chunks[i])
+            self.assertEqual(record.metadata.source, title)
+            self.assertEqual(record.metadata.chunk_num, i)
+        ...
+
+    async def test_ingest_pipelined(self) -> None:
+        # Arrange
+        title = self.faker.sentence()
+        num_chunks = 11
+        chunks: list[str] = [self.faker.paragraph() for _ in range(num_chunks)]
+
+        async def __serve_chunk():
+            for chunk in chunks:
+                yield chunk + IngestFlow.LOGICAL_CHUNK_DELIMITER
+
+        async def __vectorise_many(request_id: str, batch: list[str]):
+            return Response.ok([[randint(0, 100) for _ in range(256)] for _ in batch])
+
+        patch.object(
+            self.material_reader,
+            "read_and_chunk",
+            return_value=Response.ok(__serve_chunk()),
+        ).start()
+        vectorise_many = patch.object(
+            self.vectoriser, "vectorise_many", side_effect=__vectorise_many
+        ).start()
+        crupdate_many = patch.object(
+            self.vector_repo, "crupdate_many", return_value=Response.ok(None)
+        ).start()
+        patch.object(
+            self.id_name_repo, "crupdate", return_value=Response.ok(None)
+        ).start()
+
+        (
+            self.service.set_pipelined(True)
+            .set_batch_size(3)
+            .set_vectorise_concurrency(2)
+            .set_store_concurrency(2)
+            .set_max_in_flight_chunks(6)
+        )
+
+        request_ingestion_response = await self.service.request_ingestion()
+        assert request_ingestion_response.payload is not None
+        ingestion_request_id = request_ingestion_response.payload
+
+        # Act
+        ingest_response = await self.service.ingest(
+            ingestion_request_id, title, self.faker.paragraph()
+        )
+
+        # Assert
+        self.assertTrue(ingest_response.is_success, ingest_response.message)
+        self.assertEqual(vectorise_many.call_count, 4)
+
+        # Every chunk should be stored exactly once, with its reading order intact
+        records = [
+            record for call in crupdate_many.call_args_list for record in call.args[0]
+        ]
+        self.assertEqual(len(records), num_chunks)
+        for record in records:
+            assert record.metadata is not None
             self.assertEqual(
-                crupdate_material.call_args_list[i].args[0].document, chunks[i]
+                record.document, title + "\n\n" + chunks[record.metadata.chunk_num]
+            )
+        self.assertEqual(
+            sorted(record.metadata.chunk_num for record in records if record.metadata),
+            list(range(num_chunks)),
+        )
+
+    async def test_ingest_pipelined_vectorise_failure(self) -> None:
+        # Arrange
+        chunks: list[str] = [self.faker.paragraph() for _ in range(11)]
+        never = Event()
+        num_calls = 0
+
+        async def __serve_chunk():
+            for chunk in chunks:
+                yield chunk + IngestFlow.LOGICAL_CHUNK_DELIMITER
+
+        async def __vectorise_many(request_id: str, batch: list[str]):
+            # The first batch fails while the other vectoriser is still busy
+            nonlocal num_calls
+            num_calls += 1
+            if num_calls == 1:
+                await sleep(0.01)
+                return Response.fail("Vectoriser is down", 503)
+            await never.wait()
+
+        patch.object(
+            self.material_reader,
+            "read_and_chunk",
+            return_value=Response.ok(__serve_chunk()),
+        ).start()
+        patch.object(
+            self.vectoriser, "vectorise_many", side_effect=__vectorise_many
+        ).start()
+        patch.object(
+            self.vector_repo, "crupdate_many", return_value=Response.ok(None)
+        ).start()
+        patch.object(
+            self.id_name_repo, "crupdate", return_value=Response.ok(None)
+        ).start()
+
+        (
+            self.service.set_pipelined(True)
+            .set_batch_size(3)
+            .set_vectorise_concurrency(2)
+            .set_store_concurrency(2)
+            .set_max_in_flight_chunks(6)
+        )
+
+        request_ingestion_response = await self.service.request_ingestion()
+        assert request_ingestion_response.payload is not None
+        tasks_before = all_tasks()
+
+        # Act
+        ingest_response = await self.service.ingest(
+            request_ingestion_response.payload,
+            self.faker.sentence(),
+            self.faker.paragraph(),
+        )
+        await sleep(0)
+
+        # Assert
+        self.assertFalse(ingest_response.is_success)
+        self.assertEqual(ingest_response.code, 503)
+        self.assertEqual(num_calls, 2)
+
+        leaked = [task for task in all_tasks() - tasks_before if not task.done()]
+        self.assertEqual(leaked, [])
+
+    async def test_start_ingestion(self) -> None:
+        # Arrange
+        title = self.faker.sentence()
+        num_chunks = 4
+        chunks: list[str] = [self.faker.paragraph() for _ in range(num_chunks)]
+
+        async def __serve_chunk():
+            for chunk in chunks:
+                yield chunk + IngestFlow.LOGICAL_CHUNK_DELIMITER
+
+        patch.object(
+            self.material_reader,
+            "read_and_chunk",
+            return_value=Response.ok(__serve_chunk()),
+        ).start()
+        patch.object(
+            self.vectoriser,
+            "vectorise_many",
+            return_value=Response.ok(
+                [[randint(0, 100) for _ in range(256)] for _ in range(num_chunks)]
+            ),
+        ).start()
+        patch.object(
+            self.vector_repo, "crupdate_many", return_value=Response.ok(None)
+        ).start()
+        patch.object(
+            self.id_name_repo, "crupdate", return_value=Response.ok(None)
+        ).start()
+
+        listener = AsyncMock()
+        self.service.add_listener(listener)
+
+        request_ingestion_response = await self.service.request_ingestion()
+        assert request_ingestion_response.payload is not None
+        ingestion_request_id = request_ingestion_response.payload
+
+        # Act
+        start_response = await self.service.start_ingestion(
+            ingestion_request_id, title, self.faker.paragraph()
+        )
+
+        # Assert
+        self.assertTrue(start_response.is_success, start_response.message)
+
+        # The same request cannot be used twice
+        reuse_response = await self.service.start_ingestion(
+            ingestion_request_id, title, self.faker.paragraph()
+        )
+        self.assertFalse(reuse_response.is_success)
+        self.assertEqual(reuse_response.code, 409)
+
+        for _ in range(100):
+            status_response = await self.service.get_ingestion_status(
+                ingestion_request_id
             )
+            assert status_response.payload is not None
+            if status_response.payload.state != IngestionState.RUNNING:
+                break
+            await sleep(0.01)
+
+        self.assertTrue(status_response.is_success, status_response.message)
+        status = status_response.payload
+        assert status is not None
+        self.assertEqual(status.state, IngestionState.COMPLETED, status.error)
+        self.assertEqual(status.title, title)
+        self.assertEqual(status.chunks_read, num_chunks)
+        self.assertEqual(status.chunks_vectorised, num_chunks)
+        self.assertEqual(status.chunks_stored, num_chunks)
+        self.assertGreater(status.bytes_processed, 0)
+        self.assertIsNotNone(status.finished_at)
+        listener.on_material_changed.assert_called_once_with(status.material_id, title)
+
+    async def test_start_ingestion_closes_source(self) -> None:
+        # Arrange
+        async def __serve_chunk():
+            yield self.faker.paragraph() + IngestFlow.LOGICAL_CHUNK_DELIMITER
+
+        patch.object(
+            self.material_reader,
+            "read_and_chunk",
+            return_value=Response.ok(__serve_chunk()),
+        ).start()
+        patch.object(
+            self.vectoriser,
+            "vectorise_many",
+            return_value=Response.ok([[randint(0, 100) for _ in range(256)]]),
+        ).start()
+        patch.object(
+            self.vector_repo, "crupdate_many", return_value=Response.ok(None)
+        ).start()
+        patch.object(
+            self.id_name_repo, "crupdate", return_value=Response.ok(None)
+        ).start()
+
+        request_ingestion_response = await self.service.request_ingestion()
+        assert request_ingestion_response.payload is not None
+        ingestion_request_id = request_ingestion_response.payload
+        source = BytesIO(self.faker.binary(1024))
+
+        # Act
+        start_response = await self.service.start_ingestion(
+            ingestion_request_id, self.faker.sentence(), source
+        )
+        await self.service.ingestion_tasks[ingestion_request_id]
+
+        # Assert
+        self.assertTrue(start_response.is_success, start_response.message)
+        self.assertTrue(source.closed)
+
+    async def test_ingest_unchanged_material(self) -> None:
+        # Arrange
+        title = self.faker.sentence()
+        source = self.faker.paragraph()
+        material_id = sha256(source.encode("utf-8")).hexdigest()
+
+        self.read_entity.return_value = Response.ok(
+            IDNameEntity(id=material_id, name=title, created_at=datetime.now())
+        )
+        read_and_chunk = patch.object(self.material_reader, "read_and_chunk").start()
+        crupdate_entity = patch.object(self.id_name_repo, "crupdate").start()
+
+        listener = AsyncMock()
+        self.service.add_listener(listener)
+
+        request_ingestion_response = await self.service.request_ingestion()
+        assert request_ingestion_response.payload is not None
+        ingestion_request_id = request_ingestion_response.payload
+
+        # Act
+        ingest_response = await self.service.ingest(ingestion_request_id, title, source)
+
+        # Assert
+        self.assertTrue(ingest_response.is_success, ingest_response.message)
+        self.assertEqual(self.read_entity.call_args.args[1], material_id)
+
+        # Nothing should be read, vectorised or stored again
+        read_and_chunk.assert_not_called()
+        crupdate_entity.assert_not_called()
+        listener.on_material_changed.assert_not_called()
+
+        status_response = await self.service.get_ingestion_status(ingestion_request_id)
+        assert status_response.payload is not None
+        self.assertTrue(status_response.payload.is_unchanged)
+        self.assertEqual(status_response.payload.material_id, material_id)
+
+    async def test_ingest_identifies_file_by_contents(self) -> None:
+        # Arrange
+        title = self.faker.sentence()
+        contents = [self.faker.paragraph() for _ in range(2)]
+        patch.object(
+            self.material_reader,
+            "read_and_chunk",
+            return_value=Response.fail("Stop after identifying the material", 500),
+        ).start()
+
+        with NamedTemporaryFile("w", suffix=".pdf") as the_file:
+            source = f"file://{the_file.name}"
+            material_ids = []
+
+            # Act
+            for content in contents:
+                the_file.seek(0)
+                the_file.truncate()
+                the_file.write(content)
+                the_file.flush()
+
+                ingestion_request_id = uuid4().hex
+                await self.service.ingest(ingestion_request_id, title, source)
+                status_response = await self.service.get_ingestion_status(
+                    ingestion_request_id
+                )
+                assert status_response.payload is not None
+                material_ids.append(status_response.payload.material_id)
+
+        # Assert
+        self.assertEqual(
+            material_ids,
+            [sha256(content.encode("utf-8")).hexdigest() for content in contents],
+        )
+
+    async def test_ingest_with_unrequested_id(self) -> None:
+        # Arrange
+        title = self.faker.sentence()
+        source = self.faker.paragraph()
+        material_id = sha256(source.encode("utf-8")).hexdigest()
+
+        self.read_entity.return_value = Response.ok(
+            IDNameEntity(id=material_id, name=title, created_at=datetime.now())
+        )
+        ingestion_request_id = uuid4().hex
+
+        # Act
+        first_response = await self.service.ingest(ingestion_request_id, title, source)
+        second_response = await self.service.ingest(ingestion_request_id, title, source)
+
+        # Assert
+        self.assertTrue(first_response.is_success, first_response.message)
+        self.assertTrue(second_response.is_success, second_response.message)
+
+        status_response = await self.service.get_ingestion_status(ingestion_request_id)
+        assert status_response.payload is not None
+        self.assertEqual(status_response.payload.state, IngestionState.COMPLETED)
+
+    async def test_ingest_reuses_unchanged_chunks(self) -> None:
+        # Arrange
+        title = self.faker.sentence()
+        source = self.faker.paragraph()
+        chunks: list[str] = [self.faker.paragraph() for _ in range(3)]
+        old_vectors = [[randint(0, 100) for _ in range(8)] for _ in range(2)]
+        new_vector = [randint(0, 100) for _ in range(8)]
+
+        async def __serve_chunk():
+            for chunk in chunks:
+                yield chunk + IngestFlow.LOGICAL_CHUNK_DELIMITER
+
+        # The previous version of the material had the first and last chunks
+        self.previous_records = [
+            VectorisedRecord(
+                id=uuid4().hex,
+                vector=vector,
+                metadata=RecordMetadata(
+                    source_id=uuid4().hex,
+                    source=title,
+                    content_hash=sha256(chunk.encode("utf-8")).hexdigest(),
+                ),
+            )
+            for chunk, vector in zip([chunks[0], chunks[2]], old_vectors)
+        ]
+        patch.object(
+            self.material_reader,
+            "read_and_chunk",
+            return_value=Response.ok(__serve_chunk()),
+        ).start()
+        vectorise_many = patch.object(
+            self.vectoriser, "vectorise_many", return_value=Response.ok([new_vector])
+        ).start()
+        crupdate_many = patch.object(
+            self.vector_repo, "crupdate_many", return_value=Response.ok(None)
+        ).start()
+        crupdate_entity = patch.object(
+            self.id_name_repo, "crupdate", return_value=Response.ok(None)
+        ).start()
+
+        request_ingestion_response = await self.service.request_ingestion()
+        assert request_ingestion_response.payload is not None
+        ingestion_request_id = request_ingestion_response.payload
+
+        # Act
+        ingest_response = await self.service.ingest(ingestion_request_id, title, source)
+
+        # Assert
+        self.assertTrue(ingest_response.is_success, ingest_response.message)
+        self.stream_by_criteria.assert_called_once_with(
+            {"source": title}, include_vectors=True, include_documents=False
+        )
+
+        # Only the changed chunk should be vectorised
+        vectorise_many.assert_called_once()
+        self.assertEqual(vectorise_many.call_args.args[1], [chunks[1]])
+
+        records = crupdate_many.call_args.args[0]
+        self.assertEqual(
+            [record.vector for record in records],
+            [old_vectors[0], new_vector, old_vectors[1]],
+        )
+        for chunk, record in zip(chunks, records):
             self.assertEqual(
-                crupdate_material.call_args_list[i].args[0].metadata.source, title
+                record.metadata.content_hash,
+                sha256(chunk.encode("utf-8")).hexdigest(),
             )
-        ...
+
+        # The material should be identified by its content
+        entity = crupdate_entity.call_args.args[1]
+        self.assertEqual(entity.id, sha256(source.encode("utf-8")).hexdigest())
+
+        status_response = await self.service.get_ingestion_status(ingestion_request_id)
+        assert status_response.payload is not None
+        self.assertEqual(status_response.payload.chunks_reused, 2)
+
+    async def test_ingest_replaces_previous_version(self) -> None:
+        # Arrange
+        title = self.faker.sentence()
+        source = self.faker.paragraph()
+        material_id = sha256(source.encode("utf-8")).hexdigest()
+        previous_material_id = uuid4().hex
+        chunks: list[str] = [self.faker.paragraph() for _ in range(2)]
+        calls: list[str] = []
+
+        async def __serve_chunk():
+            for chunk in chunks:
+                yield chunk + IngestFlow.LOGICAL_CHUNK_DELIMITER
+
+        async def __crupdate_entity(request_id: str, entity: IDNameEntity):
+            calls.append("crupdate_entity")
+            return Response.ok(None)
+
+        async def __delete_by_criteria(criteria: dict):
+            calls.append("delete_by_criteria")
+            return Response.ok(None)
+
+        self.previous_records = [
+            VectorisedRecord(
+                id=uuid4().hex,
+                metadata=RecordMetadata(
+                    source_id=previous_material_id, source=title, chunk_num=i
+                ),
+            )
+            for i in range(3)
+        ]
+        patch.object(
+            self.material_reader,
+            "read_and_chunk",
+            return_value=Response.ok(__serve_chunk()),
+        ).start()
+        patch.object(
+            self.vectoriser,
+            "vectorise_many",
+            return_value=Response.ok([[randint(0, 100) for _ in range(8)]] * 2),
+        ).start()
+        crupdate_many = patch.object(
+            self.vector_repo, "crupdate_many", return_value=Response.ok(None)
+        ).start()
+        patch.object(
+            self.id_name_repo, "crupdate", side_effect=__crupdate_entity
+        ).start()
+        delete_by_criteria = patch.object(
+            self.vector_repo, "delete_by_criteria", side_effect=__delete_by_criteria
+        ).start()
+        delete_entity = patch.object(
+            self.id_name_repo, "delete_by_id", return_value=Response.ok(None)
+        ).start()
+
+        request_ingestion_response = await self.service.request_ingestion()
+        assert request_ingestion_response.payload is not None
+        ingestion_request_id = request_ingestion_response.payload
+
+        # Act
+        ingest_response = await self.service.ingest(ingestion_request_id, title, source)
+
+        # Assert
+        self.assertTrue(ingest_response.is_success, ingest_response.message)
+
+        # Record IDs should be derived from the material and chunk number
+        records = crupdate_many.call_args.args[0]
+        self.assertEqual(
+            [record.id for record in records],
+            [
+                uuid5(IngestFlow.RECORD_ID_NAMESPACE, f"{material_id}:{i}").hex
+                for i in range(len(chunks))
+            ],
+        )
+
+        # The previous version should be deleted only after the new one is complete
+        delete_by_criteria.assert_called_once_with({"source_id": previous_material_id})
+        delete_entity.assert_called_once()
+        self.assertEqual(delete_entity.call_args.args[1], previous_material_id)
+        self.assertEqual(calls, ["crupdate_entity", "delete_by_criteria"])
+
+    async def test_ingest_fails_when_previous_versions_unreadable(self) -> None:
+        # Arrange
+        self.stream_by_criteria.side_effect = None
+        self.stream_by_criteria.return_value = Response.fail("Timed out", 504)
+        read_and_chunk = patch.object(self.material_reader, "read_and_chunk").start()
+        crupdate_many = patch.object(self.vector_repo, "crupdate_many").start()
+
+        # Act
+        ingest_response = await self.service.ingest(
+            uuid4().hex, self.faker.sentence(), self.faker.paragraph()
+        )
+
+        # Assert
+        self.assertFalse(ingest_response.is_success)
+        self.assertEqual(ingest_response.code, 504)
+        read_and_chunk.assert_not_called()
+        crupdate_many.assert_not_called()
+
+    async def test_ingest_treats_missing_previous_versions_as_new(self) -> None:
+        # Arrange
+        async def __serve_chunk():
+            yield self.faker.paragraph() + IngestFlow.LOGICAL_CHUNK_DELIMITER
+
+        self.stream_by_criteria.side_effect = None
+        self.stream_by_criteria.return_value = Response.fail("No records", 404)
+        patch.object(
+            self.material_reader,
+            "read_and_chunk",
+            return_value=Response.ok(__serve_chunk()),
+        ).start()
+        patch.object(
+            self.vectoriser,
+            "vectorise_many",
+            return_value=Response.ok([[randint(0, 100) for _ in range(8)]]),
+        ).start()
+        crupdate_many = patch.object(
+            self.vector_repo, "crupdate_many", return_value=Response.ok(None)
+        ).start()
+        patch.object(
+            self.id_name_repo, "crupdate", return_value=Response.ok(None)
+        ).start()
+        delete_by_criteria = patch.object(
+            self.vector_repo, "delete_by_criteria"
+        ).start()
+
+        # Act
+        ingest_response = await self.service.ingest(
+            uuid4().hex, self.faker.sentence(), self.faker.paragraph()
+        )
+
+        # Assert
+        self.assertTrue(ingest_response.is_success, ingest_response.message)
+        crupdate_many.assert_called_once()
+        delete_by_criteria.assert_not_called()
+
+    async def test_get_ingestion_status_not_found(self) -> None:
+        # Act
+        status_response = await self.service.get_ingestion_status(uuid4().hex)
+
+        # Assert
+        self.assertFalse(status_response.is_success)
+        self.assertEqual(status_response.code, 404)
 
     async def test_get_materials(self) -> None:
         # Arrange
@@ -0,0 +1,178 @@
+from __future__ import annotations
+from collections import OrderedDict
+from time import time
+from typing import Sequence
+from uuid import uuid4
+from numpy import dot
+from numpy.linalg import norm as vector_norm
+from pydantic import BaseModel
+from sbilifeco.boundaries.product_analyst.query_flow import RatedAnswer
+from sbilifeco.models.base import Response
+from sbilifeco.models.vectorisation import Float32Vector
+
+
+class CachedAnswer(BaseModel):
+    vector: Float32Vector
+    norm: float
+    fingerprint: str
+    answer: RatedAnswer
+    stored_at: float
+
+
+class BaseAnswerCache:
+    async def find(
+        self, vector: Sequence[float | int], fingerprint: str
+    ) -> RatedAnswer | None:
+        """
+        Find a cached answer to a query similar to the one given.
+        Args:
+            vector (Sequence[float | int]): The vector of the query being asked.
+            fingerprint (str): A fingerprint of the records retrieved for the query. A cached answer is only valid if it was generated from the same records.
+        Returns:
+            The cached answer, or None on a miss.
+        """
+        raise NotImplementedError()
+
+    async def put(
+        self, vector: Sequence[float | int], fingerprint: str, answer: RatedAnswer
+    ) -> None:
+        """
+        Cache an answer.
+        Args:
+            vector (Sequence[float | int]): The vector of the query that was answered.
+            fingerprint (str): A fingerprint of the records the answer was generated from.
+            answer (RatedAnswer): The answer.
+        """
+        raise NotImplementedError()
+
+    async def invalidate_source(self, source: str) -> None:
+        """
+        Drop every cached answer that cites the given source.
+        Args:
+            source (str): The source, as it appears in the answers' rated sources.
+        """
+        raise NotImplementedError()
+
+    async def clear(self) -> None:
+        """
+        Drop every cached answer.
+        """
+        raise NotImplementedError()
+
+
+class AnswerCache(BaseAnswerCache):
+    """
+    In-memory answer cache matching queries by cosine similarity.
+    It structurally satisfies IngestFlowListener, so it can be added as a listener to an in-process IngestFlow to drop answers when a material changes.
+    """
+
+    DEFAULT_SIMILARITY_THRESHOLD = 0.95
+    DEFAULT_MAX_ENTRIES = 256
+    DEFAULT_TTL_SECONDS = 60 * 60
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.similarity_threshold = self.DEFAULT_SIMILARITY_THRESHOLD
+        self.max_entries = self.DEFAULT_MAX_ENTRIES
+        self.ttl_seconds = self.DEFAULT_TTL_SECONDS
+        self.entries: OrderedDict[str, CachedAnswer] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def set_similarity_threshold(self, similarity_threshold: float) -> AnswerCache:
+        self.similarity_threshold = similarity_threshold
+        return self
+
+    def set_max_entries(self, max_entries: int) -> AnswerCache:
+        self.max_entries = max_entries
+        return self
+
+    def set_ttl(self, ttl_seconds: float) -> AnswerCache:
+        """Entries older than this are treated as misses. 0 or less disables expiry."""
+        self.ttl_seconds = ttl_seconds
+        return self
+
+    @staticmethod
+    def _norm(vector: Float32Vector) -> float:
+        return float(vector_norm(vector.values))
+
+    def _is_expired(self, entry: CachedAnswer) -> bool:
+        return self.ttl_seconds > 0 and time() - entry.stored_at > self.ttl_seconds
+
+    async def find(
+        self, vector: Sequence[float | int], fingerprint: str
+    ) -> RatedAnswer | None:
+        vector = Float32Vector(vector)
+        norm = self._norm(vector)
+
+        best_key = ""
+        best_similarity = self.similarity_threshold
+        for key, entry in list(self.entries.items()):
+            if self._is_expired(entry):
+                del self.entries[key]
+                continue
+            if (
+                entry.fingerprint != fingerprint
+                or norm == 0
+                or entry.norm == 0
+                or len(entry.vector) != len(vector)
+            ):
+                continue
+
+            similarity = float(dot(vector.values, entry.vector.values)) / (
+                norm * entry.norm
+            )
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+
+        if not best_key:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(best_key)
+        self.hits += 1
+        return self.entries[best_key].answer.model_copy(deep=True)
+
+    async def put(
+        self, vector: Sequence[float | int], fingerprint: str, answer: RatedAnswer
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+
+        vector = Float32Vector(vector)
+        self.entries[uuid4().hex] = CachedAnswer(
+            vector=vector,
+            norm=self._norm(vector),
+            fingerprint=fingerprint,
+            answer=answer.model_copy(deep=True),
+            stored_at=time(),
+        )
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def invalidate_source(self, source: str) -> None:
+        stale = [
+            key
+            for key, entry in self.entries.items()
+            if any(rated.source == source for rated in entry.answer.sources)
+        ]
+        for key in stale:
+            del self.entries[key]
+
+        if stale:
+            print(
+                f"Answer cache dropped {len(stale)} answers citing {source}",
+                flush=True,
+            )
+
+    async def clear(self) -> None:
+        self.entries.clear()
+
+    async def on_request_ingestion(self, response: Response[str]) -> None: ...
+
+    async def on_ingest(
+        self, ingestion_request: str, response: Response[None]
+    ) -> None: ...
+
+    async def on_material_changed(self, material_id: str, title: str) -> None:
+        await self.invalidate_source(title)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+from collections import OrderedDict
+from hashlib import sha256
+from json import dumps, loads
+from sqlite3 import Connection, connect
+from time import time
+from typing import Sequence
+from sbilifeco.models.vectorisation import Float32Vector
+
+
+class BaseEmbeddingCache:
+    async def get(self, query: str, model_id: str) -> Sequence[float | int] | None:
+        """
+        Get the cached embedding of a query.
+        Args:
+            query (str): The query as asked. Implementations normalise it before lookup.
+            model_id (str): Identity of the embedding model that produced the vector.
+        Returns:
+            The cached vector, or None on a miss.
+        """
+        raise NotImplementedError()
+
+    async def put(
+        self, query: str, model_id: str, vector: Sequence[float | int]
+    ) -> None:
+        """
+        Cache the embedding of a query.
+        Args:
+            query (str): The query as asked. Implementations normalise it before storing.
+            model_id (str): Identity of the embedding model that produced the vector.
+            vector (Sequence[float | int]): The embedding.
+        """
+        raise NotImplementedError()
+
+    async def clear(self) -> None:
+        """
+        Drop every cached embedding.
+        """
+        raise NotImplementedError()
+
+
+class EmbeddingCache(BaseEmbeddingCache):
+    DEFAULT_MAX_ENTRIES = 1024
+    DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+    SQL_CREATE = (
+        "create table if not exists "
+        "embeddings("
+        "key primary key on conflict replace, "
+        "vector not null, "
+        "stored_at not null"
+        ")"
+    )
+    SQL_CREATE_INDEX = (
+        "create index if not exists embeddings_stored_at on embeddings(stored_at)"
+    )
+    SQL_INSERT = (
+        "insert into embeddings(key, vector, stored_at) "
+        "values(:key, :vector, :stored_at)"
+    )
+    SQL_READ_BY_KEY = "select vector, stored_at from embeddings where key = :key"
+    SQL_READ_RECENT = (
+        "select key, vector, stored_at from embeddings "
+        "order by stored_at desc limit :limit"
+    )
+    SQL_DELETE_BY_KEY = "delete from embeddings where key = :key"
+    SQL_DELETE_EXPIRED = "delete from embeddings where stored_at < :cutoff"
+    SQL_DELETE_OLDEST = (
+        "delete from embeddings where key in ("
+        "select key from embeddings order by stored_at desc limit -1 offset :keep"
+        ")"
+    )
+    SQL_DELETE_ALL = "delete from embeddings"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.max_entries = self.DEFAULT_MAX_ENTRIES
+        self.ttl_seconds = self.DEFAULT_TTL_SECONDS
+        self.path = ""
+        self.connection: Connection | None = None
+        self.entries: OrderedDict[str, tuple[Float32Vector, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def set_max_entries(self, max_entries: int) -> EmbeddingCache:
+        """Most embeddings held, in memory and in the SQLite file alike."""
+        self.max_entries = max_entries
+        return self
+
+    def set_ttl(self, ttl_seconds: float) -> EmbeddingCache:
+        """Entries older than this are treated as misses. 0 or less disables expiry."""
+        self.ttl_seconds = ttl_seconds
+        return self
+
+    def set_path(self, path: str) -> EmbeddingCache:
+        """Path of an SQLite file backing the cache. Empty keeps the cache in memory only."""
+        self.path = path
+        return self
+
+    async def async_init(self) -> None:
+        if not self.path:
+            return
+
+        self.connection = connect(self.path)
+        with self.connection:
+            self.connection.execute(self.SQL_CREATE)
+            self.connection.execute(self.SQL_CREATE_INDEX)
+            self._purge(self.connection)
+
+        # Warm up the memory tier with the most recently stored embeddings
+        rows = self.connection.execute(
+            self.SQL_READ_RECENT, {"limit": max(self.max_entries, 0)}
+        ).fetchall()
+        for key, vector, stored_at in reversed(rows):
+            self.entries[key] = (Float32Vector(loads(vector)), stored_at)
+
+        print(
+            f"Embedding cache loaded {len(self.entries)} entries from {self.path}",
+            flush=True,
+        )
+
+    async def async_shutdown(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    @staticmethod
+    def normalise(query: str) -> str:
+        return " ".join(query.casefold().split())
+
+    def make_key(self, query: str, model_id: str) -> str:
+        return sha256(f"{model_id}\0{self.normalise(query)}".encode()).hexdigest()
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds > 0 and time() - stored_at > self.ttl_seconds
+
+    def _purge(self, connection: Connection) -> None:
+        # Keeps the file as bounded as the memory tier
+        if self.ttl_seconds > 0:
+            connection.execute(
+                self.SQL_DELETE_EXPIRED, {"cutoff": time() - self.ttl_seconds}
+            )
+        connection.execute(self.SQL_DELETE_OLDEST, {"keep": max(self.max_entries, 0)})
+
+    def _remember(
+        self, key: str, vector: Sequence[float | int], stored_at: float
+    ) -> None:
+        self.entries[key] = (Float32Vector(vector), stored_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get(self, query: str, model_id: str) -> Sequence[float | int] | None:
+        key = self.make_key(query, model_id)
+
+        entry = self.entries.get(key)
+        if entry is None and self.connection is not None:
+            row = self.connection.execute(self.SQL_READ_BY_KEY, {"key": key}).fetchone()
+            if row is not None:
+                entry = (Float32Vector(loads(row[0])), row[1])
+                self._remember(key, *entry)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        vector, stored_at = entry
+        if self._is_expired(stored_at):
+            self.entries.pop(key, None)
+            if self.connection is not None:
+                with self.connection:
+                    self.connection.execute(self.SQL_DELETE_BY_KEY, {"key": key})
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return vector
+
+    async def put(
+        self, query: str, model_id: str, vector: Sequence[float | int]
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+
+        key = self.make_key(query, model_id)
+        stored_at = time()
+        self._remember(key, vector, stored_at)
+
+        if self.connection is not None:
+            with self.connection:
+                self.connection.execute(
+                    self.SQL_INSERT,
+                    {"key": key, "vector": dumps(list(vector)), "stored_at": stored_at},
+                )
+                self._purge(self.connection)
+
+    async def clear(self) -> None:
+        self.entries.clear()
+        if self.connection is not None:
+            with self.connection:
+                self.connection.execute(self.SQL_DELETE_ALL)
@@ -1,24 +1,46 @@
 from __future__ import annotations
+from asyncio import Semaphore, gather
+from contextlib import nullcontext
 from uuid import uuid4
-from typing import Any
+from hashlib import sha256
+from typing import Any, AsyncIterator, Protocol, Sequence, runtime_checkable
 from sbilifeco.boundaries.product_analyst.query_flow import (
     BaseQueryFlow,
     RatedAnswer,
+    RatedAnswerChunk,
     RatedSource,
 )
 from sbilifeco.models.base import Response
 from sbilifeco.boundaries.vectoriser import BaseVectoriser
 from sbilifeco.boundaries.vector_repo import BaseVectorRepo
+from sbilifeco.models.vectorisation import VectorisedRecord
 from sbilifeco.boundaries.llm import ILLM
+from sbilifeco.flows.product_analyst.embedding_cache import BaseEmbeddingCache
+from sbilifeco.flows.product_analyst.answer_cache import BaseAnswerCache
+
+
+@runtime_checkable
+class IStreamingLLM(Protocol):
+    """An LLM that can stream its reply. LLMs that cannot, the LLM HTTP client included for now, are still usable by `search_stream`: their whole reply is sent as one token."""
+
+    async def generate_reply_stream(
+        self, context: str
+    ) -> Response[AsyncIterator[str]]: ...
 
 
 class QueryFlow(BaseQueryFlow):
+    DEFAULT_MAX_CONCURRENT_LLM_CALLS = 4
+
     def __init__(self) -> None:
         super().__init__()
         self.search_requests: dict[str, Any] = {}
         self.vectoriser: BaseVectoriser
         self.vector_repo: BaseVectorRepo
         self.llm: ILLM
+        self.embedding_cache: BaseEmbeddingCache | None = None
+        self.embedding_model_id = ""
+        self.answer_cache: BaseAnswerCache | None = None
+        self.max_concurrent_llm_calls = self.DEFAULT_MAX_CONCURRENT_LLM_CALLS
 
     def set_vectoriser(self, vectoriser: BaseVectoriser) -> QueryFlow:
         self.vectoriser = vectoriser
@@ -32,6 +54,26 @@ class QueryFlow(BaseQueryFlow):
         self.llm = llm
         return self
 
+    def set_embedding_cache(
+        self, embedding_cache: BaseEmbeddingCache | None
+    ) -> QueryFlow:
+        self.embedding_cache = embedding_cache
+        return self
+
+    def set_embedding_model_id(self, embedding_model_id: str) -> QueryFlow:
+        """Identity of the vectoriser's embedding model, part of the embedding cache key."""
+        self.embedding_model_id = embedding_model_id
+        return self
+
+    def set_answer_cache(self, answer_cache: BaseAnswerCache | None) -> QueryFlow:
+        self.answer_cache = answer_cache
+        return self
+
+    def set_max_concurrent_llm_calls(self, max_concurrent_llm_calls: int) -> QueryFlow:
+        """Upper bound on LLM calls in flight while answering the queries of one `search_many`."""
+        self.max_concurrent_llm_calls = max(1, max_concurrent_llm_calls)
+        return self
+
     async def async_init(self) -> None: ...
 
     async def async_shutdown(self) -> None: ...
@@ -48,7 +90,11 @@ class QueryFlow(BaseQueryFlow):
             return Response.error(e)
 
     async def search(
-        self, search_request_id: str, query: str, num_results: int = 5
+        self,
+        search_request_id: str,
+        query: str,
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
     ) -> Response[RatedAnswer]:
         try:
             # Validate
@@ -62,81 +108,478 @@ class QueryFlow(BaseQueryFlow):
                     f"Search request {search_request_id} not found", 404
                 )
 
-            # Vectorise the query
-            vector_response = await self.vectoriser.vectorise(search_request_id, query)
-            if not vector_response.is_success:
-                print(
-                    f"Failed to vectorise query in search request {search_request_id}: {vector_response.code}/{vector_response.message}",
-                    flush=True,
-                )
-                return Response.fail(vector_response.message, vector_response.code)
-            elif vector_response.payload is None:
-                return Response.fail("Search term vector is inexplicably empty", 500)
-            search_vector = vector_response.payload
-
-            # Semantic search
-            search_response = await self.vector_repo.search_by_vector(
-                search_vector, num_results
+            # Vectorise the query and search semantically
+            retrieve_response = await self._retrieve(
+                search_request_id, query, num_results, criteria
             )
-            if not search_response.is_success:
-                print(
-                    f"Failed to search by vector in search request {search_request_id}: {search_response.code}/{search_response.message}",
-                    flush=True,
-                )
-                return Response.fail(search_response.message, search_response.code)
-            elif search_response.payload is None:
+            if not retrieve_response.is_success:
+                return Response.fail(retrieve_response.message, retrieve_response.code)
+            elif retrieve_response.payload is None:
                 return Response.fail("Search results are inexplicably empty", 500)
-            search_results = search_response.payload
+            search_vector, search_results = retrieve_response.payload
 
-            # Generate LLM answer
-            context = (
-                f"You are a product analyst who reads product descriptions and answers questions.\n\n"
-                f"Product description follows:\n"
-                f"{"\n\n".join([str(result.document) for result in search_results])}"
-                f"\n\nNow please answer the following question:\n\n"
-                f"{query}\n\n"
+            # Answer from cache or from the LLM
+            answer_response = await self._answer(
+                search_request_id, query, search_vector, search_results
             )
+            if not answer_response.is_success:
+                return Response.fail(answer_response.message, answer_response.code)
+            elif answer_response.payload is None:
+                return Response.fail("Answer is inexplicably empty", 500)
+            rated_answer = answer_response.payload
 
+            # The search request is done
             print(
-                f"Invoking the LLM for search request {search_request_id}",
+                f"Search request {search_request_id} completed, cleaning up", flush=True
+            )
+            if search_request_id in self.search_requests:
+                del self.search_requests[search_request_id]
+
+            # Return
+            return Response.ok(rated_answer)
+        except Exception as e:
+            return Response.error(e)
+
+    async def search_many(
+        self,
+        search_request_id: str,
+        queries: Sequence[str],
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
+    ) -> Response[list[RatedAnswer]]:
+        try:
+            # Validate
+            print(
+                f"In search request {search_request_id}, {len(queries)} queries have been asked",
                 flush=True,
             )
 
-            llm_response = await self.llm.generate_reply(context)
-            if not llm_response.is_success:
-                print(
-                    f"LLM invocation failed in search request {search_request_id}: {llm_response.code}/{llm_response.message}",
-                    flush=True,
+            if search_request_id not in self.search_requests:
+                return Response.fail(
+                    f"Search request {search_request_id} not found", 404
                 )
-                return Response.fail(llm_response.message, llm_response.code)
-            elif llm_response.payload is None:
-                return Response.fail("LLM reply is inexplicably empty", 500)
-            llm_reply = llm_response.payload
 
-            # Triage
-            rated_answer = RatedAnswer(
-                answer=llm_reply,
-                sources=[
-                    RatedSource(
-                        source=(
-                            search_result.metadata.source
-                            if search_result.metadata
-                            else "N/A"
-                        ),
-                        rating=search_result.score,
+            # Vectorise the queries in one batch and search for all of them at once
+            retrieve_response = await self._retrieve_many(
+                search_request_id, queries, num_results, criteria
+            )
+            if not retrieve_response.is_success:
+                return Response.fail(retrieve_response.message, retrieve_response.code)
+            elif retrieve_response.payload is None:
+                return Response.fail("Search results are inexplicably empty", 500)
+
+            # Answer every query, with a bounded number of LLM calls in flight
+            llm_slots = Semaphore(self.max_concurrent_llm_calls)
+            answer_responses = await gather(
+                *[
+                    self._answer(
+                        search_request_id,
+                        query,
+                        search_vector,
+                        search_results,
+                        llm_slots,
+                    )
+                    for query, (search_vector, search_results) in zip(
+                        queries, retrieve_response.payload
                     )
-                    for search_result in search_results
-                ],
+                ]
             )
 
+            # Triage
+            rated_answers: list[RatedAnswer] = []
+            for answer_response in answer_responses:
+                if not answer_response.is_success:
+                    return Response.fail(answer_response.message, answer_response.code)
+                elif answer_response.payload is None:
+                    return Response.fail("Answer is inexplicably empty", 500)
+                rated_answers.append(answer_response.payload)
+
             # The search request is done
             print(
                 f"Search request {search_request_id} completed, cleaning up", flush=True
             )
-            if search_request_id in self.search_requests:
-                del self.search_requests[search_request_id]
+            self.search_requests.pop(search_request_id, None)
 
             # Return
-            return Response.ok(rated_answer)
+            return Response.ok(rated_answers)
+        except Exception as e:
+            return Response.error(e)
+
+    async def search_stream(
+        self,
+        search_request_id: str,
+        query: str,
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
+    ) -> Response[AsyncIterator[RatedAnswerChunk]]:
+        try:
+            # Validate
+            print(
+                f'In search request {search_request_id}, the query "{query}" has been asked for streaming',
+                flush=True,
+            )
+
+            if search_request_id not in self.search_requests:
+                return Response.fail(
+                    f"Search request {search_request_id} not found", 404
+                )
+
+            # Vectorise the query and search semantically
+            retrieve_response = await self._retrieve(
+                search_request_id, query, num_results, criteria
+            )
+            if not retrieve_response.is_success:
+                return Response.fail(retrieve_response.message, retrieve_response.code)
+            elif retrieve_response.payload is None:
+                return Response.fail("Search results are inexplicably empty", 500)
+            search_vector, search_results = retrieve_response.payload
+            rated_sources = self._rated_sources(search_results)
+
+            # Reuse the answer to a similar query asked of the same sources
+            fingerprint = self._fingerprint(search_results)
+            cached_answer = await self._find_cached_answer(
+                search_request_id, search_vector, fingerprint
+            )
+
+            # Start generating the LLM answer, so that failures to start are reported as a response
+            tokens: AsyncIterator[str] | None = None
+            if cached_answer is None:
+                print(
+                    f"Invoking the LLM for streaming search request {search_request_id}",
+                    flush=True,
+                )
+                tokens_response = await self._generate_reply_stream(
+                    self._prompt(query, search_results)
+                )
+                if not tokens_response.is_success:
+                    print(
+                        f"LLM invocation failed in search request {search_request_id}: {tokens_response.code}/{tokens_response.message}",
+                        flush=True,
+                    )
+                    return Response.fail(tokens_response.message, tokens_response.code)
+                elif tokens_response.payload is None:
+                    return Response.fail("LLM reply is inexplicably empty", 500)
+                tokens = tokens_response.payload
+
+            async def __stream():
+                try:
+                    yield RatedAnswerChunk(sources=rated_sources)
+
+                    if tokens is None:
+                        if cached_answer is not None:
+                            yield RatedAnswerChunk(token=cached_answer.answer)
+                        return
+
+                    answer = ""
+                    async for token in tokens:
+                        answer += token
+                        yield RatedAnswerChunk(token=token)
+
+                    await self._cache_answer(
+                        search_request_id,
+                        search_vector,
+                        fingerprint,
+                        RatedAnswer(answer=answer, sources=rated_sources),
+                    )
+                finally:
+                    # The search request is done, however the stream ended
+                    print(
+                        f"Streaming search request {search_request_id} ended, cleaning up",
+                        flush=True,
+                    )
+                    self.search_requests.pop(search_request_id, None)
+
+            # Return
+            return Response.ok(__stream())
         except Exception as e:
             return Response.error(e)
+
+    async def _retrieve(
+        self,
+        search_request_id: str,
+        query: str,
+        num_results: int,
+        criteria: dict[str, Any] | None,
+    ) -> Response[tuple[Sequence[float | int], list[VectorisedRecord]]]:
+        # Vectorise the query
+        vector_response = await self._vectorise_query(search_request_id, query)
+        if not vector_response.is_success:
+            print(
+                f"Failed to vectorise query in search request {search_request_id}: {vector_response.code}/{vector_response.message}",
+                flush=True,
+            )
+            return Response.fail(vector_response.message, vector_response.code)
+        elif vector_response.payload is None:
+            return Response.fail("Search term vector is inexplicably empty", 500)
+        search_vector = vector_response.payload
+
+        # Semantic search
+        search_response = await self.vector_repo.search_by_vector(
+            search_vector, num_results, criteria, query
+        )
+        if not search_response.is_success:
+            print(
+                f"Failed to search by vector in search request {search_request_id}: {search_response.code}/{search_response.message}",
+                flush=True,
+            )
+            return Response.fail(search_response.message, search_response.code)
+        elif search_response.payload is None:
+            return Response.fail("Search results are inexplicably empty", 500)
+
+        return Response.ok((search_vector, search_response.payload))
+
+    async def _retrieve_many(
+        self,
+        search_request_id: str,
+        queries: Sequence[str],
+        num_results: int,
+        criteria: dict[str, Any] | None,
+    ) -> Response[list[tuple[Sequence[float | int], list[VectorisedRecord]]]]:
+        if not queries:
+            return Response.ok([])
+
+        # Vectorise the queries
+        vectors_response = await self._vectorise_queries(search_request_id, queries)
+        if not vectors_response.is_success:
+            print(
+                f"Failed to vectorise queries in search request {search_request_id}: {vectors_response.code}/{vectors_response.message}",
+                flush=True,
+            )
+            return Response.fail(vectors_response.message, vectors_response.code)
+        elif vectors_response.payload is None:
+            return Response.fail("Search term vectors are inexplicably empty", 500)
+        search_vectors = vectors_response.payload
+
+        # Semantic search
+        search_response = await self.vector_repo.search_by_vectors(
+            search_vectors, num_results, criteria, queries
+        )
+        if not search_response.is_success:
+            print(
+                f"Failed to search by vectors in search request {search_request_id}: {search_response.code}/{search_response.message}",
+                flush=True,
+            )
+            return Response.fail(search_response.message, search_response.code)
+        elif search_response.payload is None:
+            return Response.fail("Search results are inexplicably empty", 500)
+        elif len(search_response.payload) != len(search_vectors):
+            return Response.fail(
+                f"Expected results for {len(search_vectors)} queries, got {len(search_response.payload)}",
+                500,
+            )
+
+        return Response.ok(list(zip(search_vectors, search_response.payload)))
+
+    async def _answer(
+        self,
+        search_request_id: str,
+        query: str,
+        search_vector: Sequence[float | int],
+        search_results: list[VectorisedRecord],
+        llm_slots: Semaphore | None = None,
+    ) -> Response[RatedAnswer]:
+        # Reuse the answer to a similar query asked of the same sources
+        fingerprint = self._fingerprint(search_results)
+        cached_answer = await self._find_cached_answer(
+            search_request_id, search_vector, fingerprint
+        )
+        if cached_answer is not None:
+            print(f"Search request {search_request_id} answered from cache", flush=True)
+            return Response.ok(cached_answer)
+
+        # Generate LLM answer
+        context = self._prompt(query, search_results)
+
+        async with llm_slots or nullcontext():
+            print(
+                f"Invoking the LLM for search request {search_request_id}",
+                flush=True,
+            )
+            llm_response = await self.llm.generate_reply(context)
+
+        if not llm_response.is_success:
+            print(
+                f"LLM invocation failed in search request {search_request_id}: {llm_response.code}/{llm_response.message}",
+                flush=True,
+            )
+            return Response.fail(llm_response.message, llm_response.code)
+        elif llm_response.payload is None:
+            return Response.fail("LLM reply is inexplicably empty", 500)
+        llm_reply = llm_response.payload
+
+        # Triage
+        rated_answer = RatedAnswer(
+            answer=llm_reply, sources=self._rated_sources(search_results)
+        )
+
+        await self._cache_answer(
+            search_request_id, search_vector, fingerprint, rated_answer
+        )
+
+        return Response.ok(rated_answer)
+
+    def _prompt(self, query: str, search_results: Sequence[VectorisedRecord]) -> str:
+        return (
+            f"You are a product analyst who reads product descriptions and answers questions.\n\n"
+            f"Product description follows:\n"
+            f"{"\n\n".join([str(result.document) for result in search_results])}"
+            f"\n\nNow please answer the following question:\n\n"
+            f"{query}\n\n"
+        )
+
+    def _rated_sources(
+        self, search_results: Sequence[VectorisedRecord]
+    ) -> list[RatedSource]:
+        return [
+            RatedSource(
+                source=(
+                    search_result.metadata.source if search_result.metadata else "N/A"
+                ),
+                rating=search_result.score,
+            )
+            for search_result in search_results
+        ]
+
+    async def _generate_reply_stream(
+        self, context: str
+    ) -> Response[AsyncIterator[str]]:
+        if isinstance(self.llm, IStreamingLLM):
+            return await self.llm.generate_reply_stream(context)
+
+        # The LLM cannot stream, so its whole reply becomes the only token
+        llm_response = await self.llm.generate_reply(context)
+        if not llm_response.is_success:
+            return Response.fail(llm_response.message, llm_response.code)
+        elif llm_response.payload is None:
+            return Response.fail("LLM reply is inexplicably empty", 500)
+        llm_reply = llm_response.payload
+
+        async def __single_token():
+            yield llm_reply
+
+        return Response.ok(__single_token())
+
+    def _fingerprint(self, search_results: Sequence[VectorisedRecord]) -> str:
+        digest = sha256()
+        for search_result in search_results:
+            digest.update(f"{search_result.id}\0{search_result.document}\0".encode())
+        return digest.hexdigest()
+
+    async def _find_cached_answer(
+        self, search_request_id: str, vector: Sequence[float | int], fingerprint: str
+    ) -> RatedAnswer | None:
+        if self.answer_cache is None:
+            return None
+        try:
+            return await self.answer_cache.find(vector, fingerprint)
+        except Exception as e:
+            print(
+                f"Answer cache lookup failed in search request {search_request_id}: {e}",
+                flush=True,
+            )
+            return None
+
+    async def _cache_answer(
+        self,
+        search_request_id: str,
+        vector: Sequence[float | int],
+        fingerprint: str,
+        rated_answer: RatedAnswer,
+    ) -> None:
+        if self.answer_cache is None:
+            return
+        try:
+            await self.answer_cache.put(vector, fingerprint, rated_answer)
+        except Exception as e:
+            print(
+                f"Answer cache store failed in search request {search_request_id}: {e}",
+                flush=True,
+            )
+
+    async def _vectorise_query(
+        self, search_request_id: str, query: str
+    ) -> Response[Sequence[float | int]]:
+        # A broken cache must never fail the search, so cache errors only get logged
+        if self.embedding_cache is not None:
+            try:
+                cached_vector = await self.embedding_cache.get(
+                    query, self.embedding_model_id
+                )
+                if cached_vector is not None:
+                    return Response.ok(cached_vector)
+            except Exception as e:
+                print(
+                    f"Embedding cache lookup failed in search request {search_request_id}: {e}",
+                    flush=True,
+                )
+
+        vector_response = await self.vectoriser.vectorise(search_request_id, query)
+
+        if (
+            self.embedding_cache is not None
+            and vector_response.is_success
+            and vector_response.payload is not None
+        ):
+            try:
+                await self.embedding_cache.put(
+                    query, self.embedding_model_id, vector_response.payload
+                )
+            except Exception as e:
+                print(
+                    f"Embedding cache store failed in search request {search_request_id}: {e}",
+                    flush=True,
+                )
+
+        return vector_response
+
+    async def _vectorise_queries(
+        self, search_request_id: str, queries: Sequence[str]
+    ) -> Response[list[Sequence[float | int]]]:
+        vectors: list[Sequence[float | int] | None] = [None] * len(queries)
+
+        # A broken cache must never fail the search, so cache errors only get logged
+        if self.embedding_cache is not None:
+            for query_num, query in enumerate(queries):
+                try:
+                    vectors[query_num] = await self.embedding_cache.get(
+                        query, self.embedding_model_id
+                    )
+                except Exception as e:
+                    print(
+                        f"Embedding cache lookup failed in search request {search_request_id}: {e}",
+                        flush=True,
+                    )
+
+        # Only queries missing from the cache go to the vectoriser, all in one batch
+        to_vectorise = [
+            query_num for query_num, vector in enumerate(vectors) if vector is None
+        ]
+        if to_vectorise:
+            vector_response = await self.vectoriser.vectorise_many(
+                search_request_id, [queries[query_num] for query_num in to_vectorise]
+            )
+            if not vector_response.is_success:
+                return Response.fail(vector_response.message, vector_response.code)
+            elif vector_response.payload is None:
+                return Response.fail("Vectors are inexplicably empty", 500)
+            elif len(vector_response.payload) != len(to_vectorise):
+                return Response.fail(
+                    f"Expected {len(to_vectorise)} vectors, got {len(vector_response.payload)}",
+                    500,
+                )
+
+            for query_num, vector in zip(to_vectorise, vector_response.payload):
+                vectors[query_num] = vector
+                if self.embedding_cache is None:
+                    continue
+                try:
+                    await self.embedding_cache.put(
+                        queries[query_num], self.embedding_model_id, vector
+                    )
+                except Exception as e:
+                    print(
+                        f"Embedding cache store failed in search request {search_request_id}: {e}",
+                        flush=True,
+                    )
+
+        return Response.ok([vector for vector in vectors if vector is not None])
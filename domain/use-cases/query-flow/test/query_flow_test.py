@@ -10,10 +10,19 @@ from unittest.mock import AsyncMock, Base, patch
 from faker import Faker
 from random import randint
 from uuid import uuid4
+from tempfile import TemporaryDirectory
+from os import path
+from asyncio import sleep
 
 from sbilifeco.models.base import Response
-from sbilifeco.models.vectorisation import VectorisedRecord, RecordMetadata
+from sbilifeco.models.vectorisation import (
+    Float32Vector,
+    VectorisedRecord,
+    RecordMetadata,
+)
 from sbilifeco.flows.product_analyst.query_flow import QueryFlow, RatedAnswer
+from sbilifeco.flows.product_analyst.embedding_cache import EmbeddingCache
+from sbilifeco.flows.product_analyst.answer_cache import AnswerCache
 from sbilifeco.boundaries.vectoriser import BaseVectoriser
 from sbilifeco.boundaries.vector_repo import BaseVectorRepo
 from sbilifeco.boundaries.llm import ILLM
@@ -98,9 +107,15 @@ class Test(IsolatedAsyncioTestCase):
             AsyncMock(return_value=Response.ok(llm_reply)),
         ).start()
 
+        criteria = {
+            "source": [
+                result.metadata.source for result in search_results if result.metadata
+            ]
+        }
+
         # Act
         query_flow_response = await self.service.search(
-            search_request_id, query, num_results
+            search_request_id, query, num_results, criteria
         )
 
         # Assert
@@ -110,7 +125,7 @@ class Test(IsolatedAsyncioTestCase):
 
         vectorise.assert_called_once_with(search_request_id, query)
 
-        search_by_vector.assert_called_once_with(vector, num_results)
+        search_by_vector.assert_called_once_with(vector, num_results, criteria, query)
 
         generate_reply.assert_called_once()
         for search_result in search_results:
@@ -120,3 +135,304 @@ class Test(IsolatedAsyncioTestCase):
         self.assertIn(query, generate_reply.call_args_list[0][0][0])
 
         self.assertIn(rated_answer.answer, llm_reply)
+
+    async def test_search_with_embedding_cache(self) -> None:
+        # Arrange
+        self.service.set_embedding_cache(EmbeddingCache()).set_embedding_model_id(
+            self.fake.word()
+        )
+        query = self.fake.sentence()
+        vector = [randint(1, 100) for _ in range(256)]
+
+        vectorise = patch.object(
+            self.vectoriser,
+            "vectorise",
+            AsyncMock(return_value=Response.ok(vector)),
+        ).start()
+        search_by_vector = patch.object(
+            self.vector_repo,
+            "search_by_vector",
+            AsyncMock(return_value=Response.ok([])),
+        ).start()
+        patch.object(
+            self.llm,
+            "generate_reply",
+            AsyncMock(return_value=Response.ok(self.fake.text())),
+        ).start()
+
+        # Act
+        for asked in [query, f"  {query.upper()} "]:
+            search_request_response = await self.service.request_search()
+            assert search_request_response.payload is not None
+            response = await self.service.search(search_request_response.payload, asked)
+            self.assertTrue(response.is_success, response.message)
+
+        # Assert
+        vectorise.assert_called_once()
+        self.assertEqual(search_by_vector.call_count, 2)
+        self.assertEqual(search_by_vector.call_args_list[1][0][0], vector)
+
+    async def test_embedding_cache_eviction(self) -> None:
+        with TemporaryDirectory() as temp_dir:
+            # Arrange
+            model_id = self.fake.word()
+            queries = [self.fake.unique.sentence() for _ in range(3)]
+            vectors = [[randint(1, 100) for _ in range(8)] for _ in queries]
+
+            cache = EmbeddingCache().set_max_entries(2)
+            cache.set_path(path.join(temp_dir, "embeddings.db"))
+            await cache.async_init()
+
+            # Act
+            for query, vector in zip(queries, vectors):
+                await cache.put(query, model_id, vector)
+            lru_size = len(cache.entries)
+
+            await cache.async_shutdown()
+            restarted_cache = EmbeddingCache().set_path(
+                path.join(temp_dir, "embeddings.db")
+            )
+            await restarted_cache.async_init()
+            expired_cache = EmbeddingCache().set_ttl(60)
+            expired_cache.entries[expired_cache.make_key(queries[0], model_id)] = (
+                vectors[0],
+                0.0,
+            )
+
+            # Assert
+            self.assertEqual(lru_size, 2)
+            assert restarted_cache.connection is not None
+            self.assertEqual(
+                restarted_cache.connection.execute(
+                    "select count(*) from embeddings"
+                ).fetchone()[0],
+                2,
+            )
+            self.assertEqual(
+                await restarted_cache.get(queries[2], model_id), vectors[2]
+            )
+            self.assertIsNone(await restarted_cache.get(queries[0], model_id))
+            self.assertIsNone(await restarted_cache.get(queries[2], uuid4().hex))
+            self.assertEqual(restarted_cache.hits, 1)
+            self.assertEqual(restarted_cache.misses, 2)
+            self.assertIsNone(await expired_cache.get(queries[0], model_id))
+            await restarted_cache.async_shutdown()
+
+    async def test_embedding_cache_disk_hit(self) -> None:
+        with TemporaryDirectory() as temp_dir:
+            # Arrange
+            model_id = self.fake.word()
+            query = self.fake.sentence()
+            vector = [randint(1, 100) for _ in range(8)]
+
+            # Another replica shares the file, so the embedding is only on disk for this one
+            cache = EmbeddingCache().set_path(path.join(temp_dir, "embeddings.db"))
+            await cache.async_init()
+            replica = EmbeddingCache().set_path(path.join(temp_dir, "embeddings.db"))
+            await replica.async_init()
+            await replica.put(query, model_id, vector)
+
+            # Act
+            cached_vector = await cache.get(query, model_id)
+
+            # Assert
+            self.assertIsInstance(cached_vector, Float32Vector)
+            self.assertEqual(cached_vector, vector)
+            await replica.async_shutdown()
+            await cache.async_shutdown()
+
+    async def test_search_with_answer_cache(self) -> None:
+        # Arrange
+        answer_cache = AnswerCache().set_similarity_threshold(0.9)
+        self.service.set_answer_cache(answer_cache)
+
+        vector = [float(randint(1, 100)) for _ in range(256)]
+        paraphrase_vector = [x + 0.5 for x in vector]
+        source = " ".join(self.fake.words(3))
+        search_results = [
+            VectorisedRecord(
+                id=uuid4().hex,
+                vector=vector,
+                document=self.fake.text(),
+                metadata=RecordMetadata(
+                    source_id=uuid4().hex, source=source, chunk_num=0
+                ),
+                score=90,
+            )
+        ]
+
+        patch.object(
+            self.vectoriser,
+            "vectorise",
+            AsyncMock(
+                side_effect=[
+                    Response.ok(vector),
+                    Response.ok(paraphrase_vector),
+                    Response.ok(vector),
+                ]
+            ),
+        ).start()
+        patch.object(
+            self.vector_repo,
+            "search_by_vector",
+            AsyncMock(return_value=Response.ok(search_results)),
+        ).start()
+        generate_reply = patch.object(
+            self.llm,
+            "generate_reply",
+            AsyncMock(return_value=Response.ok(self.fake.text())),
+        ).start()
+
+        async def __search() -> RatedAnswer:
+            search_request_response = await self.service.request_search()
+            assert search_request_response.payload is not None
+            response = await self.service.search(
+                search_request_response.payload, self.fake.sentence()
+            )
+            self.assertTrue(response.is_success, response.message)
+            assert response.payload is not None
+            return response.payload
+
+        # Act
+        first_answer = await __search()
+        paraphrase_answer = await __search()
+        await answer_cache.on_material_changed(uuid4().hex, source)
+        await __search()
+
+        # Assert
+        self.assertEqual(paraphrase_answer, first_answer)
+        self.assertEqual(answer_cache.hits, 1)
+        self.assertEqual(generate_reply.call_count, 2)
+
+    async def test_search_stream(self) -> None:
+        # Arrange
+        search_request_response = await self.service.request_search()
+        assert search_request_response.payload is not None
+        search_request_id = search_request_response.payload
+
+        query = self.fake.sentence()
+        vector = [randint(1, 100) for _ in range(256)]
+        search_results = [
+            VectorisedRecord(
+                id=uuid4().hex,
+                vector=vector,
+                document=self.fake.text(),
+                metadata=RecordMetadata(
+                    source_id=uuid4().hex,
+                    source=" ".join(self.fake.words(3)),
+                    chunk_num=i,
+                ),
+                score=randint(80, 100),
+            )
+            for i in range(3)
+        ]
+        tokens = self.fake.words(10)
+
+        async def __tokens():
+            for token in tokens:
+                yield token
+
+        streaming_llm = AsyncMock()
+        generate_reply_stream = patch.object(
+            streaming_llm,
+            "generate_reply_stream",
+            AsyncMock(return_value=Response.ok(__tokens())),
+        ).start()
+        self.service.set_llm(streaming_llm)
+
+        patch.object(
+            self.vectoriser, "vectorise", AsyncMock(return_value=Response.ok(vector))
+        ).start()
+        patch.object(
+            self.vector_repo,
+            "search_by_vector",
+            AsyncMock(return_value=Response.ok(search_results)),
+        ).start()
+
+        # Act
+        response = await self.service.search_stream(search_request_id, query)
+        assert response.payload is not None
+        chunks = [chunk async for chunk in response.payload]
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        generate_reply_stream.assert_called_once()
+        self.assertIn(query, generate_reply_stream.call_args[0][0])
+
+        self.assertEqual(
+            [source.source for source in chunks[0].sources],
+            [record.metadata.source for record in search_results if record.metadata],
+        )
+        self.assertEqual([chunk.token for chunk in chunks[1:]], tokens)
+        self.assertNotIn(search_request_id, self.service.search_requests)
+
+    async def test_search_many(self) -> None:
+        # Arrange
+        self.service.set_max_concurrent_llm_calls(2)
+        search_request_response = await self.service.request_search()
+        assert search_request_response.payload is not None
+        search_request_id = search_request_response.payload
+
+        num_results = 3
+        queries = [self.fake.sentence() for _ in range(5)]
+        vectors = [[randint(1, 100) for _ in range(256)] for _ in queries]
+        search_results = [
+            [
+                VectorisedRecord(
+                    id=uuid4().hex,
+                    document=self.fake.text(),
+                    metadata=RecordMetadata(
+                        source_id=uuid4().hex,
+                        source=" ".join(self.fake.words(3)),
+                        chunk_num=i,
+                    ),
+                    score=randint(80, 100),
+                )
+                for i in range(num_results)
+            ]
+            for _ in queries
+        ]
+
+        in_flight = 0
+        most_in_flight = 0
+
+        async def __generate_reply(context: str) -> Response[str]:
+            nonlocal in_flight, most_in_flight
+            in_flight += 1
+            most_in_flight = max(most_in_flight, in_flight)
+            await sleep(0.01)
+            in_flight -= 1
+            return Response.ok(next(query for query in queries if query in context))
+
+        vectorise_many = patch.object(
+            self.vectoriser,
+            "vectorise_many",
+            AsyncMock(return_value=Response.ok(vectors)),
+        ).start()
+        search_by_vectors = patch.object(
+            self.vector_repo,
+            "search_by_vectors",
+            AsyncMock(return_value=Response.ok(search_results)),
+        ).start()
+        patch.object(
+            self.llm, "generate_reply", AsyncMock(side_effect=__generate_reply)
+        ).start()
+
+        # Act
+        response = await self.service.search_many(
+            search_request_id, queries, num_results
+        )
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        assert response.payload is not None
+        self.assertEqual([answer.answer for answer in response.payload], queries)
+        self.assertEqual(
+            [answer.sources[0].rating for answer in response.payload],
+            [results[0].score for results in search_results],
+        )
+
+        vectorise_many.assert_called_once_with(search_request_id, queries)
+        search_by_vectors.assert_called_once_with(vectors, num_results, None, queries)
+        self.assertEqual(most_in_flight, 2)
+        self.assertNotIn(search_request_id, self.service.search_requests)
@@ -17,6 +17,10 @@ from sbilifeco.models.base import Response
 from asyncio import sleep
 from playwright.async_api import async_playwright, Playwright, Route, Request, expect
 from sbilifeco.boundaries.id_name_repo import IDNameEntity
+from sbilifeco.boundaries.product_analyst.ingest_flow import (
+    IngestionState,
+    IngestionStatus,
+)
 
 
 class Test(IsolatedAsyncioTestCase):
@@ -34,6 +38,7 @@ class Test(IsolatedAsyncioTestCase):
         self.browser = await self.playwright.chromium.launch(headless=False)
         self.page = await self.browser.new_page()
         self.ingest_url_requests: list[Request] = []
+        self.ingestion_status = IngestionStatus(state=IngestionState.COMPLETED)
 
         self.page.on("console", lambda msg: print(f"PAGE LOG: {msg}"))
 
@@ -68,6 +73,12 @@ class Test(IsolatedAsyncioTestCase):
                 content_type="application/json",
                 body=Response.ok(uuid4().hex).model_dump_json(),
             )
+        elif route.request.url.endswith("/status"):
+            await route.fulfill(
+                status=200,
+                content_type="application/json",
+                body=Response.ok(self.ingestion_status).model_dump_json(),
+            )
         elif "/ingest-requests" in route.request.url:
             await route.fulfill(
                 status=200,
@@ -182,30 +193,67 @@ class Test(IsolatedAsyncioTestCase):
         await upload_button.click()
 
         # Assert
-        await sleep(1)
+        await expect(self.page.locator("#banner-feedback-upload")).to_contain_text(
+            "success", ignore_case=True, timeout=5000
+        )
+        await sleep(0.5)
 
-        self.assertEqual(len(self.ingest_url_requests), 4)
+        self.assertEqual(len(self.ingest_url_requests), 5)
         self.assertTrue(
             self.ingest_url_requests[0].url.endswith("/api/v1/material-list-requests"),
-            "Third request should fetch updated material list",
+            "First request should fetch the material list",
         )
         self.assertTrue(
             self.ingest_url_requests[1].url.endswith("/api/v1/ingest-requests"),
-            "First request should request ingestion",
+            "Second request should request ingestion",
         )
         self.assertTrue(
-            "/api/v1/ingest-requests" in self.ingest_url_requests[2].url,
-            "Second request should inject data into current ingestion request",
+            self.ingest_url_requests[2].url.endswith("/background"),
+            "Third request should start the ingestion in the background",
         )
         self.assertTrue(
-            self.ingest_url_requests[3].url.endswith("/api/v1/material-list-requests"),
-            "Third request should fetch updated material list",
+            self.ingest_url_requests[3].url.endswith("/status"),
+            "Fourth request should poll the ingestion status",
+        )
+        self.assertTrue(
+            self.ingest_url_requests[4].url.endswith("/api/v1/material-list-requests"),
+            "Fifth request should fetch updated material list",
         )
-
-        self.assertIn("success", (await feedback_banner.inner_text()).lower())
 
         self.assertEqual(await content_name_input.input_value(), "")
         self.assertEqual(await file_input.input_value(), "")
 
         uploaded_content_name = self.page.get_by_text(content_title)
         await expect(uploaded_content_name).to_be_visible()
+
+    async def test_error_when_ingestion_fails(self) -> None:
+        # Arrange
+        self.ingestion_status = IngestionStatus(
+            state=IngestionState.FAILED, error=self.faker.sentence()
+        )
+        await self.page.route(
+            "**/api/v1/ingest-requests**", self.route_request_ingestion
+        )
+        await self.page.route(
+            "**/api/v1/material-list-requests", self.route_request_materials
+        )
+
+        await self.page.goto(self.base_url)
+        content_name_input = await self.page.wait_for_selector(
+            "#input-content-name", timeout=5000
+        )
+        assert content_name_input is not None
+        file_input = await self.page.query_selector("#input-content-file")
+        assert file_input is not None
+        upload_button = await self.page.query_selector("#action-upload")
+        assert upload_button is not None
+
+        # Act
+        await content_name_input.fill(" ".join(self.faker.words(3)))
+        await file_input.set_input_files("test/fixtures/brochure.pdf")
+        await upload_button.click()
+
+        # Assert
+        await expect(self.page.locator("#banner-feedback-upload")).to_contain_text(
+            self.ingestion_status.error, timeout=5000
+        )
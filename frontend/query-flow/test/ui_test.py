@@ -17,7 +17,11 @@ from sbilifeco.models.base import Response
 from re import compile
 from asyncio import sleep
 from playwright.async_api import async_playwright, expect, Request, Route
-from sbilifeco.boundaries.product_analyst.query_flow import RatedAnswer
+from sbilifeco.boundaries.product_analyst.query_flow import (
+    RatedAnswer,
+    RatedAnswerChunk,
+    RatedSource,
+)
 
 
 class Test(IsolatedAsyncioTestCase):
@@ -78,6 +82,29 @@ class Test(IsolatedAsyncioTestCase):
 
         return __handle
 
+    def handle_stream_request(self, chunks: list[RatedAnswerChunk]):
+        async def __handle(route: Route, request: Request) -> None:
+            print(f"Outbound request to --> {request.url}")
+            if request.url.endswith(self.material_queries_path):
+                await route.fulfill(
+                    status=200, json=Response.ok(uuid4().hex).model_dump()
+                )
+            elif request.url.endswith("/stream"):
+                events = [
+                    f"event: {'token' if i else 'sources'}\n"
+                    f"data: {chunk.model_dump_json()}\n\n"
+                    for i, chunk in enumerate(chunks)
+                ]
+                await route.fulfill(
+                    status=200,
+                    content_type="text/event-stream",
+                    body="".join(events) + "event: done\ndata: {}\n\n",
+                )
+            else:
+                await route.continue_()
+
+        return __handle
+
     async def test__page_loads(self) -> None:
         await self.page.goto(self.url)
         await self.page.wait_for_load_state("domcontentloaded", timeout=3000)
@@ -126,3 +153,31 @@ class Test(IsolatedAsyncioTestCase):
 
         await expect(panel_history).to_contain_text(query, timeout=500)
         await expect(panel_history).to_contain_text(reply, timeout=500)
+
+    async def test__submit_valid_query_streamed(self) -> None:
+        # Arrange
+        await self.page.goto(self.url)
+        input_query = self.page.locator("#input-query")
+        button_submit = self.page.locator("#action-submit")
+        panel_history = self.page.locator("#panel-history")
+        query = self.faker.sentence()
+        source = self.faker.sentence()
+        words = self.faker.words(5)
+
+        await self.page.route(
+            "**",
+            self.handle_stream_request(
+                [
+                    RatedAnswerChunk(sources=[RatedSource(source=source, rating=0.9)]),
+                    *[RatedAnswerChunk(token=f"{word} ") for word in words],
+                ]
+            ),
+        )
+
+        # Act
+        await input_query.fill(query)
+        await button_submit.click()
+
+        await expect(panel_history).to_contain_text(query, timeout=500)
+        await expect(panel_history).to_contain_text(source, timeout=500)
+        await expect(panel_history).to_contain_text(" ".join(words), timeout=500)
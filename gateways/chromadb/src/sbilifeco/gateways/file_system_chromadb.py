@@ -1,21 +1,58 @@
 from __future__ import annotations
-from typing import Any
+from typing import Any, Callable, Sequence, TypeVar
 from sbilifeco.models.base import Response
 from sbilifeco.boundaries.vectoriser import BaseVectoriser
 from sbilifeco.boundaries.vector_repo import BaseVectorRepo
+from sbilifeco.gateways.offload import OffloadExecutor
+from sbilifeco.gateways.micro_batcher import MicroBatcher
 from chromadb.api import ClientAPI
+from chromadb.api.models.Collection import Collection
+from chromadb.api.types import GetResult, Include, QueryResult
 from chromadb import PersistentClient
 from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
-from sbilifeco.models.vectorisation import VectorisedRecord, RecordMetadata
+from sbilifeco.models.vectorisation import (
+    Float32Vector,
+    VectorisedRecord,
+    VectorisedRecordPage,
+    RecordMetadata,
+)
+
+T = TypeVar("T")
 
 
 class FileSystemChromDB(BaseVectoriser, BaseVectorRepo):
+    DEFAULT_UPSERT_BATCH_SIZE = 256
+    DEFAULT_IO_THREADS = 4
+    DEFAULT_EMBEDDING_THREADS = 1
+
     def __init__(self):
         BaseVectoriser.__init__(self)
         BaseVectorRepo.__init__(self)
         self.db_path = ""
+        self.upsert_batch_size = self.DEFAULT_UPSERT_BATCH_SIZE
         self.chroma_client: ClientAPI
         self.embedding_function: DefaultEmbeddingFunction
+        self.collections: dict[str, Collection] = {}
+
+        # The Chroma client and the embedding model both block, so they run on their own pools
+        self.io = (
+            OffloadExecutor()
+            .set_name("chroma-io")
+            .set_max_workers(self.DEFAULT_IO_THREADS)
+        )
+        self.embedding = (
+            OffloadExecutor()
+            .set_name("chroma-embedding")
+            .set_max_workers(self.DEFAULT_EMBEDDING_THREADS)
+        )
+
+        # Single vectorisations from concurrent callers are embedded together
+        self.vectorise_batcher = (
+            MicroBatcher[str, Float32Vector]()
+            .set_name("chroma-vectorise")
+            .set_max_concurrent_batches(self.DEFAULT_EMBEDDING_THREADS)
+            .set_handler(self._embed)
+        )
 
     def set_db_path(self, db_path: str) -> FileSystemChromDB:
         self.db_path = db_path
@@ -25,16 +62,91 @@ class FileSystemChromDB(BaseVectoriser, BaseVectorRepo):
         self.collection_name = collection_name
         return self
 
+    def set_upsert_batch_size(self, upsert_batch_size: int) -> FileSystemChromDB:
+        self.upsert_batch_size = max(1, upsert_batch_size)
+        return self
+
+    def set_io_threads(self, io_threads: int) -> FileSystemChromDB:
+        """Upper bound on Chroma calls running at once."""
+        self.io.set_max_workers(io_threads)
+        return self
+
+    def set_embedding_threads(self, embedding_threads: int) -> FileSystemChromDB:
+        """Upper bound on embeddings running at once. The model is already multi-threaded, so more than one rarely helps."""
+        self.embedding.set_max_workers(embedding_threads)
+        self.vectorise_batcher.set_max_concurrent_batches(embedding_threads)
+        return self
+
+    def set_vectorise_batch_size(self, vectorise_batch_size: int) -> FileSystemChromDB:
+        """The most single vectorisations embedded together. 1 embeds each on its own."""
+        self.vectorise_batcher.set_max_batch_size(vectorise_batch_size)
+        return self
+
+    def set_vectorise_batch_wait_ms(
+        self, vectorise_batch_wait_ms: float
+    ) -> FileSystemChromDB:
+        """How long a single vectorisation may wait for others to be embedded with it."""
+        self.vectorise_batcher.set_max_wait_ms(vectorise_batch_wait_ms)
+        return self
+
     async def async_init(self) -> None:
-        self.chroma_client = PersistentClient(path=self.db_path)
+        self.chroma_client = await self.io.run(PersistentClient, path=self.db_path)
         self.embedding_function = DefaultEmbeddingFunction()
-        self.chroma_client.get_or_create_collection(self.collection_name)
+        self.collections[self.collection_name] = await self.io.run(
+            self.chroma_client.get_or_create_collection, self.collection_name
+        )
+
+    async def async_shutdown(self) -> None:
+        self.vectorise_batcher.shutdown()
+        self.io.shutdown()
+        self.embedding.shutdown()
+        self.collections.clear()
+
+    def executor_stats(self) -> list[dict[str, Any]]:
+        """Queue depths and counters of the pools that blocking calls run on."""
+        return [
+            self.vectorise_batcher.stats(),
+            self.io.stats(),
+            self.embedding.stats(),
+        ]
+
+    async def _embed(self, texts: list[str]) -> list[Float32Vector]:
+        embeddings = await self.embedding.run(self.embedding_function, texts)
+        return [Float32Vector(embedding) for embedding in embeddings]
+
+    def _get_collection(self, collection_name: str) -> Collection:
+        # Looking a collection up is a trip to Chroma's sysdb, so handles are held on to
+        collection = self.collections.get(collection_name)
+        if collection is None:
+            collection = self.chroma_client.get_collection(collection_name)
+            self.collections[collection_name] = collection
+        return collection
+
+    async def _on_collection(
+        self, call: Callable[[Collection], T], collection_name: str | None = None
+    ) -> T:
+        collection_name = collection_name or self.collection_name
+
+        def __call() -> T:
+            collection = self._get_collection(collection_name)
+            try:
+                return call(collection)
+            except Exception:
+                # The handle may be stale, e.g. the collection was recreated. Retry only if it was.
+                self.collections.pop(collection_name, None)
+                fresh_collection = self._get_collection(collection_name)
+                if fresh_collection.id == collection.id:
+                    raise
+                print(
+                    f"Refreshed the handle of collection {collection_name}", flush=True
+                )
+                return call(fresh_collection)
 
-    async def async_shutdown(self) -> None: ...
+        return await self.io.run(__call)
 
     async def vectorise(
         self, request_id: str, material: str | bytes | bytearray
-    ) -> Response[list[float | int]]:
+    ) -> Response[Sequence[float | int]]:
         try:
             material_as_str = ""
 
@@ -43,9 +155,28 @@ class FileSystemChromDB(BaseVectoriser, BaseVectorRepo):
             if isinstance(material, (bytes, bytearray)):
                 material_as_str = material.decode("utf-8")
 
-            embeddings = self.embedding_function([material_as_str])
+            vector = await self.vectorise_batcher.submit(material_as_str)
+
+            return Response.ok(vector)
+        except Exception as e:
+            return Response.error(e)
+
+    async def vectorise_many(
+        self, request_id: str, materials: Sequence[str | bytes | bytearray]
+    ) -> Response[list[Sequence[float | int]]]:
+        try:
+            materials_as_str = [
+                (
+                    bytes(material).decode("utf-8")
+                    if isinstance(material, (bytes, bytearray))
+                    else material
+                )
+                for material in materials
+            ]
+            if not materials_as_str:
+                return Response.ok([])
 
-            return Response.ok(embeddings[0].tolist())
+            return Response.ok(await self._embed(materials_as_str))
         except Exception as e:
             return Response.error(e)
 
@@ -59,13 +190,55 @@ class FileSystemChromDB(BaseVectoriser, BaseVectorRepo):
                 document_as_str = record.document.decode("utf-8")
 
             # Upsert
-            self.chroma_client.get_collection(self.collection_name).upsert(
-                ids=[record.id],
-                documents=[document_as_str],
-                embeddings=[record.vector],
-                metadatas=[record.metadata.model_dump()],
+            await self._on_collection(
+                lambda collection: collection.upsert(
+                    ids=[record.id],
+                    documents=[document_as_str],
+                    embeddings=[record.vector.values],
+                    metadatas=[record.metadata.model_dump()],
+                )
+            )
+
+            # Return
+            return Response.ok(None)
+        except Exception as e:
+            return Response.error(e)
+
+    async def crupdate_many(
+        self, records: Sequence[VectorisedRecord]
+    ) -> Response[None]:
+        try:
+            batch_size = min(
+                self.upsert_batch_size,
+                await self.io.run(self.chroma_client.get_max_batch_size),
             )
 
+            for start in range(0, len(records), batch_size):
+                batch = records[start : start + batch_size]
+
+                # Adjust
+                documents_as_str = [
+                    (
+                        record.document.decode("utf-8")
+                        if isinstance(record.document, (bytes, bytearray))
+                        else record.document or ""
+                    )
+                    for record in batch
+                ]
+
+                # Upsert
+                await self._on_collection(
+                    lambda collection: collection.upsert(
+                        ids=[record.id for record in batch],
+                        documents=documents_as_str,
+                        embeddings=[record.vector.values for record in batch],
+                        metadatas=[
+                            record.metadata.model_dump() if record.metadata else None
+                            for record in batch
+                        ],
+                    )
+                )
+
             # Return
             return Response.ok(None)
         except Exception as e:
@@ -74,8 +247,8 @@ class FileSystemChromDB(BaseVectoriser, BaseVectorRepo):
     async def delete_by_id(self, record_id: str) -> Response[None]:
         try:
             # Delete
-            self.chroma_client.get_collection(self.collection_name).delete(
-                ids=[record_id]
+            await self._on_collection(
+                lambda collection: collection.delete(ids=[record_id])
             )
 
             # Return
@@ -86,8 +259,10 @@ class FileSystemChromDB(BaseVectoriser, BaseVectorRepo):
     async def delete_by_criteria(self, criteria: dict[str, Any]) -> Response[None]:
         try:
             # Delete
-            self.chroma_client.get_collection(self.collection_name).delete(
-                where=criteria
+            await self._on_collection(
+                lambda collection: collection.delete(
+                    where=self._where_from_criteria(criteria)
+                )
             )
 
             # Return
@@ -98,8 +273,10 @@ class FileSystemChromDB(BaseVectoriser, BaseVectorRepo):
     async def read_by_id(self, record_id: str) -> Response[VectorisedRecord]:
         try:
             # Fetch
-            query_result = self.chroma_client.get_collection(self.collection_name).get(
-                ids=[record_id], include=["documents", "metadatas"]
+            query_result = await self._on_collection(
+                lambda collection: collection.get(
+                    ids=[record_id], include=["documents", "metadatas"]
+                )
             )
 
             # Validate
@@ -128,89 +305,204 @@ class FileSystemChromDB(BaseVectoriser, BaseVectorRepo):
             return Response.error(e)
 
     async def read_by_criteria(
-        self, criteria: dict[str, Any]
+        self, criteria: dict[str, Any], include_vectors: bool = False
     ) -> Response[list[VectorisedRecord]]:
-        # Fetch
-        query_result = self.chroma_client.get_collection(self.collection_name).get(
-            where=criteria, include=["documents", "metadatas"]
-        )
-
-        # Validate
-        if not query_result["ids"]:
-            return Response.fail(f"Record with criteria {criteria} not found.", 404)
-        if "documents" not in query_result or not query_result["documents"]:
-            return Response.fail(
-                f"For record with criteria {criteria}, document content is inexplicably empty"
-            )
-        if "metadatas" not in query_result or not query_result["metadatas"]:
-            return Response.fail(
-                f"For record with criteria {criteria}, metadata is inexplicably empty"
+        try:
+            # Fetch
+            query_result = await self._on_collection(
+                lambda collection: collection.get(
+                    where=self._where_from_criteria(criteria) or None,
+                    include=self._include(True, include_vectors),
+                )
             )
 
-        # Triage
-        records = [
-            VectorisedRecord(
-                id=query_result["ids"][i],
-                vector=[],
-                metadata=RecordMetadata.model_validate(
-                    query_result["metadatas"][i]
-                    if "metadatas" in query_result and query_result["metadatas"]
-                    else {}
-                ),
-                document=(
-                    query_result["documents"][i]
-                    if "documents" in query_result and query_result["documents"]
-                    else ""
-                ),
+            # Validate
+            if not query_result["ids"]:
+                return Response.fail(f"Record with criteria {criteria} not found.", 404)
+            if "documents" not in query_result or not query_result["documents"]:
+                return Response.fail(
+                    f"For record with criteria {criteria}, document content is inexplicably empty"
+                )
+            if "metadatas" not in query_result or not query_result["metadatas"]:
+                return Response.fail(
+                    f"For record with criteria {criteria}, metadata is inexplicably empty"
+                )
+
+            # Return
+            return Response.ok(self._records_from_get_result(query_result))
+        except Exception as e:
+            return Response.error(e)
+
+    async def read_page_by_criteria(
+        self,
+        criteria: dict[str, Any],
+        page_size: int = BaseVectorRepo.DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        include_vectors: bool = False,
+        include_documents: bool = True,
+    ) -> Response[VectorisedRecordPage]:
+        try:
+            # The cursor is the offset of the page
+            offset = int(cursor) if cursor else 0
+
+            # Fetch
+            query_result = await self._on_collection(
+                lambda collection: collection.get(
+                    where=self._where_from_criteria(criteria) or None,
+                    include=self._include(include_documents, include_vectors),
+                    limit=page_size,
+                    offset=offset,
+                )
             )
-            for i in range(len(query_result["ids"]))
-        ]
+            records = self._records_from_get_result(query_result)
 
-        # Return
-        return Response.ok(records)
+            # Return
+            return Response.ok(
+                VectorisedRecordPage(
+                    records=records,
+                    next_cursor=(
+                        str(offset + len(records))
+                        if len(records) == page_size
+                        else None
+                    ),
+                )
+            )
+        except Exception as e:
+            return Response.error(e)
 
     async def search_by_vector(
-        self, vector: list[float], num_results: int = 5
+        self,
+        vector: Sequence[float | int],
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
+        text: str | None = None,
     ) -> Response[list[VectorisedRecord]]:
         try:
             # Fetch
-            query_result = self.chroma_client.get_collection(
-                self.collection_name
-            ).query(
-                query_embeddings=[vector],
-                n_results=num_results,
-                include=["documents", "metadatas", "distances"],
+            query_result = await self._on_collection(
+                lambda collection: collection.query(
+                    query_embeddings=[Float32Vector(vector).values],
+                    n_results=num_results,
+                    where=self._where_from_criteria(criteria) if criteria else None,
+                    include=["documents", "metadatas", "distances"],
+                )
             )
 
             # Validate
             if not query_result["ids"]:
                 return Response.fail("No semantically matching records found.", 404)
 
-            # Triage
-            records = [
-                VectorisedRecord(
-                    id=query_result["ids"][0][i],
-                    vector=[],
-                    metadata=RecordMetadata.model_validate(
-                        query_result["metadatas"][0][i]
-                        if "metadatas" in query_result and query_result["metadatas"]
-                        else {}
-                    ),
-                    document=(
-                        query_result["documents"][0][i]
-                        if "documents" in query_result and query_result["documents"]
-                        else ""
-                    ),
-                    score=(
-                        query_result["distances"][0][i]
-                        if "distances" in query_result and query_result["distances"]
-                        else 0.0
-                    ),
+            # Return
+            return Response.ok(self._records_from_query_result(query_result, 0))
+        except Exception as e:
+            return Response.error(e)
+
+    async def search_by_vectors(
+        self,
+        vectors: Sequence[Sequence[float | int]],
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
+        texts: Sequence[str] | None = None,
+    ) -> Response[list[list[VectorisedRecord]]]:
+        try:
+            if not vectors:
+                return Response.ok([])
+
+            # Fetch, one query holding every vector
+            query_result = await self._on_collection(
+                lambda collection: collection.query(
+                    query_embeddings=[
+                        Float32Vector(vector).values for vector in vectors
+                    ],
+                    n_results=num_results,
+                    where=self._where_from_criteria(criteria) if criteria else None,
+                    include=["documents", "metadatas", "distances"],
+                )
+            )
+
+            # Validate
+            if len(query_result["ids"]) != len(vectors):
+                return Response.fail(
+                    f"Expected results for {len(vectors)} vectors, got {len(query_result['ids'])}",
+                    500,
                 )
-                for i in range(len(query_result["ids"][0]))
-            ]
 
             # Return
-            return Response.ok(records)
+            return Response.ok(
+                [
+                    self._records_from_query_result(query_result, query_num)
+                    for query_num in range(len(vectors))
+                ]
+            )
         except Exception as e:
             return Response.error(e)
+
+    @staticmethod
+    def _where_from_criteria(criteria: dict[str, Any]) -> dict[str, Any]:
+        # A list of values matches any of them, and several keys must all match
+        conditions = [
+            {
+                key: (
+                    {"$in": list(value)}
+                    if isinstance(value, (list, tuple, set))
+                    else value
+                )
+            }
+            for key, value in criteria.items()
+        ]
+        if len(conditions) > 1:
+            return {"$and": conditions}
+        return conditions[0] if conditions else {}
+
+    @staticmethod
+    def _include(include_documents: bool, include_vectors: bool) -> Include:
+        include: Include = ["metadatas"]
+        if include_documents:
+            include.append("documents")
+        if include_vectors:
+            include.append("embeddings")
+        return include
+
+    @staticmethod
+    def _records_from_get_result(get_result: GetResult) -> list[VectorisedRecord]:
+        documents = get_result.get("documents")
+        metadatas = get_result.get("metadatas")
+        embeddings = get_result.get("embeddings")
+        return [
+            VectorisedRecord(
+                id=get_result["ids"][i],
+                vector=embeddings[i] if embeddings is not None else [],
+                metadata=RecordMetadata.model_validate(
+                    metadatas[i] if metadatas else {}
+                ),
+                document=documents[i] if documents else None,
+            )
+            for i in range(len(get_result["ids"]))
+        ]
+
+    @staticmethod
+    def _records_from_query_result(
+        query_result: QueryResult, query_num: int
+    ) -> list[VectorisedRecord]:
+        return [
+            VectorisedRecord(
+                id=query_result["ids"][query_num][i],
+                vector=[],
+                metadata=RecordMetadata.model_validate(
+                    query_result["metadatas"][query_num][i]
+                    if "metadatas" in query_result and query_result["metadatas"]
+                    else {}
+                ),
+                document=(
+                    query_result["documents"][query_num][i]
+                    if "documents" in query_result and query_result["documents"]
+                    else ""
+                ),
+                score=(
+                    query_result["distances"][query_num][i]
+                    if "distances" in query_result and query_result["distances"]
+                    else 0.0
+                ),
+            )
+            for i in range(len(query_result["ids"][query_num]))
+        ]
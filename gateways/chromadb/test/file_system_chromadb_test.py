@@ -54,6 +54,23 @@ class FileSystemChromaDBTest(IsolatedAsyncioTestCase):
         self.assertNotEqual(0, vectorise_response.payload[0])
         ...
 
+    async def test_vectorise_many(self) -> None:
+        # Arrange
+        materials = [self.faker.paragraph() for _ in range(5)]
+        request_id = uuid4().hex
+
+        # Act
+        vectorise_response = await self.service.vectorise_many(request_id, materials)
+
+        # Assert
+        self.assertTrue(vectorise_response.is_success, vectorise_response.message)
+        assert vectorise_response.payload is not None
+
+        self.assertEqual(len(materials), len(vectorise_response.payload))
+        for vector in vectorise_response.payload:
+            self.assertTrue(vector)
+        ...
+
     async def test_create(self) -> None:
         # Arrange
         id = uuid4().hex
@@ -82,6 +99,40 @@ class FileSystemChromaDBTest(IsolatedAsyncioTestCase):
         self.assertEqual(record, read_response.payload)
         ...
 
+    async def test_create_many(self) -> None:
+        # Arrange
+        source_id = uuid4().hex
+        records = [
+            VectorisedRecord(
+                id=uuid4().hex,
+                vector=[randint(0, 100) for _ in range(256)],
+                document=self.faker.paragraph(),
+                metadata=RecordMetadata(
+                    source_id=source_id,
+                    source=" ".join(self.faker.words(3)),
+                    chunk_num=chunk_num,
+                ),
+            )
+            for chunk_num in range(5)
+        ]
+        self.service.set_upsert_batch_size(2)
+
+        # Act
+        create_response = await self.service.crupdate_many(records)
+
+        # Assert
+        self.assertTrue(create_response.is_success, create_response.message)
+
+        for record in records:
+            read_response = await self.service.read_by_id(record.id)
+            self.assertTrue(read_response.is_success, read_response.message)
+            assert read_response.payload is not None
+
+            # Fetched data won't have the vector, so remove it for comparison
+            record.vector = []
+            self.assertEqual(record, read_response.payload)
+        ...
+
     async def test_update(self) -> None:
         # Arrange
         id = uuid4().hex
@@ -143,6 +194,32 @@ class FileSystemChromaDBTest(IsolatedAsyncioTestCase):
         self.assertEqual(404, read_response.code)
         ...
 
+    async def test_recreated_collection(self) -> None:
+        # Arrange
+        record = VectorisedRecord(
+            id=uuid4().hex,
+            vector=[randint(0, 100) for _ in range(256)],
+            document=self.faker.paragraph(),
+            metadata=RecordMetadata(source_id=uuid4().hex, chunk_num=0),
+        )
+        await self.service.crupdate(record)
+        stale_collection = self.service.collections[self.collection_name]
+
+        self.service.chroma_client.delete_collection(self.collection_name)
+        self.service.chroma_client.create_collection(self.collection_name)
+
+        # Act
+        crupdate_response = await self.service.crupdate(record)
+
+        # Assert
+        self.assertTrue(crupdate_response.is_success, crupdate_response.message)
+        self.assertNotEqual(
+            self.service.collections[self.collection_name].id, stale_collection.id
+        )
+
+        read_response = await self.service.read_by_id(record.id)
+        self.assertTrue(read_response.is_success, read_response.message)
+
     async def test_delete_by_criteria(self) -> None:
         # Arrange
         id = uuid4().hex
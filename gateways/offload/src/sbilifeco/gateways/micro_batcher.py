@@ -0,0 +1,139 @@
+from __future__ import annotations
+from asyncio import (
+    Future,
+    Task,
+    TimerHandle,
+    create_task,
+    current_task,
+    get_running_loop,
+)
+from typing import Any, Awaitable, Callable, Generic, TypeVar
+
+I = TypeVar("I")
+O = TypeVar("O")
+
+
+class MicroBatcher(Generic[I, O]):
+    """
+    Collects items submitted one at a time by concurrent callers and hands them to a batch handler together.
+    A batch is sent when it reaches `max_batch_size` items or when its first item has waited `max_wait_ms`, whichever comes first.
+    While `max_concurrent_batches` batches are in flight, new items keep collecting and go out as soon as one of them finishes.
+    Like OffloadExecutor, state is only touched from the event loop, so it needs no locking.
+    """
+
+    DEFAULT_MAX_BATCH_SIZE = 32
+    DEFAULT_MAX_WAIT_MS = 2.0
+    DEFAULT_MAX_CONCURRENT_BATCHES = 1
+
+    def __init__(self) -> None:
+        self.name = "micro-batcher"
+        self.max_batch_size = self.DEFAULT_MAX_BATCH_SIZE
+        self.max_wait_ms = self.DEFAULT_MAX_WAIT_MS
+        self.max_concurrent_batches = self.DEFAULT_MAX_CONCURRENT_BATCHES
+        self.handler: Callable[[list[I]], Awaitable[list[O]]]
+        self.pending: list[tuple[I, Future[O]]] = []
+        self.timer: TimerHandle | None = None
+        self.in_flight: set[Task[None]] = set()
+        self.batches = 0
+        self.items = 0
+
+    def set_name(self, name: str) -> MicroBatcher[I, O]:
+        """Name used in logs and stats."""
+        self.name = name
+        return self
+
+    def set_max_batch_size(self, max_batch_size: int) -> MicroBatcher[I, O]:
+        self.max_batch_size = max(1, max_batch_size)
+        return self
+
+    def set_max_wait_ms(self, max_wait_ms: float) -> MicroBatcher[I, O]:
+        """How long the first item of a batch may wait for others to join it. 0 still batches items submitted in the same loop iteration."""
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        return self
+
+    def set_max_concurrent_batches(
+        self, max_concurrent_batches: int
+    ) -> MicroBatcher[I, O]:
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        return self
+
+    def set_handler(
+        self, handler: Callable[[list[I]], Awaitable[list[O]]]
+    ) -> MicroBatcher[I, O]:
+        """Coroutine taking a batch of items and returning one output per item, in the same order. Whatever it raises is raised to every caller in the batch."""
+        self.handler = handler
+        return self
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "pending": len(self.pending),
+            "in_flight": len(self.in_flight),
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
+
+    async def submit(self, item: I) -> O:
+        loop = get_running_loop()
+        future: Future[O] = loop.create_future()
+        self.pending.append((item, future))
+
+        if len(self.pending) >= self.max_batch_size:
+            self._flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        # Whatever does not fit goes out when a batch in flight finishes
+        while self.pending and len(self.in_flight) < self.max_concurrent_batches:
+            batch = self.pending[: self.max_batch_size]
+            self.pending = self.pending[self.max_batch_size :]
+
+            task = create_task(self._run(batch))
+            self.in_flight.add(task)
+
+    async def _run(self, batch: list[tuple[I, Future[O]]]) -> None:
+        try:
+            # Callers that gave up need no output
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                return
+
+            self.batches += 1
+            self.items += len(batch)
+
+            try:
+                outputs = await self.handler([item for item, _ in batch])
+                if len(outputs) != len(batch):
+                    raise ValueError(
+                        f"{self.name} got {len(outputs)} outputs for a batch of {len(batch)}"
+                    )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            for (_, future), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+        finally:
+            self.in_flight.discard(current_task())  # type: ignore[arg-type]
+            if self.pending:
+                self._flush()
+
+    def shutdown(self) -> None:
+        """Cancel the callers still waiting for a batch to be sent."""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        for _, future in self.pending:
+            future.cancel()
+        self.pending = []
@@ -0,0 +1,119 @@
+from __future__ import annotations
+from asyncio import get_running_loop
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class OffloadExecutor:
+    """
+    Runs blocking calls off the event loop on a bounded pool of workers, keeping count of the calls waiting for a worker.
+    Workers are threads by default, or spawned processes for work that holds the GIL or needs its own copy of a model. In that case calls, their arguments and their results must be picklable.
+    Counters are only touched from the event loop, so they need no locking.
+    """
+
+    DEFAULT_MAX_WORKERS = 4
+
+    def __init__(self) -> None:
+        self.name = "offload"
+        self.max_workers = self.DEFAULT_MAX_WORKERS
+        self.processes = False
+        self.initializer: Callable[..., None] | None = None
+        self.initargs: tuple[Any, ...] = ()
+        self.executor: Executor | None = None
+        self.pending = 0
+        self.completed = 0
+        self.max_queued = 0
+
+    def set_name(self, name: str) -> OffloadExecutor:
+        """Name used in logs and stats."""
+        self.name = name
+        return self
+
+    def set_max_workers(self, max_workers: int) -> OffloadExecutor:
+        """Upper bound on calls running at once. Takes effect when the pool is next created."""
+        self.max_workers = max(1, max_workers)
+        return self
+
+    def set_processes(self, processes: bool) -> OffloadExecutor:
+        """When set, workers are processes instead of threads. Takes effect when the pool is next created."""
+        self.processes = processes
+        return self
+
+    def set_initializer(
+        self, initializer: Callable[..., None], *initargs: Any
+    ) -> OffloadExecutor:
+        """Called once in every worker as it starts, e.g. to load a model the worker keeps. Takes effect when the pool is next created."""
+        self.initializer = initializer
+        self.initargs = initargs
+        return self
+
+    @property
+    def running(self) -> int:
+        return min(self.pending, self.max_workers)
+
+    @property
+    def queued(self) -> int:
+        """Calls waiting for a free worker."""
+        return max(0, self.pending - self.max_workers)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "processes": self.processes,
+            "max_workers": self.max_workers,
+            "running": self.running,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+        }
+
+    def _create_executor(self) -> Executor:
+        if self.processes:
+            # Forking a process that runs an event loop and native thread pools is unsafe, so workers are spawned
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=get_context("spawn"),
+                initializer=self.initializer,
+                initargs=self.initargs,
+            )
+
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=self.name,
+            initializer=self.initializer,
+            initargs=self.initargs,
+        )
+
+    def _get_executor(self) -> Executor:
+        if self.executor is None:
+            self.executor = self._create_executor()
+        return self.executor
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        executor = self._get_executor()
+
+        self.pending += 1
+        if self.queued > self.max_queued:
+            self.max_queued = self.queued
+            print(
+                f"{self.name} has {self.queued} calls waiting for one of its {self.max_workers} workers",
+                flush=True,
+            )
+
+        try:
+            return await get_running_loop().run_in_executor(
+                executor, partial(fn, *args, **kwargs)
+            )
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def shutdown(self) -> None:
+        """Stop the pool. Calls still waiting for a worker are cancelled."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
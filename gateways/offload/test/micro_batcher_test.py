@@ -0,0 +1,61 @@
+import sys
+
+sys.path.append("./src")
+
+from asyncio import gather
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, patch
+
+# Import the necessary service(s) here
+from sbilifeco.gateways.micro_batcher import MicroBatcher
+
+
+class Test(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        # Initialise the service(s) here
+        self.handler = AsyncMock(side_effect=lambda items: [item * 2 for item in items])
+        self.service = (
+            MicroBatcher[int, int]()
+            .set_name("test")
+            .set_max_batch_size(4)
+            .set_max_wait_ms(5)
+            .set_handler(self.handler)
+        )
+
+    async def asyncTearDown(self) -> None:
+        # Shutdown the service(s) here
+        self.service.shutdown()
+        patch.stopall()
+
+    async def test_concurrent_items_share_a_batch(self) -> None:
+        # Act
+        outputs = await gather(*[self.service.submit(item) for item in range(3)])
+
+        # Assert
+        self.assertEqual(outputs, [0, 2, 4])
+        self.handler.assert_awaited_once_with([0, 1, 2])
+        self.assertEqual(self.service.stats()["mean_batch_size"], 3)
+
+    async def test_batches_are_capped(self) -> None:
+        # Act
+        outputs = await gather(*[self.service.submit(item) for item in range(10)])
+
+        # Assert
+        self.assertEqual(outputs, [item * 2 for item in range(10)])
+        self.assertEqual(
+            [call.args[0] for call in self.handler.await_args_list],
+            [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]],
+        )
+
+    async def test_failure_reaches_every_caller(self) -> None:
+        # Arrange
+        self.handler.side_effect = ValueError("Nope")
+
+        # Act
+        outputs = await gather(
+            *[self.service.submit(item) for item in range(3)], return_exceptions=True
+        )
+
+        # Assert
+        self.assertTrue(all(isinstance(output, ValueError) for output in outputs))
+        self.assertFalse(self.service.in_flight)
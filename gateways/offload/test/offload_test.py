@@ -0,0 +1,78 @@
+import sys
+
+sys.path.append("./src")
+
+from asyncio import gather, sleep
+from os import getpid
+from threading import Event, current_thread, main_thread
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+# Import the necessary service(s) here
+from sbilifeco.gateways.offload import OffloadExecutor
+
+
+class Test(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        # Initialise the service(s) here
+        self.service = OffloadExecutor().set_name("test").set_max_workers(2)
+
+    async def asyncTearDown(self) -> None:
+        # Shutdown the service(s) here
+        self.service.shutdown()
+        patch.stopall()
+
+    async def test_run_off_the_loop(self) -> None:
+        # Act
+        thread = await self.service.run(current_thread)
+
+        # Assert
+        self.assertIsNot(thread, main_thread())
+        self.assertEqual(self.service.completed, 1)
+        self.assertEqual(self.service.pending, 0)
+
+    async def test_run_in_a_process(self) -> None:
+        # Arrange
+        self.service.set_processes(True)
+
+        # Act
+        pid = await self.service.run(getpid)
+
+        # Assert
+        self.assertNotEqual(pid, getpid())
+        self.assertTrue(self.service.stats()["processes"])
+
+    async def test_queue_depth(self) -> None:
+        # Arrange
+        release = Event()
+
+        def __blocking(value: int) -> int:
+            release.wait(5)
+            return value
+
+        # Act
+        results = gather(*[self.service.run(__blocking, value) for value in range(5)])
+        while self.service.pending < 5:
+            await sleep(0)
+        running_while_blocked = self.service.running
+        queued_while_blocked = self.service.queued
+        release.set()
+        values = await results
+
+        # Assert
+        self.assertEqual(values, list(range(5)))
+        self.assertEqual(running_while_blocked, 2)
+        self.assertEqual(queued_while_blocked, 3)
+        self.assertEqual(self.service.max_queued, 3)
+        self.assertEqual(self.service.queued, 0)
+        self.assertEqual(self.service.completed, 5)
+
+    async def test_failure_is_raised(self) -> None:
+        # Arrange
+        def __failing() -> None:
+            raise ValueError("Nope")
+
+        # Act and assert
+        with self.assertRaises(ValueError):
+            await self.service.run(__failing)
+        self.assertEqual(self.service.pending, 0)
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
-from io import BufferedIOBase, RawIOBase, TextIOBase, BytesIO
+from asyncio import AbstractEventLoop, Lock, get_running_loop, to_thread
+from collections import OrderedDict
+from io import BufferedIOBase, IOBase, RawIOBase, TextIOBase, BytesIO
 from json import load
 from pathlib import Path
-from typing import AsyncGenerator
+from time import monotonic
+from typing import AsyncGenerator, AsyncIterator
 from uuid import uuid4
+from secrets import token_hex
 
 from sbilifeco.boundaries.material_reader import BaseMaterialReader
 from sbilifeco.models.base import Response
-from sbilifeco.cp.common.http.client import HttpClient, Request
+from sbilifeco.cp.common.http.client import HttpClient
+from httpx import AsyncClient, Timeout, Response as HttpxResponse
+from ijson import items
 
 
 class DoclingPaths:
@@ -16,14 +22,62 @@ class DoclingPaths:
     CHUNK_FILE = BASE + "/chunk/hybrid/file"
 
 
+class _DoclingStreamReader:
+    """Adapts a streamed docling-serve response to the async file interface ijson reads from."""
+
+    def __init__(self, docling_response: HttpxResponse) -> None:
+        self.pieces = docling_response.aiter_bytes()
+
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes with a zero-sized read to learn whether it gets bytes or text
+        if size == 0:
+            return b""
+        return await anext(self.pieces, b"")
+
+
+class _HeldChunks:
+    """A material's chunks, held for `read_next_chunk` between calls or streamed by `read_and_chunk`."""
+
+    def __init__(
+        self,
+        chunks: AsyncGenerator[str | bytes | bytearray],
+        docling_response: HttpxResponse | None = None,
+    ) -> None:
+        self.chunks = chunks
+        self.docling_response = docling_response
+        # Only one reader iterates the generator at a time, and nobody closes it mid-read
+        self.lock = Lock()
+        self.accessed_at = monotonic()
+        self.exhausted = False
+        self.evicted = False
+
+    async def close(self) -> None:
+        await self.chunks.aclose()
+        # A generator that was never started does not close the docling-serve response by itself
+        if self.docling_response is not None:
+            await self.docling_response.aclose()
+
+
 class DoclingReader(BaseMaterialReader, HttpClient):
+    DEFAULT_CHUNKS_TTL_SECONDS = 10 * 60
+    DEFAULT_MAX_MATERIALS = 64
+    DEFAULT_READ_SIZE = 64 * 1024
+    DEFAULT_CONNECT_TIMEOUT = 10.0
+
     def __init__(self):
         BaseMaterialReader.__init__(self)
         HttpClient.__init__(self)
         self.set_proto("http")
         self.set_host("localhost")
         self.set_port(80)
-        self.chunks: dict[str, AsyncGenerator[str | bytes | bytearray]] = {}
+        self.chunks: OrderedDict[str, _HeldChunks] = OrderedDict()
+        self.chunks_ttl_seconds: float = self.DEFAULT_CHUNKS_TTL_SECONDS
+        self.max_materials = self.DEFAULT_MAX_MATERIALS
+        self.docling_timeout: float | None = None
+        self.read_size = self.DEFAULT_READ_SIZE
+        self.docling_pool: AsyncClient | None = None
+        self.docling_pool_loop: AbstractEventLoop | None = None
+        self.incremental_parsing = True
 
     def set_doclingserve_proto(self, proto: str) -> DoclingReader:
         self.set_proto(proto)
@@ -37,91 +91,286 @@ class DoclingReader(BaseMaterialReader, HttpClient):
         self.set_port(port)
         return self
 
+    def set_docling_timeout(self, seconds: float | None) -> DoclingReader:
+        """Timeout for docling-serve to convert a material. None waits as long as it takes."""
+        self.docling_timeout = seconds
+        return self
+
+    def set_incremental_parsing(self, incremental_parsing: bool) -> DoclingReader:
+        """Yield chunks as they are decoded from docling-serve's response, instead of after parsing it whole."""
+        self.incremental_parsing = incremental_parsing
+        return self
+
+    def set_chunks_ttl(self, seconds: float) -> DoclingReader:
+        """Materials whose chunks have not been read for this long are dropped. 0 or less disables expiry."""
+        self.chunks_ttl_seconds = seconds
+        return self
+
+    def set_max_materials(self, max_materials: int) -> DoclingReader:
+        """Most materials whose chunks are held for `read_next_chunk`. The least recently read are dropped first."""
+        # A material must be held at least until its ID is handed out
+        self.max_materials = max(max_materials, 1)
+        return self
+
     async def async_init(self) -> None: ...
 
-    async def async_shutdown(self) -> None: ...
+    async def async_shutdown(self) -> None:
+        for material_id in list(self.chunks):
+            await self._drop_chunks(material_id)
 
-    async def read_material(
+        if self.docling_pool is not None:
+            await self.docling_pool.aclose()
+            self.docling_pool = None
+            self.docling_pool_loop = None
+
+    def _open_material(
         self,
         material: str | bytes | bytearray | RawIOBase | BufferedIOBase | TextIOBase,
-    ) -> Response[str]:
+    ) -> Response[IOBase]:
+        if isinstance(material, str):
+            if material.startswith("file://"):
+                the_path = Path(material[7:])
+                if not the_path.exists():
+                    return Response.fail("Invalid material")
+                return Response.ok(open(the_path, "rb"))
+            return Response.ok(BytesIO(material.encode()))
+        elif isinstance(material, (bytes, bytearray)):
+            return Response.ok(BytesIO(material))
+        elif isinstance(material, TextIOBase):
+            return Response.ok(BytesIO(material.read().encode()))
+        elif isinstance(material, IOBase):
+            # Binary file-likes, spooled uploads included, are uploaded as they are
+            return Response.ok(material)
+
+        return Response.fail("Unsupported material type", 400)
+
+    def _get_docling_pool(self) -> AsyncClient:
+        # The pool is bound to the event loop it was created in
+        loop = get_running_loop()
+        if self.docling_pool is None or self.docling_pool_loop is not loop:
+            self.docling_pool = AsyncClient(
+                # Only the conversion itself may take long, so a dead docling-serve still fails fast
+                timeout=Timeout(self.DEFAULT_CONNECT_TIMEOUT, read=self.docling_timeout)
+            )
+            self.docling_pool_loop = loop
+        return self.docling_pool
+
+    async def _iter_upload(
+        self, material_id: str, material: IOBase, boundary: str
+    ) -> AsyncIterator[bytes]:
+        # httpx reads multipart files on the event loop, so the form is framed here instead
+        yield (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="files"; filename="{material_id}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        # File materials and large spooled uploads sit on disk, so each read runs in a thread
+        while piece := await to_thread(material.read, self.read_size):
+            yield piece
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    async def _convert(
+        self, material_id: str, material: IOBase
+    ) -> Response[HttpxResponse]:
+        # The material is streamed to docling-serve in pieces rather than read whole into memory
+        pool = self._get_docling_pool()
+        boundary = token_hex(16)
+        docling_response = await pool.send(
+            pool.build_request(
+                "POST",
+                f"{self.url_base}{DoclingPaths.CHUNK_FILE}",
+                content=self._iter_upload(material_id, material, boundary),
+                headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+            ),
+            stream=True,
+        )
+        if not docling_response.is_success:
+            await docling_response.aread()
+            await docling_response.aclose()
+            return Response.fail(docling_response.text, docling_response.status_code)
+
+        return Response.ok(docling_response)
+
+    async def _read_chunks(
+        self,
+        material_id: str,
+        material: str | bytes | bytearray | RawIOBase | BufferedIOBase | TextIOBase,
+    ) -> Response[_HeldChunks]:
+        open_response = self._open_material(material)
+        if not open_response.is_success:
+            return Response.fail(open_response.message, open_response.code)
+        elif open_response.payload is None:
+            return Response.fail("Material is inexplicably empty", 500)
+        opened_material = open_response.payload
+
         try:
-            material_id = str(uuid4())
-            # converter = DocumentConverter()
+            docling_response = await self._convert(material_id, opened_material)
+        finally:
+            # Only close what was opened here
+            if opened_material is not material:
+                opened_material.close()
 
-            if isinstance(
-                material, (str, bytes, bytearray, RawIOBase, BufferedIOBase, TextIOBase)
-            ):
-                # result: ConversionResult | None = None
-                material_as_bytes = b""
-
-                if isinstance(material, str):
-                    if material.startswith("file://"):
-                        the_path = Path(material[7:])
-                        if not the_path.exists():
-                            return Response.fail("Invalid material")
-
-                        with open(the_path, "rb") as open_material:
-                            material_as_bytes = open_material.read()
-                    else:
-                        material_as_bytes = material.encode()
-                elif isinstance(material, (bytes, bytearray)):
-                    material_as_bytes = bytes(material)
-                elif isinstance(material, TextIOBase):
-                    material_as_bytes = material.read().encode()
-                elif isinstance(material, (RawIOBase, BufferedIOBase)):
-                    material_as_bytes = material.read()
-
-                req = Request(
-                    url=f"{self.url_base}{DoclingPaths.CHUNK_FILE}",
-                    method="POST",
-                    files={
-                        "files": (
-                            f"{material_id}",
-                            material_as_bytes,
-                            "application/octet-stream",
-                        )
-                    },
+        if not docling_response.is_success:
+            return Response.fail(docling_response.message, docling_response.code)
+        elif docling_response.payload is None:
+            return Response.fail("Docling response is inexplicably empty", 500)
+
+        if self.incremental_parsing:
+            return Response.ok(
+                _HeldChunks(
+                    self._stream_chunks(docling_response.payload),
+                    docling_response.payload,
                 )
+            )
 
-                docling_response = await self.request_as_binary(req)
-                if not docling_response.is_success:
-                    return Response.fail(
-                        docling_response.message, docling_response.code
-                    )
-                elif not docling_response.payload:
-                    return Response.fail("Docling payload is inexplicably empty", 500)
+        try:
+            docling_payload_as_bytes = await docling_response.payload.aread()
+        finally:
+            await docling_response.payload.aclose()
+        if not docling_payload_as_bytes:
+            return Response.fail("Docling payload is inexplicably empty", 500)
 
-                docling_payload_as_bytes = docling_response.payload
-                docling_payload = load(BytesIO(docling_payload_as_bytes))
+        docling_payload = load(BytesIO(docling_payload_as_bytes))
 
-                self.chunks[material_id] = self._get_next_chunk(
-                    docling_payload.get("chunks", [])
-                )
-                return Response.ok(material_id)
+        return Response.ok(
+            _HeldChunks(self._get_next_chunk(docling_payload.get("chunks", [])))
+        )
 
-            return Response.fail("Unsupported material type", 400)
+    async def read_material(
+        self,
+        material: str | bytes | bytearray | RawIOBase | BufferedIOBase | TextIOBase,
+    ) -> Response[str]:
+        try:
+            material_id = str(uuid4())
+
+            chunks_response = await self._read_chunks(material_id, material)
+            if not chunks_response.is_success:
+                return Response.fail(chunks_response.message, chunks_response.code)
+            elif chunks_response.payload is None:
+                return Response.fail("Chunks are inexplicably empty", 500)
+
+            await self._hold_chunks(material_id, chunks_response.payload)
+            return Response.ok(material_id)
         except Exception as e:
             return Response.error(e)
 
+    async def _hold_chunks(self, material_id: str, held: _HeldChunks) -> None:
+        self.chunks[material_id] = held
+        await self._evict_chunks()
+
+    async def _drop_chunks(self, material_id: str) -> None:
+        held = self.chunks.pop(material_id, None)
+        if held is None:
+            return
+
+        held.evicted = True
+        if held.lock.locked():
+            # A reader is iterating the chunks right now, and closes them once it is done
+            return
+
+        async with held.lock:
+            await held.close()
+
+    async def _evict_chunks(self) -> None:
+        if self.chunks_ttl_seconds > 0:
+            cutoff = monotonic() - self.chunks_ttl_seconds
+            for material_id, held in list(self.chunks.items()):
+                if held.accessed_at < cutoff:
+                    print(
+                        f"Dropping unread chunks of material {material_id}", flush=True
+                    )
+                    await self._drop_chunks(material_id)
+
+        while len(self.chunks) > self.max_materials:
+            material_id = next(iter(self.chunks))
+            print(f"Dropping chunks of material {material_id} to make room", flush=True)
+            await self._drop_chunks(material_id)
+
     async def read_next_chunk(
         self, material_id: str
     ) -> Response[str | bytes | bytearray]:
         try:
-            if material_id not in self.chunks:
-                return Response.fail(
-                    f"No material with ID {material_id} found. Did you check the result of read_material() for errors?",
-                    404,
-                )
-
-            chunks = self.chunks.get(material_id)
-            if not chunks:
+            chunks_response = await self.read_next_chunks(material_id, 1)
+            if not chunks_response.is_success:
+                return Response.fail(chunks_response.message, chunks_response.code)
+            elif chunks_response.payload is None:
                 return Response.fail(f"Material {material_id} is inexplicably blank")
 
-            try:
-                return Response.ok(await anext(self.chunks[material_id]))
-            except StopAsyncIteration:
-                return Response.ok(None)
+            return Response.ok(
+                chunks_response.payload[0] if chunks_response.payload else None
+            )
+        except Exception as e:
+            return Response.error(e)
+
+    async def read_next_chunks(
+        self, material_id: str, max_chunks: int
+    ) -> Response[list[str | bytes | bytearray]]:
+        try:
+            await self._evict_chunks()
+
+            held = self.chunks.get(material_id)
+            if held is None:
+                return self._material_not_found(material_id)
+
+            self.chunks.move_to_end(material_id)
+            held.accessed_at = monotonic()
+
+            async with held.lock:
+                # The material may have been dropped while waiting for another reader
+                if held.evicted:
+                    return self._material_not_found(material_id)
+
+                next_chunks: list[str | bytes | bytearray] = []
+                try:
+                    if not held.exhausted:
+                        async for chunk in held.chunks:
+                            next_chunks.append(chunk)
+                            if len(next_chunks) >= max(max_chunks, 1):
+                                break
+                        else:
+                            # Exhausted materials stay registered, answering with no chunks, until they are evicted
+                            held.exhausted = True
+                            await held.close()
+                finally:
+                    # Dropped mid-read, so closing the chunks was left to this reader
+                    if held.evicted and not held.exhausted:
+                        await held.close()
+
+            return Response.ok(next_chunks)
+        except Exception as e:
+            return Response.error(e)
+
+    def _material_not_found(self, material_id: str) -> Response:
+        return Response.fail(
+            f"No material with ID {material_id} found. Did you check the result of read_material() for errors? Unread materials are dropped after a while.",
+            404,
+        )
+
+    async def read_and_chunk(
+        self,
+        material: str | bytes | bytearray | RawIOBase | BufferedIOBase | TextIOBase,
+    ) -> Response[AsyncIterator[str | bytes]]:
+        try:
+            # The stream owns the chunks, so they never enter the registry to be evicted
+            chunks_response = await self._read_chunks(str(uuid4()), material)
+            if not chunks_response.is_success:
+                return Response.fail(chunks_response.message, chunks_response.code)
+            elif chunks_response.payload is None:
+                return Response.fail("Chunks are inexplicably empty", 500)
+            held = chunks_response.payload
+
+            async def __stream():
+                try:
+                    async for chunk in held.chunks:
+                        if not chunk:
+                            continue
+                        if isinstance(chunk, (bytes, bytearray)):
+                            chunk = bytes(chunk).decode()
+                        yield chunk + self.LOGICAL_CHUNK_DELIMITER
+                finally:
+                    await held.close()
+
+            return Response.ok(__stream())
         except Exception as e:
             return Response.error(e)
 
@@ -130,3 +379,14 @@ class DoclingReader(BaseMaterialReader, HttpClient):
     ) -> AsyncGenerator[str | bytes | bytearray]:
         for chunk in chunks:
             yield chunk.get("text", "")
+
+    async def _stream_chunks(
+        self, docling_response: HttpxResponse
+    ) -> AsyncGenerator[str | bytes | bytearray]:
+        try:
+            async for text in items(
+                _DoclingStreamReader(docling_response), "chunks.item.text"
+            ):
+                yield text
+        finally:
+            await docling_response.aclose()
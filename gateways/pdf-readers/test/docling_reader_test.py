@@ -2,16 +2,55 @@ import sys
 
 sys.path.append("./src")
 
+from asyncio import Event, create_task, get_running_loop, sleep, wait_for
+from email.parser import BytesParser
+from json import dumps
+from typing import AsyncIterator
 from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, patch
 
 from dotenv import load_dotenv
+from httpx import (
+    AsyncByteStream,
+    AsyncClient,
+    MockTransport,
+    Request as HttpxRequest,
+    Response as HttpxResponse,
+)
 from os import getenv
 
 # Import the necessary service(s) here
 from sbilifeco.gateways.readers.pdf.docling_reader import DoclingReader
+from sbilifeco.models.base import Response
 from envvars import EnvVars, Defaults
 
 
+class StubDoclingStream(AsyncByteStream):
+    """Stands in for docling-serve's response body. Sends its pieces one by one, holding back those after `hold_after` until released."""
+
+    def __init__(self, pieces: list[bytes], hold_after: int | None = None) -> None:
+        self.pieces = pieces
+        self.hold_after = hold_after
+        self.released = Event()
+        self.closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for index, piece in enumerate(self.pieces):
+            if index == self.hold_after:
+                await self.released.wait()
+            yield piece
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def stub_docling_body(texts: list[str]) -> list[bytes]:
+    # One piece per chunk, so the chunks arrive over several reads
+    body = dumps({"chunks": [{"text": text} for text in texts]})
+    first, *rest = body.split("}, ")
+    return [first.encode()] + [f"}}, {piece}".encode() for piece in rest]
+
+
 class Test(IsolatedAsyncioTestCase):
     async def asyncSetUp(self) -> None:
         load_dotenv()
@@ -37,7 +76,184 @@ class Test(IsolatedAsyncioTestCase):
     async def asyncTearDown(self) -> None:
         # Shutdown the service(s) here
         await self.service.async_shutdown()
-        ...
+        patch.stopall()
+
+    def stub_docling(self, *streams: StubDoclingStream) -> AsyncMock:
+        return patch.object(
+            self.service,
+            "_convert",
+            AsyncMock(
+                side_effect=[
+                    Response.ok(HttpxResponse(200, stream=stream)) for stream in streams
+                ]
+            ),
+        ).start()
+
+    async def test_chunks_are_parsed_incrementally(self) -> None:
+        # Arrange
+        stream = StubDoclingStream(stub_docling_body(["one", "two"]), hold_after=1)
+        self.stub_docling(stream)
+        read_response = await self.service.read_material(b"%PDF")
+        assert read_response.payload is not None
+        material_id = read_response.payload
+
+        # Act
+        first_response = await wait_for(
+            self.service.read_next_chunk(material_id), timeout=1
+        )
+        stream.released.set()
+        rest_response = await self.service.read_next_chunks(material_id, 10)
+        end_response = await self.service.read_next_chunk(material_id)
+        past_end_response = await self.service.read_next_chunk(material_id)
+
+        # Assert
+        self.assertTrue(first_response.is_success, first_response.message)
+        self.assertEqual(first_response.payload, "one")
+        self.assertEqual(rest_response.payload, ["two"])
+        self.assertTrue(end_response.is_success, end_response.message)
+        self.assertIsNone(end_response.payload)
+        self.assertTrue(past_end_response.is_success, past_end_response.message)
+        self.assertIsNone(past_end_response.payload)
+        self.assertTrue(stream.closed)
+
+    async def test_unread_materials_expire(self) -> None:
+        # Arrange
+        stream = StubDoclingStream(stub_docling_body(["one", "two"]))
+        self.stub_docling(stream)
+        self.service.set_chunks_ttl(0.01)
+        read_response = await self.service.read_material(b"%PDF")
+        assert read_response.payload is not None
+        await sleep(0.05)
+
+        # Act
+        chunk_response = await self.service.read_next_chunk(read_response.payload)
+
+        # Assert
+        self.assertEqual(chunk_response.code, 404)
+        self.assertTrue(stream.closed)
+
+    async def test_least_recently_read_materials_make_room(self) -> None:
+        # Arrange
+        streams = [StubDoclingStream(stub_docling_body(["one"])) for _ in range(3)]
+        self.stub_docling(*streams)
+        self.service.set_max_materials(2)
+        material_ids = []
+        for _ in streams:
+            read_response = await self.service.read_material(b"%PDF")
+            assert read_response.payload is not None
+            material_ids.append(read_response.payload)
+
+        # Act
+        chunk_responses = [
+            await self.service.read_next_chunk(material_id)
+            for material_id in material_ids
+        ]
+
+        # Assert
+        self.assertEqual(chunk_responses[0].code, 404)
+        self.assertTrue(streams[0].closed)
+        self.assertEqual([r.payload for r in chunk_responses[1:]], ["one", "one"])
+
+    async def test_eviction_waits_for_reader(self) -> None:
+        # Arrange
+        streams = [
+            StubDoclingStream(stub_docling_body(["one", "two"]), hold_after=1),
+            StubDoclingStream(stub_docling_body(["one"])),
+        ]
+        self.stub_docling(*streams)
+        self.service.set_max_materials(1)
+        read_response = await self.service.read_material(b"%PDF")
+        assert read_response.payload is not None
+        material_id = read_response.payload
+        reader = create_task(self.service.read_next_chunks(material_id, 2))
+        await sleep(0.01)
+
+        # Act
+        await self.service.read_material(b"%PDF")
+        streams[0].released.set()
+        chunks_response = await reader
+        after_response = await self.service.read_next_chunk(material_id)
+
+        # Assert
+        self.assertTrue(chunks_response.is_success, chunks_response.message)
+        self.assertEqual(chunks_response.payload, ["one", "two"])
+        self.assertTrue(streams[0].closed)
+        self.assertEqual(after_response.code, 404)
+
+    async def test_read_and_chunk_bypasses_held_materials(self) -> None:
+        # Arrange
+        streams = [
+            StubDoclingStream(stub_docling_body(["one"])),
+            StubDoclingStream(stub_docling_body(["two", "three"])),
+        ]
+        self.stub_docling(*streams)
+        self.service.set_max_materials(0)
+        read_response = await self.service.read_material(b"%PDF")
+        assert read_response.payload is not None
+
+        # Act
+        chunk_response = await self.service.read_and_chunk(b"%PDF")
+        assert chunk_response.payload is not None
+        chunks = [chunk async for chunk in chunk_response.payload]
+        held_response = await self.service.read_next_chunk(read_response.payload)
+
+        # Assert
+        self.assertEqual(self.service.max_materials, 1)
+        self.assertEqual(
+            chunks,
+            [
+                "two" + DoclingReader.LOGICAL_CHUNK_DELIMITER,
+                "three" + DoclingReader.LOGICAL_CHUNK_DELIMITER,
+            ],
+        )
+        self.assertTrue(streams[1].closed)
+        self.assertEqual(held_response.payload, "one")
+
+    async def test_upload_is_a_multipart_form(self) -> None:
+        # Arrange
+        uploads: list[tuple[str, bytes]] = []
+
+        async def handler(request: HttpxRequest) -> HttpxResponse:
+            body = await request.aread()
+            form = BytesParser().parsebytes(
+                f"Content-Type: {request.headers['content-type']}\r\n\r\n".encode()
+                + body
+            )
+            for part in form.get_payload():
+                uploads.append(
+                    (
+                        part.get_param("name", header="content-disposition"),
+                        part.get_payload(decode=True),
+                    )
+                )
+            return HttpxResponse(200, content=dumps({"chunks": [{"text": "one"}]}))
+
+        self.service.docling_pool = AsyncClient(transport=MockTransport(handler))
+        self.service.docling_pool_loop = get_running_loop()
+        self.service.read_size = 3
+        material = b"%PDF-1.7 body"
+
+        # Act
+        read_response = await self.service.read_material(material)
+        assert read_response.payload is not None
+        chunk_response = await self.service.read_next_chunk(read_response.payload)
+
+        # Assert
+        self.assertEqual(uploads, [("files", material)])
+        self.assertEqual(chunk_response.payload, "one")
+
+    async def test_unbounded_docling_timeout_keeps_connect_bounded(self) -> None:
+        # Arrange
+        self.service.set_docling_timeout(None)
+
+        # Act
+        timeout = self.service._get_docling_pool().timeout
+
+        # Assert
+        self.assertIsNone(timeout.read)
+        self.assertEqual(timeout.connect, DoclingReader.DEFAULT_CONNECT_TIMEOUT)
+        self.assertIsNotNone(timeout.write)
+        self.assertIsNotNone(timeout.pool)
 
     async def test_read_chunk(self) -> None:
         # Arrange
@@ -83,3 +299,18 @@ class Test(IsolatedAsyncioTestCase):
             chunk_response = await self.service.read_next_chunk(material_id)
 
         self.assertTrue(chunk_response.is_success, chunk_response.message)
+
+    async def test_read_chunk_from_file_like(self) -> None:
+        # Arrange
+        with open(".local/saral-jeevan-beema.pdf", "rb") as pdf_file:
+            read_response = await self.service.read_material(pdf_file)
+        self.assertTrue(read_response.is_success, read_response.message)
+        assert read_response.payload is not None
+        material_id = read_response.payload
+
+        # Act
+        chunk_response = await self.service.read_next_chunk(material_id)
+
+        # Assert
+        self.assertTrue(chunk_response.is_success, chunk_response.message)
+        assert chunk_response.payload is not None, chunk_response.message
@@ -1,11 +1,14 @@
 from __future__ import annotations
-from typing import Any
+from typing import Any, Sequence
+from json import dumps, loads
 from pprint import pformat
 from sbilifeco.models.base import Response
 
 # Import other required contracts/modules here
 from uuid import UUID
-from fastembed import TextEmbedding
+from numpy import float32, stack
+from numpy.typing import NDArray
+from fastembed import SparseTextEmbedding, TextEmbedding
 from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import (
     PointStruct,
@@ -15,20 +18,143 @@ from qdrant_client.models import (
     Filter,
     FieldCondition,
     MatchValue,
+    MatchAny,
     Record,
     ScoredPoint,
+    QueryRequest,
+    PayloadSchemaType,
+    PayloadSelectorExclude,
+    HnswConfigDiff,
+    VectorParamsDiff,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    ProductQuantization,
+    ProductQuantizationConfig,
+    CompressionRatio,
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    QuantizationSearchParams,
+    SearchParams,
+    SparseVector,
+    SparseVectorParams,
+    Modifier,
+    Prefetch,
+    FusionQuery,
+    Fusion,
 )
 from qdrant_client.http.exceptions import UnexpectedResponse
 from sbilifeco.boundaries.vector_repo import BaseVectorRepo
 from sbilifeco.boundaries.vectoriser import BaseVectoriser
-from sbilifeco.models.vectorisation import VectorisedRecord, RecordMetadata
+from sbilifeco.gateways.offload import OffloadExecutor
+from sbilifeco.gateways.micro_batcher import MicroBatcher
+from sbilifeco.models.vectorisation import (
+    Float32Vector,
+    VectorisedRecord,
+    VectorisedRecordPage,
+    RecordMetadata,
+)
+
+# The models of an embedding worker process, loaded once as the worker starts
+_worker_embedder: TextEmbedding | None = None
+_worker_sparse_embedder: SparseTextEmbedding | None = None
+
+
+def _init_embedding_worker(threads: int | None, sparse_model: str = "") -> None:
+    global _worker_embedder, _worker_sparse_embedder
+    _worker_embedder = TextEmbedding(threads=threads)
+    if sparse_model:
+        _worker_sparse_embedder = SparseTextEmbedding(sparse_model, threads=threads)
+
+
+def _embed_in_worker(texts: list[str]) -> NDArray[float32]:
+    assert _worker_embedder is not None
+    # One contiguous array pickles far smaller and faster than a list of arrays
+    return stack(list(_worker_embedder.embed(texts, batch_size=len(texts)))).astype(
+        float32
+    )
+
+
+def _embed_sparse(
+    embedder: SparseTextEmbedding, texts: list[str], as_query: bool
+) -> list[tuple[list[int], list[float]]]:
+    # Queries and documents are weighed differently by some models, e.g. BM25
+    embeddings = (
+        embedder.query_embed(texts)
+        if as_query
+        else embedder.embed(texts, batch_size=len(texts))
+    )
+    return [
+        (embedding.indices.tolist(), embedding.values.tolist())
+        for embedding in embeddings
+    ]
+
+
+def _embed_sparse_in_worker(
+    texts: list[str], as_query: bool
+) -> list[tuple[list[int], list[float]]]:
+    assert _worker_sparse_embedder is not None
+    return _embed_sparse(_worker_sparse_embedder, texts, as_query)
 
 
 class QdrantGateway(BaseVectoriser, BaseVectorRepo):
+    DEFAULT_UPSERT_BATCH_SIZE = 256
+    DEFAULT_INDEXED_FIELDS = {
+        "source_id": PayloadSchemaType.KEYWORD,
+        "source": PayloadSchemaType.KEYWORD,
+        "chunk_num": PayloadSchemaType.INTEGER,
+        "content_hash": PayloadSchemaType.KEYWORD,
+    }
+    DEFAULT_EMBEDDING_THREADS = 1
+    DEFAULT_EMBEDDING_PROCESSES = 0
+    QUANTIZATIONS = ("", "scalar", "product", "binary")
+    DENSE_VECTOR_NAME = "dense"
+    SPARSE_VECTOR_NAME = "sparse"
+    DEFAULT_HYBRID_PREFETCH_FACTOR = 4
+
     def __init__(self):
         self.qd: AsyncQdrantClient
         self.url: str
         self.collection_name: str
+        self.upsert_batch_size = self.DEFAULT_UPSERT_BATCH_SIZE
+        self.wait_for_bulk_upserts = True
+        self.indexed_fields: dict[str, PayloadSchemaType] = dict(
+            self.DEFAULT_INDEXED_FIELDS
+        )
+        self.embedding_processes = self.DEFAULT_EMBEDDING_PROCESSES
+        self.threads_per_embedder: int | None = None
+
+        # Index and search settings. None leaves Qdrant's own defaults in place.
+        self.hnsw_m: int | None = None
+        self.hnsw_ef_construct: int | None = None
+        self.on_disk_vectors: bool | None = None
+        self.quantization = ""
+        self.quantization_always_ram: bool | None = None
+        self.search_hnsw_ef: int | None = None
+        self.search_exact = False
+        self.search_rescore: bool | None = None
+        self.search_oversampling: float | None = None
+
+        # Hybrid retrieval. The layout of the collection decides whether it is on, see __read_collection_layout.
+        self.sparse_model = ""
+        self.hybrid_prefetch_factor = self.DEFAULT_HYBRID_PREFETCH_FACTOR
+        self.named_vectors = False
+        self.hybrid = False
+
+        # Inference blocks, so it runs on its own pool to keep the event loop serving searches
+        self.embedding = (
+            OffloadExecutor()
+            .set_name("qdrant-embedding")
+            .set_max_workers(self.DEFAULT_EMBEDDING_THREADS)
+        )
+
+        # Single vectorisations from concurrent callers are embedded together
+        self.vectorise_batcher = (
+            MicroBatcher[str, Float32Vector]()
+            .set_name("qdrant-vectorise")
+            .set_max_concurrent_batches(self.DEFAULT_EMBEDDING_THREADS)
+            .set_handler(self.__embed)
+        )
 
     def set_url(self, url: str) -> QdrantGateway:
         self.url = url
@@ -38,24 +164,247 @@ class QdrantGateway(BaseVectoriser, BaseVectorRepo):
         self.collection_name = collection_name
         return self
 
+    def set_upsert_batch_size(self, upsert_batch_size: int) -> QdrantGateway:
+        self.upsert_batch_size = max(1, upsert_batch_size)
+        return self
+
+    def set_wait_for_bulk_upserts(self, wait_for_bulk_upserts: bool) -> QdrantGateway:
+        """When set, the last batch of a bulk upsert waits until all batches have been applied"""
+        self.wait_for_bulk_upserts = wait_for_bulk_upserts
+        return self
+
+    def set_embedding_threads(self, embedding_threads: int) -> QdrantGateway:
+        """Upper bound on embeddings running at once. The model is already multi-threaded, so more than one rarely helps."""
+        self.embedding.set_max_workers(embedding_threads)
+        self.vectorise_batcher.set_max_concurrent_batches(embedding_threads)
+        return self
+
+    def set_embedding_processes(self, embedding_processes: int) -> QdrantGateway:
+        """
+        Embed in this many worker processes, each with its own model, to spread embedding over all cores.
+        0 embeds in this process, on `embedding_threads` threads sharing one model.
+        """
+        self.embedding_processes = max(0, embedding_processes)
+        return self
+
+    def set_threads_per_embedder(
+        self, threads_per_embedder: int | None
+    ) -> QdrantGateway:
+        """Threads each model runs inference on. None or 0 leaves it to ONNX Runtime, which uses every core; set it to about cores / embedding processes."""
+        self.threads_per_embedder = threads_per_embedder or None
+        return self
+
+    def set_vectorise_batch_size(self, vectorise_batch_size: int) -> QdrantGateway:
+        """The most single vectorisations embedded together. 1 embeds each on its own."""
+        self.vectorise_batcher.set_max_batch_size(vectorise_batch_size)
+        return self
+
+    def set_vectorise_batch_wait_ms(
+        self, vectorise_batch_wait_ms: float
+    ) -> QdrantGateway:
+        """How long a single vectorisation may wait for others to be embedded with it."""
+        self.vectorise_batcher.set_max_wait_ms(vectorise_batch_wait_ms)
+        return self
+
+    def set_hnsw(
+        self, m: int | None = None, ef_construct: int | None = None
+    ) -> QdrantGateway:
+        """Edges per node and build-time neighbour candidates of the HNSW index. Higher values raise recall at the cost of memory and indexing time."""
+        self.hnsw_m = m or None
+        self.hnsw_ef_construct = ef_construct or None
+        return self
+
+    def set_on_disk_vectors(self, on_disk_vectors: bool | None) -> QdrantGateway:
+        """Keep the original vectors on disk, e.g. when quantized vectors in RAM serve the searches"""
+        self.on_disk_vectors = on_disk_vectors
+        return self
+
+    def set_quantization(
+        self, quantization: str, always_ram: bool | None = None
+    ) -> QdrantGateway:
+        """
+        Compress the vectors searched in RAM.
+        Args:
+            quantization (str): "scalar" (int8, 4x smaller), "product" (16x smaller), "binary" (32x smaller, for high dimensional models) or "" for none.
+            always_ram (bool | None): Keep the quantized vectors in RAM even when the originals are on disk.
+        """
+        quantization = quantization.strip().lower()
+        if quantization == "none":
+            quantization = ""
+        if quantization not in self.QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization {quantization}")
+
+        self.quantization = quantization
+        self.quantization_always_ram = always_ram
+        return self
+
+    def set_search_hnsw_ef(self, search_hnsw_ef: int | None) -> QdrantGateway:
+        """Candidates considered per search. Higher values raise recall at the cost of latency."""
+        self.search_hnsw_ef = search_hnsw_ef or None
+        return self
+
+    def set_search_exact(self, search_exact: bool) -> QdrantGateway:
+        """Search exhaustively instead of through the HNSW index"""
+        self.search_exact = search_exact
+        return self
+
+    def set_search_rescoring(
+        self, rescore: bool | None, oversampling: float | None = None
+    ) -> QdrantGateway:
+        """With quantization, re-rank `oversampling` times the results by the original vectors"""
+        self.search_rescore = rescore
+        self.search_oversampling = oversampling or None
+        return self
+
+    def set_sparse_model(self, sparse_model: str) -> QdrantGateway:
+        """
+        Store a sparse vector of each document alongside its dense vector, and search both, fusing the results by reciprocal rank.
+        Exact terms such as plan codes and clause numbers are then found even where dense search misses them.
+        Args:
+            sparse_model (str): A fastembed sparse model, e.g. "Qdrant/bm25" or "prithivida/Splade_PP_en_v1". Empty searches dense vectors only.
+        Only new collections get the named dense and sparse vectors hybrid search needs; existing collections must be re-ingested into a new one.
+        """
+        self.sparse_model = sparse_model.strip()
+        return self
+
+    def set_hybrid_prefetch_factor(self, hybrid_prefetch_factor: int) -> QdrantGateway:
+        """Each of the dense and sparse searches fetches this many times the results asked for, before fusion"""
+        self.hybrid_prefetch_factor = max(1, hybrid_prefetch_factor)
+        return self
+
+    def add_indexed_field(
+        self,
+        field_name: str,
+        field_schema: PayloadSchemaType | str = PayloadSchemaType.KEYWORD,
+    ) -> QdrantGateway:
+        """Index another metadata field, so that criteria on it do not scan the collection. The metadata fields of records are always indexed."""
+        self.indexed_fields[field_name] = PayloadSchemaType(field_schema)
+        return self
+
     async def async_init(self, **kwargs) -> None:
         self.qd = AsyncQdrantClient(url=f"{self.url}")
-        self.embedder = TextEmbedding()
+        embedding_size = await self.__init_embedding()
 
-        if not (await self.qd.collection_exists(collection_name=self.collection_name)):
+        collection_exists = await self.qd.collection_exists(
+            collection_name=self.collection_name
+        )
+        if not collection_exists:
+            dense_params = VectorParams(
+                size=embedding_size,
+                distance=Distance.COSINE,
+                on_disk=self.on_disk_vectors,
+            )
             await self.qd.create_collection(
                 collection_name=self.collection_name,
-                vectors_config=VectorParams(
-                    size=self.embedder.embedding_size, distance=Distance.COSINE
+                vectors_config=(
+                    {self.DENSE_VECTOR_NAME: dense_params}
+                    if self.sparse_model
+                    else dense_params
+                ),
+                sparse_vectors_config=(
+                    {
+                        self.SPARSE_VECTOR_NAME: SparseVectorParams(
+                            # BM25 leaves inverse document frequency to the search
+                            modifier=(
+                                Modifier.IDF
+                                if "bm25" in self.sparse_model.lower()
+                                else None
+                            )
+                        )
+                    }
+                    if self.sparse_model
+                    else None
                 ),
+                hnsw_config=self.__hnsw_config(),
+                quantization_config=self.__quantization_config(),
             )
 
+        await self.__read_collection_layout()
+        if collection_exists:
+            await self.__update_collection_config()
+
+        if self.hybrid and not self.embedding_processes:
+            self.sparse_embedder = await self.embedding.run(
+                SparseTextEmbedding,
+                self.sparse_model,
+                threads=self.threads_per_embedder,
+            )
+
+        await self.__create_payload_indexes()
+
     async def async_shutdown(self, **kwargs) -> None:
         await self.qd.close()
+        self.vectorise_batcher.shutdown()
+        self.embedding.shutdown()
+
+    def executor_stats(self) -> list[dict[str, Any]]:
+        """Queue depths and counters of the pools that blocking calls run on."""
+        return [self.vectorise_batcher.stats(), self.embedding.stats()]
+
+    async def __init_embedding(self) -> int:
+        if not self.embedding_processes:
+            self.embedder = await self.embedding.run(
+                TextEmbedding, threads=self.threads_per_embedder
+            )
+            return self.embedder.embedding_size
+
+        (
+            self.embedding.set_processes(True)
+            .set_max_workers(self.embedding_processes)
+            .set_initializer(
+                _init_embedding_worker, self.threads_per_embedder, self.sparse_model
+            )
+        )
+        self.vectorise_batcher.set_max_concurrent_batches(self.embedding_processes)
+        print(f"Embedding in {self.embedding_processes} worker processes", flush=True)
+
+        # Embedding a probe starts a worker and tells the size of the vectors
+        return len((await self.__embed(["probe"]))[0])
+
+    async def __embed(self, texts: list[str]) -> list[Float32Vector]:
+        if self.embedding_processes:
+            embeddings = await self.embedding.run(_embed_in_worker, texts)
+        else:
+            embeddings = await self.embedding.run(
+                lambda: list(self.embedder.embed(texts, batch_size=len(texts)))
+            )
+        return [Float32Vector(embedding) for embedding in embeddings]
+
+    async def __embed_sparse(
+        self, texts: list[str], as_query: bool
+    ) -> list[SparseVector]:
+        if self.embedding_processes:
+            embeddings = await self.embedding.run(
+                _embed_sparse_in_worker, texts, as_query
+            )
+        else:
+            embeddings = await self.embedding.run(
+                _embed_sparse, self.sparse_embedder, texts, as_query
+            )
+        return [
+            SparseVector(indices=indices, values=values)
+            for indices, values in embeddings
+        ]
+
+    async def __sparse_vectors_of(
+        self, records: Sequence[VectorisedRecord]
+    ) -> list[SparseVector | None]:
+        if not self.hybrid:
+            return [None] * len(records)
+
+        documents = [
+            (
+                bytes(record.document).decode("utf-8")
+                if isinstance(record.document, (bytes, bytearray))
+                else record.document or ""
+            )
+            for record in records
+        ]
+        return list(await self.__embed_sparse(documents, as_query=False))
 
     async def vectorise(
         self, request_id: str, material: str | bytes | bytearray
-    ) -> Response[list[float | int]]:
+    ) -> Response[Sequence[float | int]]:
         try:
             material_as_text = ""
             if isinstance(material, (bytes, bytearray)):
@@ -63,22 +412,35 @@ class QdrantGateway(BaseVectoriser, BaseVectorRepo):
             elif isinstance(material, str):
                 material_as_text = material
 
-            vector = list(self.embedder.embed(material_as_text))[0].tolist()
+            vector = await self.vectorise_batcher.submit(material_as_text)
             return Response.ok(vector)
         except Exception as e:
             return Response.error(e)
 
-    async def crupdate(self, record: VectorisedRecord) -> Response[None]:
+    async def vectorise_many(
+        self, request_id: str, materials: Sequence[str | bytes | bytearray]
+    ) -> Response[list[Sequence[float | int]]]:
         try:
-            payload: dict[str, Any] = {"document": record.document}
-            if record.metadata:
-                payload["metadata"] = record.metadata.model_dump()
+            materials_as_text = [
+                (
+                    bytes(material).decode("utf-8")
+                    if isinstance(material, (bytes, bytearray))
+                    else material
+                )
+                for material in materials
+            ]
+            if not materials_as_text:
+                return Response.ok([])
 
-            point = PointStruct(
-                id=record.id,
-                vector=record.vector,
-                payload=payload,
-            )
+            vectors = await self.__embed(materials_as_text)
+            return Response.ok(vectors)
+        except Exception as e:
+            return Response.error(e)
+
+    async def crupdate(self, record: VectorisedRecord) -> Response[None]:
+        try:
+            sparse_vector = (await self.__sparse_vectors_of([record]))[0]
+            point = self.__point_from_model(record, sparse_vector)
             result = await self.qd.upsert(self.collection_name, [point])
             if result.status != UpdateStatus.COMPLETED:
                 return Response.fail(f"Upsert not completed: {pformat(result)}")
@@ -89,6 +451,36 @@ class QdrantGateway(BaseVectoriser, BaseVectorRepo):
         except Exception as e:
             return Response.error(e)
 
+    async def crupdate_many(
+        self, records: Sequence[VectorisedRecord]
+    ) -> Response[None]:
+        try:
+            sparse_vectors = await self.__sparse_vectors_of(records)
+            points = [
+                self.__point_from_model(record, sparse_vector)
+                for record, sparse_vector in zip(records, sparse_vectors)
+            ]
+
+            for start in range(0, len(points), self.upsert_batch_size):
+                batch = points[start : start + self.upsert_batch_size]
+                is_last_batch = start + self.upsert_batch_size >= len(points)
+
+                # Batches are applied in order, so waiting on the last one
+                # is a barrier for all of them
+                wait = self.wait_for_bulk_upserts and is_last_batch
+                result = await self.qd.upsert(self.collection_name, batch, wait=wait)
+                if result.status not in (
+                    UpdateStatus.COMPLETED,
+                    UpdateStatus.ACKNOWLEDGED,
+                ):
+                    return Response.fail(f"Upsert not accepted: {pformat(result)}")
+
+            return Response.ok(None)
+        except UnexpectedResponse as e:
+            return Response.fail(e.content.decode("utf-8"))
+        except Exception as e:
+            return Response.error(e)
+
     async def read_by_id(self, record_id: str) -> Response[VectorisedRecord]:
         try:
             result = await self.qd.retrieve(
@@ -120,18 +512,60 @@ class QdrantGateway(BaseVectoriser, BaseVectorRepo):
             return Response.error(e)
 
     async def read_by_criteria(
-        self, criteria: dict[str, Any]
+        self, criteria: dict[str, Any], include_vectors: bool = False
     ) -> Response[list[VectorisedRecord]]:
         try:
             filter = self.__filter_from_criteria(criteria)
 
-            result = await self.qd.scroll(
+            # Scroll returns a page at a time, so keep going until there is no next page
+            records: list[Record] = []
+            offset = None
+            while True:
+                page, offset = await self.qd.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=filter,
+                    with_vectors=self.__with_vectors(include_vectors),
+                    offset=offset,
+                )
+                records.extend(page)
+                if offset is None:
+                    break
+
+            return Response.ok([self.__model_from_record(record) for record in records])
+        except Exception as e:
+            return Response.error(e)
+
+    async def read_page_by_criteria(
+        self,
+        criteria: dict[str, Any],
+        page_size: int = BaseVectorRepo.DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        include_vectors: bool = False,
+        include_documents: bool = True,
+    ) -> Response[VectorisedRecordPage]:
+        try:
+            # The cursor is the ID of the first point of the page, as JSON since IDs may be ints or UUIDs
+            records, next_offset = await self.qd.scroll(
                 collection_name=self.collection_name,
-                scroll_filter=filter,
+                scroll_filter=self.__filter_from_criteria(criteria),
+                limit=page_size,
+                offset=loads(cursor) if cursor else None,
+                with_payload=(
+                    True
+                    if include_documents
+                    else PayloadSelectorExclude(exclude=["document"])
+                ),
+                with_vectors=self.__with_vectors(include_vectors),
             )
-            records = result[0]
 
-            return Response.ok([self.__model_from_record(record) for record in records])
+            return Response.ok(
+                VectorisedRecordPage(
+                    records=[self.__model_from_record(record) for record in records],
+                    next_cursor=(
+                        dumps(next_offset) if next_offset is not None else None
+                    ),
+                )
+            )
         except Exception as e:
             return Response.error(e)
 
@@ -151,12 +585,40 @@ class QdrantGateway(BaseVectoriser, BaseVectorRepo):
             return Response.error(e)
 
     async def search_by_vector(
-        self, vector: list[float], num_results: int = 5
+        self,
+        vector: Sequence[float | int],
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
+        text: str | None = None,
+        *,
+        exact: bool | None = None,
+        hnsw_ef: int | None = None,
     ) -> Response[list[VectorisedRecord]]:
+        """Search like the boundary does. With a sparse model and the text of the vector, the search is hybrid. `exact` and `hnsw_ef` override the gateway's search settings for this search."""
         try:
-            result = await self.qd.query_points(
-                self.collection_name, vector, limit=num_results
-            )
+            filter = self.__filter_from_criteria(criteria) if criteria else None
+            search_params = self.__search_params(exact, hnsw_ef)
+
+            if self.hybrid and text:
+                # Dense and sparse candidates, fused by reciprocal rank
+                sparse_vector = (await self.__embed_sparse([text], as_query=True))[0]
+                result = await self.qd.query_points(
+                    self.collection_name,
+                    prefetch=self.__hybrid_prefetch(
+                        vector, sparse_vector, filter, search_params, num_results
+                    ),
+                    query=FusionQuery(fusion=Fusion.RRF),
+                    limit=num_results,
+                )
+            else:
+                result = await self.qd.query_points(
+                    self.collection_name,
+                    list(vector),
+                    using=self.__dense_vector_name(),
+                    query_filter=filter,
+                    search_params=search_params,
+                    limit=num_results,
+                )
             if not result.points:
                 return Response.ok([])
 
@@ -166,6 +628,212 @@ class QdrantGateway(BaseVectoriser, BaseVectorRepo):
         except Exception as e:
             return Response.error(e)
 
+    async def search_by_vectors(
+        self,
+        vectors: Sequence[Sequence[float | int]],
+        num_results: int = 5,
+        criteria: dict[str, Any] | None = None,
+        texts: Sequence[str] | None = None,
+        *,
+        exact: bool | None = None,
+        hnsw_ef: int | None = None,
+    ) -> Response[list[list[VectorisedRecord]]]:
+        """Search like the boundary does. With a sparse model and the texts of the vectors, the searches are hybrid. `exact` and `hnsw_ef` override the gateway's search settings for these searches."""
+        try:
+            if not vectors:
+                return Response.ok([])
+
+            filter = self.__filter_from_criteria(criteria) if criteria else None
+            search_params = self.__search_params(exact, hnsw_ef)
+
+            if self.hybrid and texts:
+                sparse_vectors = await self.__embed_sparse(list(texts), as_query=True)
+                requests = [
+                    QueryRequest(
+                        prefetch=self.__hybrid_prefetch(
+                            vector, sparse_vector, filter, search_params, num_results
+                        ),
+                        query=FusionQuery(fusion=Fusion.RRF),
+                        limit=num_results,
+                        with_payload=True,
+                    )
+                    for vector, sparse_vector in zip(vectors, sparse_vectors)
+                ]
+            else:
+                requests = [
+                    QueryRequest(
+                        query=list(vector),
+                        using=self.__dense_vector_name(),
+                        filter=filter,
+                        params=search_params,
+                        limit=num_results,
+                        with_payload=True,
+                    )
+                    for vector in vectors
+                ]
+
+            results = await self.qd.query_batch_points(self.collection_name, requests)
+
+            return Response.ok(
+                [
+                    [self.__model_from_record(point) for point in result.points]
+                    for result in results
+                ]
+            )
+        except Exception as e:
+            return Response.error(e)
+
+    def __hnsw_config(self) -> HnswConfigDiff | None:
+        if self.hnsw_m is None and self.hnsw_ef_construct is None:
+            return None
+        return HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def __quantization_config(
+        self,
+    ) -> ScalarQuantization | ProductQuantization | BinaryQuantization | None:
+        if self.quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8, always_ram=self.quantization_always_ram
+                )
+            )
+        if self.quantization == "product":
+            return ProductQuantization(
+                product=ProductQuantizationConfig(
+                    compression=CompressionRatio.X16,
+                    always_ram=self.quantization_always_ram,
+                )
+            )
+        if self.quantization == "binary":
+            return BinaryQuantization(
+                binary=BinaryQuantizationConfig(always_ram=self.quantization_always_ram)
+            )
+        return None
+
+    async def __update_collection_config(self) -> None:
+        # Settings given for an existing collection are applied to it, so that they can be changed on restart
+        hnsw_config = self.__hnsw_config()
+        quantization_config = self.__quantization_config()
+        if (
+            hnsw_config is None
+            and quantization_config is None
+            and self.on_disk_vectors is None
+        ):
+            return
+
+        print(f"Updating the index settings of {self.collection_name}", flush=True)
+        # The unnamed vector of a collection goes by the empty name
+        dense_vector_name = self.__dense_vector_name() or ""
+        await self.qd.update_collection(
+            self.collection_name,
+            vectors_config=(
+                {dense_vector_name: VectorParamsDiff(on_disk=self.on_disk_vectors)}
+                if self.on_disk_vectors is not None
+                else None
+            ),
+            hnsw_config=hnsw_config,
+            quantization_config=quantization_config,
+        )
+
+    def __search_params(
+        self, exact: bool | None, hnsw_ef: int | None
+    ) -> SearchParams | None:
+        exact = self.search_exact if exact is None else exact
+        hnsw_ef = hnsw_ef or self.search_hnsw_ef
+        quantization = (
+            QuantizationSearchParams(
+                rescore=self.search_rescore, oversampling=self.search_oversampling
+            )
+            if self.search_rescore is not None or self.search_oversampling is not None
+            else None
+        )
+        if not exact and hnsw_ef is None and quantization is None:
+            return None
+
+        return SearchParams(hnsw_ef=hnsw_ef, exact=exact, quantization=quantization)
+
+    async def __create_payload_indexes(self) -> None:
+        # Only missing indexes are created, so that restarts do not re-index
+        collection = await self.qd.get_collection(self.collection_name)
+        for field_name, field_schema in self.indexed_fields.items():
+            key = f"metadata.{field_name}"
+            if key in collection.payload_schema:
+                continue
+
+            print(f"Creating {field_schema.value} payload index on {key}", flush=True)
+            await self.qd.create_payload_index(
+                self.collection_name,
+                field_name=key,
+                field_schema=field_schema,
+                wait=True,
+            )
+
+    async def __read_collection_layout(self) -> None:
+        collection = await self.qd.get_collection(self.collection_name)
+        self.named_vectors = isinstance(collection.config.params.vectors, dict)
+        has_sparse_vectors = self.SPARSE_VECTOR_NAME in (
+            collection.config.params.sparse_vectors or {}
+        )
+
+        self.hybrid = bool(self.sparse_model) and has_sparse_vectors
+        if self.sparse_model and not self.hybrid:
+            print(
+                f"Collection {self.collection_name} has no sparse vectors, so it is searched by dense vectors only",
+                flush=True,
+            )
+
+    def __dense_vector_name(self) -> str | None:
+        return self.DENSE_VECTOR_NAME if self.named_vectors else None
+
+    def __with_vectors(self, include_vectors: bool) -> bool | list[str]:
+        if include_vectors and self.named_vectors:
+            return [self.DENSE_VECTOR_NAME]
+        return include_vectors
+
+    def __hybrid_prefetch(
+        self,
+        vector: Sequence[float | int],
+        sparse_vector: SparseVector,
+        filter: Filter | None,
+        search_params: SearchParams | None,
+        num_results: int,
+    ) -> list[Prefetch]:
+        limit = num_results * self.hybrid_prefetch_factor
+        return [
+            Prefetch(
+                query=list(vector),
+                using=self.DENSE_VECTOR_NAME,
+                filter=filter,
+                params=search_params,
+                limit=limit,
+            ),
+            Prefetch(
+                query=sparse_vector,
+                using=self.SPARSE_VECTOR_NAME,
+                filter=filter,
+                limit=limit,
+            ),
+        ]
+
+    def __point_from_model(
+        self, record: VectorisedRecord, sparse_vector: SparseVector | None = None
+    ) -> PointStruct:
+        payload: dict[str, Any] = {"document": record.document}
+        if record.metadata:
+            payload["metadata"] = record.metadata.model_dump()
+
+        vector: Any = record.vector.tolist()
+        if self.named_vectors:
+            vector = {self.DENSE_VECTOR_NAME: vector}
+            if sparse_vector is not None:
+                vector[self.SPARSE_VECTOR_NAME] = sparse_vector
+
+        return PointStruct(
+            id=record.id,
+            vector=vector,
+            payload=payload,
+        )
+
     def __model_from_record(self, record: Record | ScoredPoint) -> VectorisedRecord:
         retrieved_record_id = ""
         if isinstance(record.id, UUID):
@@ -175,22 +843,34 @@ class QdrantGateway(BaseVectoriser, BaseVectorRepo):
         else:
             retrieved_record_id = str(record.id)
 
+        vector = record.vector
+        if isinstance(vector, dict):
+            vector = vector.get(self.DENSE_VECTOR_NAME)
+
         vectorised_record = VectorisedRecord(
             id=retrieved_record_id,
             document=record.payload.get("document", "") if record.payload else "",
             metadata=RecordMetadata.model_validate(
                 record.payload.get("metadata", {}) if record.payload else {}
             ),
-            vector=[],
+            vector=vector if isinstance(vector, list) else [],
             score=getattr(record, "score", 0.0),
         )
 
         return vectorised_record
 
     def __filter_from_criteria(self, criteria: dict[str, Any]) -> Filter:
+        # A list of values matches any of them
         return Filter(
             must=[
-                FieldCondition(key=f"metadata.{key}", match=MatchValue(value=value))
+                FieldCondition(
+                    key=f"metadata.{key}",
+                    match=(
+                        MatchAny(any=list(value))
+                        if isinstance(value, (list, tuple, set))
+                        else MatchValue(value=value)
+                    ),
+                )
                 for key, value in criteria.items()
             ]
         )
@@ -3,6 +3,7 @@ import sys
 
 sys.path.append("./src")
 
+from asyncio import gather
 from os import getenv
 from unittest import IsolatedAsyncioTestCase
 from unittest.mock import AsyncMock, patch
@@ -28,6 +29,7 @@ class Test(IsolatedAsyncioTestCase):
         http_port = int(getenv(EnvVars.http_port, Defaults.http_port))
         staging_host = getenv(EnvVars.staging_host, Defaults.staging_host)
         qdrant_url = getenv(EnvVars.qdrant_url, Defaults.qdrant_url)
+        self.qdrant_url = qdrant_url
         self.collection_name = getenv(EnvVars.collection_name, Defaults.collection_name)
 
         # Initialise the service(s) here
@@ -67,6 +69,71 @@ class Test(IsolatedAsyncioTestCase):
         assert response.payload is not None
         self.assertTrue(response.payload)
 
+    async def test_vectorise_many(self) -> None:
+        # Arrange
+        request_id = uuid4().hex
+        materials = [self.faker.paragraph() for _ in range(5)]
+
+        # Act
+        response = await self.service.vectorise_many(request_id, materials)
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        assert response.payload is not None
+        self.assertEqual(len(response.payload), len(materials))
+
+        single_response = await self.service.vectorise(request_id, materials[0])
+        assert single_response.payload is not None
+        for expected, actual in zip(single_response.payload, response.payload[0]):
+            self.assertAlmostEqual(expected, actual, places=4)
+
+    async def test_concurrent_vectorise_is_batched(self) -> None:
+        # Arrange
+        request_id = uuid4().hex
+        materials = [self.faker.paragraph() for _ in range(5)]
+
+        # Act
+        responses = await gather(
+            *[self.service.vectorise(request_id, material) for material in materials]
+        )
+
+        # Assert
+        self.assertTrue(all(response.is_success for response in responses))
+        self.assertEqual(self.service.vectorise_batcher.batches, 1)
+
+        many_response = await self.service.vectorise_many(request_id, materials)
+        assert many_response.payload is not None
+        for response, vector in zip(responses, many_response.payload):
+            assert response.payload is not None
+            for expected, actual in zip(vector, response.payload):
+                self.assertAlmostEqual(expected, actual, places=4)
+
+    async def test_vectorise_in_worker_processes(self) -> None:
+        # Arrange
+        request_id = uuid4().hex
+        material = self.faker.paragraph()
+        in_process_response = await self.service.vectorise(request_id, material)
+        await self.service.async_shutdown()
+
+        self.service = QdrantGateway()
+        (
+            self.service.set_url(self.qdrant_url)
+            .set_collection_name(self.collection_name)
+            .set_embedding_processes(2)
+            .set_threads_per_embedder(1)
+        )
+        await self.service.async_init()
+
+        # Act
+        response = await self.service.vectorise(request_id, material)
+
+        # Assert
+        self.assertTrue(response.is_success, response.message)
+        assert response.payload is not None and in_process_response.payload
+        self.assertTrue(self.service.embedding.stats()["processes"])
+        for expected, actual in zip(in_process_response.payload, response.payload):
+            self.assertAlmostEqual(expected, actual, places=4)
+
     async def test_create_read_delete(self) -> None:
         # Arrange
         source_id = uuid4().hex
@@ -113,6 +180,39 @@ class Test(IsolatedAsyncioTestCase):
         self.assertFalse(read_response.is_success)
         self.assertEqual(read_response.code, 404)
 
+    async def test_crupdate_many(self) -> None:
+        # Arrange
+        source_id = uuid4().hex
+        source = " ".join(self.faker.words(3))
+        records_in = [
+            VectorisedRecord(
+                id=uuid4().hex,
+                document=self.faker.paragraph(),
+                metadata=RecordMetadata(
+                    source_id=source_id, source=source, chunk_num=chunk_num
+                ),
+                vector=[float(randint(0, 100)) for _ in range(384)],
+            )
+            for chunk_num in range(5)
+        ]
+        self.service.set_upsert_batch_size(2)
+
+        # Act
+        crupdate_response = await self.service.crupdate_many(records_in)
+
+        # Assert
+        self.assertTrue(crupdate_response.is_success, crupdate_response.message)
+
+        for record_in in records_in:
+            read_response = await self.service.read_by_id(record_in.id)
+            self.assertTrue(read_response.is_success, read_response.message)
+
+            record_out = read_response.payload
+            assert record_out is not None
+
+            record_in.vector = []
+            self.assertEqual(record_out, record_in)
+
     async def test_read_by_criteria(self) -> None:
         # Arrange
         source_id = uuid4().hex
@@ -147,6 +247,36 @@ class Test(IsolatedAsyncioTestCase):
         record_in.vector = []
         self.assertEqual(record_out, record_in)
 
+    async def test_stream_by_criteria(self) -> None:
+        # Arrange
+        source_id = uuid4().hex
+        records_in = [
+            VectorisedRecord(
+                id=uuid4().hex,
+                document=self.faker.paragraph(),
+                metadata=RecordMetadata(source_id=source_id, chunk_num=i),
+                vector=[float(randint(0, 100)) for _ in range(384)],
+            )
+            for i in range(7)
+        ]
+        crupdate_response = await self.service.crupdate_many(records_in)
+        self.assertTrue(crupdate_response.is_success, crupdate_response.message)
+
+        # Act
+        stream_response = await self.service.stream_by_criteria(
+            {"source_id": source_id}, page_size=3, include_documents=False
+        )
+        assert stream_response.payload is not None
+        records_out = [record async for record in stream_response.payload]
+
+        # Assert
+        self.assertTrue(stream_response.is_success, stream_response.message)
+        self.assertEqual(
+            sorted(record.id for record in records_out),
+            sorted(record.id for record in records_in),
+        )
+        self.assertFalse(any(record.document for record in records_out))
+
     async def test_delete_by_criteria(self) -> None:
         # Arrange
         source_id = uuid4().hex
@@ -234,3 +364,96 @@ class Test(IsolatedAsyncioTestCase):
         record_out.score = 0.0
         record_in.vector = []
         self.assertEqual(record_out, record_in)
+
+    async def test_index_settings(self) -> None:
+        # Arrange - recreate the collection with explicit index settings
+        await self.service.async_shutdown()
+        await self.qdrant_client.delete_collection(self.collection_name)
+
+        self.service = QdrantGateway()
+        (
+            self.service.set_url(self.qdrant_url)
+            .set_collection_name(self.collection_name)
+            .set_hnsw(m=32, ef_construct=200)
+            .set_on_disk_vectors(True)
+            .set_quantization("scalar", always_ram=True)
+            .set_search_rescoring(True, 2.0)
+        )
+        await self.service.async_init()
+
+        record = VectorisedRecord(
+            id=uuid4().hex,
+            document=self.faker.paragraph(),
+            metadata=RecordMetadata(source_id=uuid4().hex),
+            vector=[float(randint(0, 100)) for _ in range(384)],
+        )
+        await self.service.crupdate(record)
+
+        # Act
+        collection = await self.qdrant_client.get_collection(self.collection_name)
+        search_response = await self.service.search_by_vector(
+            record.vector, 1, exact=True
+        )
+
+        # Assert
+        self.assertEqual(collection.config.hnsw_config.m, 32)
+        self.assertEqual(collection.config.hnsw_config.ef_construct, 200)
+        self.assertIsNotNone(collection.config.quantization_config)
+        self.assertTrue(search_response.is_success, search_response.message)
+        assert search_response.payload is not None
+        self.assertEqual(search_response.payload[0].id, record.id)
+
+    async def test_hybrid_search_finds_exact_terms(self) -> None:
+        # Arrange - recreate the collection with sparse vectors
+        await self.service.async_shutdown()
+        await self.qdrant_client.delete_collection(self.collection_name)
+
+        self.service = QdrantGateway()
+        (
+            self.service.set_url(self.qdrant_url)
+            .set_collection_name(self.collection_name)
+            .set_sparse_model("Qdrant/bm25")
+        )
+        await self.service.async_init()
+
+        plan_code = f"PLAN-{randint(1000, 9999)}"
+        records = [
+            VectorisedRecord(
+                id=uuid4().hex,
+                document=self.faker.paragraph()
+                + (f" Rider terms of {plan_code}." if i == 3 else ""),
+                metadata=RecordMetadata(source_id=uuid4().hex, chunk_num=i),
+                vector=[float(randint(0, 100)) for _ in range(384)],
+            )
+            for i in range(10)
+        ]
+        crupdate_response = await self.service.crupdate_many(records)
+        self.assertTrue(crupdate_response.is_success, crupdate_response.message)
+
+        # Act - the dense query matches another record, the text only records[3]
+        search_response = await self.service.search_by_vector(
+            records[0].vector, 3, text=plan_code
+        )
+
+        # Assert - the sparse hit can at most tie the dense top hit after fusion,
+        # so it is only certain to be among the top few
+        self.assertTrue(self.service.hybrid)
+        self.assertTrue(search_response.is_success, search_response.message)
+        assert search_response.payload is not None
+        self.assertIn(records[3].id, [record.id for record in search_response.payload])
+
+    async def test_payload_indexes(self) -> None:
+        # Arrange
+        self.service.add_indexed_field("product", "keyword")
+
+        # Act - restart over the collection created in asyncSetUp
+        await self.service.async_shutdown()
+        await self.service.async_init()
+
+        # Assert
+        collection = await self.qdrant_client.get_collection(self.collection_name)
+        for field_name in [*RecordMetadata.model_fields, "product"]:
+            self.assertIn(f"metadata.{field_name}", collection.payload_schema)
+        self.assertEqual(
+            collection.payload_schema["metadata.chunk_num"].data_type, "integer"
+        )